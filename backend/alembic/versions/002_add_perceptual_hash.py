@@ -0,0 +1,37 @@
+"""Add perceptual hash columns to snout_biometries
+
+Revision ID: 002_perceptual_hash
+Revises: 001_ml_upgrade
+Create Date: 2026-10-18
+
+Adiciona o dHash de 64 bits da imagem registrada e suas faixas de 16 bits
+(com índice GIN) para detectar reenvios quase idênticos da mesma foto sem
+rodar o modelo. Registros existentes ficam com hash NULL até serem
+atualizados.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '002_perceptual_hash'
+down_revision = '001_ml_upgrade'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('snout_biometries', sa.Column('perceptual_hash', sa.BigInteger(), nullable=True))
+    op.add_column('snout_biometries', sa.Column('phash_bands', postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.create_index(
+        'ix_snout_biometries_phash_bands',
+        'snout_biometries',
+        ['phash_bands'],
+        postgresql_using='gin'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_snout_biometries_phash_bands', table_name='snout_biometries')
+    op.drop_column('snout_biometries', 'phash_bands')
+    op.drop_column('snout_biometries', 'perceptual_hash')
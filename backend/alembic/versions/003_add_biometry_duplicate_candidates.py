@@ -0,0 +1,43 @@
+"""Add biometry_duplicate_candidates review table
+
+Revision ID: 003_duplicate_candidates
+Revises: 002_perceptual_hash
+Create Date: 2026-10-19
+
+Tabela preenchida pelo job de detecção de cadastros duplicados
+(python -m app.detect_duplicates): pares de biometrias ativas com
+similaridade acima de BIOMETRY_DUPLICATE_THRESHOLD, para revisão manual.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_duplicate_candidates'
+down_revision = '002_perceptual_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'biometry_duplicate_candidates',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('biometry_a_id', sa.Integer(), sa.ForeignKey('snout_biometries.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('biometry_b_id', sa.Integer(), sa.ForeignKey('snout_biometries.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('pet_a_id', sa.Integer(), sa.ForeignKey('pets.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('pet_b_id', sa.Integer(), sa.ForeignKey('pets.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('similarity', sa.Float(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True, server_default='pending'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('reviewed_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('biometry_a_id', 'biometry_b_id', name='uq_biometry_duplicate_pair'),
+    )
+    op.create_index('ix_biometry_duplicate_candidates_id', 'biometry_duplicate_candidates', ['id'])
+    op.create_index('ix_biometry_duplicate_candidates_status', 'biometry_duplicate_candidates', ['status'])
+
+
+def downgrade():
+    op.drop_index('ix_biometry_duplicate_candidates_status', table_name='biometry_duplicate_candidates')
+    op.drop_index('ix_biometry_duplicate_candidates_id', table_name='biometry_duplicate_candidates')
+    op.drop_table('biometry_duplicate_candidates')
@@ -0,0 +1,57 @@
+"""Add found-pet embeddings and lost_pet_matches
+
+Revision ID: 004_lost_pet_matches
+Revises: 003_duplicate_candidates
+Create Date: 2026-10-19
+
+Guarda o embedding da foto dos pets encontrados (gerado em background) e
+os candidatos a pareamento entre reportes de perdido e de encontrado, para
+que o app leia os resultados sem rodar o modelo sob demanda.
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision = '004_lost_pet_matches'
+down_revision = '003_duplicate_candidates'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('lost_pet_reports', sa.Column('found_embedding', Vector(768), nullable=True))
+    op.add_column('lost_pet_reports', sa.Column('match_status', sa.String(), nullable=True))
+    # Fila do pipeline: só os reportes aguardando embedding
+    op.create_index(
+        'ix_lost_pet_reports_match_pending',
+        'lost_pet_reports',
+        ['id'],
+        postgresql_where=sa.text("match_status = 'pending'")
+    )
+
+    op.create_table(
+        'lost_pet_matches',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('lost_report_id', sa.Integer(), sa.ForeignKey('lost_pet_reports.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('found_report_id', sa.Integer(), sa.ForeignKey('lost_pet_reports.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('similarity', sa.Float(), nullable=False),
+        sa.Column('distance_km', sa.Float(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True, server_default='suggested'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('lost_report_id', 'found_report_id', name='uq_lost_pet_match_pair'),
+    )
+    op.create_index('ix_lost_pet_matches_id', 'lost_pet_matches', ['id'])
+    op.create_index('ix_lost_pet_matches_lost_report_id', 'lost_pet_matches', ['lost_report_id'])
+    op.create_index('ix_lost_pet_matches_found_report_id', 'lost_pet_matches', ['found_report_id'])
+
+
+def downgrade():
+    op.drop_index('ix_lost_pet_matches_found_report_id', table_name='lost_pet_matches')
+    op.drop_index('ix_lost_pet_matches_lost_report_id', table_name='lost_pet_matches')
+    op.drop_index('ix_lost_pet_matches_id', table_name='lost_pet_matches')
+    op.drop_table('lost_pet_matches')
+    op.drop_index('ix_lost_pet_reports_match_pending', table_name='lost_pet_reports')
+    op.drop_column('lost_pet_reports', 'match_status')
+    op.drop_column('lost_pet_reports', 'found_embedding')
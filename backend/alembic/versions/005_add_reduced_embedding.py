@@ -0,0 +1,37 @@
+"""Add reduced embedding column for the ANN index
+
+Revision ID: 005_reduced_embedding
+Revises: 004_lost_pet_matches
+Create Date: 2026-10-19
+
+Adiciona snout_biometries.embedding_reduced (128 dimensões) com índice
+IVFFlat. A coluna fica NULL até rodar `python -m app.reduce_embeddings fit`,
+que ajusta a projeção, preenche os registros existentes e reconstrói o
+índice (criado aqui sobre a coluna vazia, com listas sem treino).
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision = '005_reduced_embedding'
+down_revision = '004_lost_pet_matches'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('snout_biometries', sa.Column('embedding_reduced', Vector(128), nullable=True))
+    op.create_index(
+        'ix_snout_biometries_embedding_reduced',
+        'snout_biometries',
+        ['embedding_reduced'],
+        postgresql_using='ivfflat',
+        postgresql_with={'lists': 100},
+        postgresql_ops={'embedding_reduced': 'vector_cosine_ops'}
+    )
+
+
+def downgrade():
+    op.drop_index('ix_snout_biometries_embedding_reduced', table_name='snout_biometries')
+    op.drop_column('snout_biometries', 'embedding_reduced')
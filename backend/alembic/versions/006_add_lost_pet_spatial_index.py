@@ -0,0 +1,32 @@
+"""Add spatial index on active lost_pet_reports
+
+Revision ID: 006_lost_pet_spatial
+Revises: 005_reduced_embedding
+Create Date: 2026-10-19
+
+Habilita cube + earthdistance (contrib, já presentes na imagem do
+Postgres) e cria um índice GiST em ll_to_earth(latitude, longitude) só
+dos reportes ativos. A busca por proximidade passa a filtrar por earth_box
+no índice em vez de carregar todos os reportes.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006_lost_pet_spatial'
+down_revision = '005_reduced_embedding'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS cube")
+    op.execute("CREATE EXTENSION IF NOT EXISTS earthdistance")
+    op.execute("""
+        CREATE INDEX ix_lost_pet_reports_earth_active
+        ON lost_pet_reports USING gist (ll_to_earth(latitude, longitude))
+        WHERE status = 'active'
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_lost_pet_reports_earth_active")
@@ -0,0 +1,28 @@
+"""Add lat/lon index on active lost_pet_reports
+
+Revision ID: 007_lost_pet_bbox_index
+Revises: 006_lost_pet_spatial
+Create Date: 2026-10-19
+
+Índice B-tree (latitude, longitude) só dos reportes ativos, usado pelo
+filtro por bounding box dos clusters do mapa (/public/lost-pets/clusters).
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '007_lost_pet_bbox_index'
+down_revision = '006_lost_pet_spatial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE INDEX ix_lost_pet_reports_lat_lon_active
+        ON lost_pet_reports (latitude, longitude)
+        WHERE status = 'active'
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_lost_pet_reports_lat_lon_active")
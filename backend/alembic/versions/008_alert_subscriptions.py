@@ -0,0 +1,70 @@
+"""Add alert subscriptions, cell index and notifications
+
+Revision ID: 008_alert_subscriptions
+Revises: 007_lost_pet_bbox_index
+Create Date: 2026-10-19
+
+Áreas de alerta (ponto + raio) dos usuários, o índice por célula da grade
+(alert_subscription_cells, PK (cell_id, subscription_id)) usado para achar
+os inscritos de um reporte sem varrer todas as inscrições, e os avisos
+gerados (alert_notifications).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_alert_subscriptions'
+down_revision = '007_lost_pet_bbox_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'alert_subscriptions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('label', sa.String(), nullable=True),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.Column('radius_km', sa.Float(), nullable=False),
+        sa.Column('report_type', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True, server_default=sa.true()),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_alert_subscriptions_id', 'alert_subscriptions', ['id'])
+    op.create_index('ix_alert_subscriptions_user_id', 'alert_subscriptions', ['user_id'])
+
+    op.create_table(
+        'alert_subscription_cells',
+        sa.Column('cell_id', sa.BigInteger(), primary_key=True),
+        sa.Column('subscription_id', sa.Integer(), sa.ForeignKey('alert_subscriptions.id', ondelete='CASCADE'), primary_key=True),
+    )
+    # Remoção em cascata a partir da inscrição
+    op.create_index('ix_alert_subscription_cells_subscription_id', 'alert_subscription_cells', ['subscription_id'])
+
+    op.create_table(
+        'alert_notifications',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('subscription_id', sa.Integer(), sa.ForeignKey('alert_subscriptions.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('report_id', sa.Integer(), sa.ForeignKey('lost_pet_reports.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('distance_km', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('read_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('user_id', 'report_id', name='uq_alert_notification_user_report'),
+    )
+    op.create_index('ix_alert_notifications_id', 'alert_notifications', ['id'])
+    op.create_index('ix_alert_notifications_user_id_id', 'alert_notifications', ['user_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_alert_notifications_user_id_id', table_name='alert_notifications')
+    op.drop_index('ix_alert_notifications_id', table_name='alert_notifications')
+    op.drop_table('alert_notifications')
+    op.drop_index('ix_alert_subscription_cells_subscription_id', table_name='alert_subscription_cells')
+    op.drop_table('alert_subscription_cells')
+    op.drop_index('ix_alert_subscriptions_user_id', table_name='alert_subscriptions')
+    op.drop_index('ix_alert_subscriptions_id', table_name='alert_subscriptions')
+    op.drop_table('alert_subscriptions')
@@ -0,0 +1,29 @@
+"""Add created_at index on active lost_pet_reports
+
+Revision ID: 009_lost_pet_expiry_index
+Revises: 008_alert_subscriptions
+Create Date: 2026-10-19
+
+Índice parcial (created_at) dos reportes ativos, usado pelo job de
+expiração (python -m app.expire_reports) para achar os lotes vencidos sem
+percorrer a tabela.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009_lost_pet_expiry_index'
+down_revision = '008_alert_subscriptions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE INDEX ix_lost_pet_reports_created_at_active
+        ON lost_pet_reports (created_at)
+        WHERE status = 'active'
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_lost_pet_reports_created_at_active")
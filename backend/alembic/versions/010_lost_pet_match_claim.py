@@ -0,0 +1,42 @@
+"""Add match_claimed_at and include claimed reports in the match queue index
+
+Revision ID: 010_lost_pet_match_claim
+Revises: 009_lost_pet_expiry_index
+Create Date: 2026-10-19
+
+O pipeline de pareamento reserva os lotes (match_status='processing',
+match_claimed_at) antes de baixar as fotos e rodar o modelo, fora da
+transação. O índice parcial da fila passa a cobrir também os reservados,
+para recuperar reservas vencidas de workers que caíram.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_lost_pet_match_claim'
+down_revision = '009_lost_pet_expiry_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('lost_pet_reports', sa.Column('match_claimed_at', sa.DateTime(), nullable=True))
+    op.drop_index('ix_lost_pet_reports_match_pending', table_name='lost_pet_reports')
+    op.create_index(
+        'ix_lost_pet_reports_match_pending',
+        'lost_pet_reports',
+        ['id'],
+        postgresql_where=sa.text("match_status IN ('pending', 'processing')")
+    )
+
+
+def downgrade():
+    op.execute("UPDATE lost_pet_reports SET match_status = 'pending' WHERE match_status = 'processing'")
+    op.drop_index('ix_lost_pet_reports_match_pending', table_name='lost_pet_reports')
+    op.create_index(
+        'ix_lost_pet_reports_match_pending',
+        'lost_pet_reports',
+        ['id'],
+        postgresql_where=sa.text("match_status = 'pending'")
+    )
+    op.drop_column('lost_pet_reports', 'match_claimed_at')
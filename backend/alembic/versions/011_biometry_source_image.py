@@ -0,0 +1,36 @@
+"""Add source image, snout bbox and crop mode to snout_biometries
+
+Revision ID: 011_biometry_source_image
+Revises: 010_lost_pet_match_claim
+Create Date: 2026-10-19
+
+Guarda a foto do cadastro (chave no bucket), a caixa do focinho informada
+pelo app e o recorte usado no embedding, para que
+`python -m app.reembed_biometries` reprocesse a galeria quando o recorte
+(SNOUT_DETECTION_ENABLED / SNOUT_CASCADE_PATH) ou o modelo mudarem.
+
+Os registros existentes foram gerados sobre a imagem inteira e não têm
+foto guardada.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '011_biometry_source_image'
+down_revision = '010_lost_pet_match_claim'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('snout_biometries', sa.Column('source_image_key', sa.String(), nullable=True))
+    op.add_column('snout_biometries', sa.Column('source_snout_bbox', postgresql.ARRAY(sa.Float()), nullable=True))
+    op.add_column('snout_biometries', sa.Column('crop_mode', sa.String(), nullable=True))
+    op.execute("UPDATE snout_biometries SET crop_mode = 'full'")
+
+
+def downgrade():
+    op.drop_column('snout_biometries', 'crop_mode')
+    op.drop_column('snout_biometries', 'source_snout_bbox')
+    op.drop_column('snout_biometries', 'source_image_key')
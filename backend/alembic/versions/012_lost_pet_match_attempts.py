@@ -0,0 +1,37 @@
+"""Add match_attempts to lost_pet_reports
+
+Revision ID: 012_lost_pet_match_attempts
+Revises: 011_biometry_source_image
+Create Date: 2026-10-19
+
+Falhas de infraestrutura no pareamento (S3, modelo) devolvem o reporte
+para 'pending' em vez de 'failed'; o contador limita as novas tentativas
+(REPORT_MATCH_MAX_ATTEMPTS) e define o backoff entre elas.
+
+Reportes que falharam antes desta versão não têm como ser distinguidos
+entre foto inválida e falha temporária: voltam todos para a fila, e os de
+foto inválida terminam em 'failed' de novo na primeira tentativa.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_lost_pet_match_attempts'
+down_revision = '011_biometry_source_image'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'lost_pet_reports',
+        sa.Column('match_attempts', sa.Integer(), nullable=False, server_default='0')
+    )
+    op.execute("""
+        UPDATE lost_pet_reports SET match_status = 'pending'
+        WHERE match_status = 'failed' AND report_type = 'found' AND status = 'active'
+    """)
+
+
+def downgrade():
+    op.drop_column('lost_pet_reports', 'match_attempts')
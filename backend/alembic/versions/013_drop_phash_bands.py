@@ -0,0 +1,36 @@
+"""Drop the perceptual hash bands from snout_biometries
+
+Revision ID: 013_drop_phash_bands
+Revises: 012_lost_pet_match_attempts
+Create Date: 2026-10-19
+
+As faixas de 16 bits do dHash (e o índice GIN) serviam à busca de fotos
+quase idênticas entre pets, que foi retirada: o hash só é comparado com o
+da biometria atual do próprio pet (perceptual_hash), então as faixas eram
+calculadas e indexadas a cada escrita sem nenhuma leitura.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '013_drop_phash_bands'
+down_revision = '012_lost_pet_match_attempts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index('ix_snout_biometries_phash_bands', table_name='snout_biometries')
+    op.drop_column('snout_biometries', 'phash_bands')
+
+
+def downgrade():
+    # As faixas voltam vazias (NULL); nada no código as lê
+    op.add_column('snout_biometries', sa.Column('phash_bands', postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.create_index(
+        'ix_snout_biometries_phash_bands',
+        'snout_biometries',
+        ['phash_bands'],
+        postgresql_using='gin'
+    )
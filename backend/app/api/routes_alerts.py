@@ -0,0 +1,112 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List
+from app.db.session import get_db
+from app.models.user import User
+from app.models.alert import AlertSubscription
+from app.schemas.alert import (
+    AlertSubscriptionCreate,
+    AlertSubscriptionResponse,
+    AlertNotificationResponse,
+    AlertMarkReadRequest
+)
+from app.core.security import get_current_user
+from app.services.alert_service import AlertService
+
+router = APIRouter()
+
+
+@router.post("/subscriptions", response_model=AlertSubscriptionResponse, status_code=status.HTTP_201_CREATED)
+async def create_alert_subscription(
+    data: AlertSubscriptionCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Cria uma área de alerta (ponto + raio).
+
+    Cada reporte novo de pet perdido/encontrado dentro da área gera um aviso
+    (GET /alerts/notifications).
+    """
+    subscription, message = AlertService(db).create_subscription(
+        user_id=current_user.id,
+        latitude=data.latitude,
+        longitude=data.longitude,
+        radius_km=data.radius_km,
+        report_type=data.report_type,
+        label=data.label
+    )
+    
+    if not subscription:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=message
+        )
+    
+    return subscription
+
+
+@router.get("/subscriptions", response_model=List[AlertSubscriptionResponse])
+async def list_alert_subscriptions(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Lista as áreas de alerta do usuário"""
+    return db.query(AlertSubscription).filter(
+        AlertSubscription.user_id == current_user.id
+    ).order_by(AlertSubscription.created_at.desc()).all()
+
+
+@router.delete("/subscriptions/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_alert_subscription(
+    subscription_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Remove uma área de alerta"""
+    if not AlertService(db).delete_subscription(subscription_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Área de alerta não encontrada"
+        )
+    
+    return None
+
+
+@router.get("/notifications", response_model=List[AlertNotificationResponse])
+async def list_alert_notifications(
+    unread_only: bool = Query(False, description="Somente avisos não lidos"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Lista os avisos de reportes nas áreas de alerta, mais recentes primeiro"""
+    notifications = AlertService(db).get_notifications(current_user.id, unread_only, limit)
+    
+    return [
+        AlertNotificationResponse(
+            id=n.id,
+            subscription_id=n.subscription_id,
+            report_id=n.report_id,
+            report_type=n.report.report_type,
+            report_status=n.report.status,
+            city=n.report.city,
+            pet_name=n.report.pet.name if n.report.pet else None,
+            pet_species=n.report.pet.species if n.report.pet else n.report.found_species,
+            distance_km=round(n.distance_km, 2) if n.distance_km is not None else None,
+            created_at=n.created_at,
+            read_at=n.read_at,
+        )
+        for n in notifications
+    ]
+
+
+@router.post("/notifications/read")
+async def mark_alert_notifications_read(
+    data: AlertMarkReadRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Marca avisos como lidos"""
+    count = AlertService(db).mark_read(current_user.id, data.ids)
+    return {"updated": count}
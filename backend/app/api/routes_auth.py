@@ -24,6 +24,7 @@ from app.core.security import (
 )
 from app.core.config import settings
 from app.services.audit_service import AuditService
+from app.services import pet_profile
 
 router = APIRouter()
 
@@ -185,6 +186,7 @@ async def update_current_user(
     
     db.commit()
     db.refresh(current_user)
+    pet_profile.invalidate_owner(db, current_user.id)
     
     # Log de auditoria
     AuditService.log(
@@ -1,15 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import secrets
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Header, status
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.user import User
+from app.core.config import settings
 from app.core.security import get_current_user
 from app.services.biometry_service import BiometryService
+from app.services import pet_profile
+from app.services.ml_embedding_service import get_ml_service
 from app.schemas.biometry import (
     BiometryRegisterRequest,
     BiometrySearchRequest,
+    BiometryBatchSearchRequest,
     BiometryResponse,
     BiometrySearchResponse,
-    PetSearchResult
+    BiometryBatchSearchItem,
+    BiometryBatchSearchResponse,
+    PetSearchResult,
+    EmbeddingRequest,
+    EmbeddingResponse,
+    BiometryEmbeddingSearchRequest
 )
 
 router = APIRouter()
@@ -31,7 +42,8 @@ async def register_snout_biometry(
     biometry, message = service.register_snout(
         pet_id=data.pet_id,
         image_base64=data.image_base64,
-        owner_id=current_user.id
+        owner_id=current_user.id,
+        snout_bbox=data.snout_bbox.as_tuple() if data.snout_bbox else None
     )
     
     if not biometry:
@@ -40,6 +52,7 @@ async def register_snout_biometry(
             detail=message
         )
     
+    pet_profile.invalidate_pet(data.pet_id)
     return biometry
 
 
@@ -55,40 +68,126 @@ async def search_pet_by_snout(
     possa encontrar o dono de um pet perdido.
     
     Os dados de contato são parcialmente mascarados por privacidade.
+
+    Com latitude/longitude, os pets perdidos no raio informado são
+    comparados primeiro; a galeria completa só é consultada se nenhum
+    deles for compatível.
     """
     service = BiometryService(db)
     results = service.search_by_snout(
         image_base64=data.image_base64,
         threshold=data.threshold,
-        max_results=data.max_results
+        max_results=data.max_results,
+        snout_bbox=data.snout_bbox.as_tuple() if data.snout_bbox else None,
+        latitude=data.latitude,
+        longitude=data.longitude,
+        radius_km=data.radius_km
     )
     
-    if not results:
-        return BiometrySearchResponse(
-            found=False,
-            results=[],
-            message="Nenhum pet encontrado com esse focinho. Tente tirar uma foto mais nítida ou com melhor iluminação."
+    return _build_search_response(results, data.threshold)
+
+
+@router.post("/search/embedding", response_model=BiometrySearchResponse)
+async def search_pet_by_embedding(
+    data: BiometryEmbeddingSearchRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    Busca pets com um embedding calculado no próprio app.
+
+    O app roda o modelo (quantizado) no aparelho e envia o vetor, a versão
+    do modelo e a miniatura do focinho. O servidor só consulta o índice;
+    uma amostra das requisições é verificada recalculando o embedding a
+    partir da miniatura.
+    """
+    service = BiometryService(db)
+    results, message = service.search_by_embedding(
+        embedding=data.embedding,
+        model_version=data.model_version,
+        thumbnail_base64=data.thumbnail_base64,
+        threshold=data.threshold,
+        max_results=data.max_results,
+        latitude=data.latitude,
+        longitude=data.longitude,
+        radius_km=data.radius_km
+    )
+
+    if results is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=message
         )
-    
-    pet_results = [
-        PetSearchResult(
-            pet_id=r["pet_id"],
-            pet_name=r["pet_name"],
-            species=r["species"],
-            breed=r["breed"],
-            owner_name=r["owner_name"],
-            owner_phone=r["owner_phone"],
-            similarity=r["similarity"],
-            has_contact_permission=r["has_contact_permission"]
+
+    return _build_search_response(results, data.threshold)
+
+
+@router.post("/search/batch", response_model=BiometryBatchSearchResponse)
+async def search_pets_by_snout_batch(
+    data: BiometryBatchSearchRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    Busca vários pets por focinho em uma única chamada.
+
+    Pensado para abrigos e veterinários que escaneiam vários animais
+    encontrados: os embeddings são gerados em lote e a busca por
+    similaridade de todas as imagens roda em uma única query.
+    """
+    service = BiometryService(db)
+    batch = service.search_by_snout_batch(
+        images_base64=data.images_base64,
+        threshold=data.threshold,
+        max_results=data.max_results
+    )
+
+    items = []
+    for index, (results, issues) in enumerate(batch):
+        if issues:
+            message = "Erro ao processar imagem: " + "; ".join(issues)
+        elif results:
+            message = f"Encontrado(s) {len(results)} pet(s) com similaridade acima de {data.threshold * 100:.0f}%"
+        else:
+            message = "Nenhum pet encontrado com esse focinho."
+
+        items.append(BiometryBatchSearchItem(
+            index=index,
+            found=bool(results),
+            results=[PetSearchResult(**r) for r in results],
+            message=message
+        ))
+
+    return BiometryBatchSearchResponse(results=items)
+
+
+@router.post("/embed", response_model=EmbeddingResponse, include_in_schema=False)
+async def generate_embedding(
+    data: EmbeddingRequest,
+    x_ml_token: str = Header(default=""),
+):
+    """
+    Endpoint interno do nó de ML.
+
+    Nós da API com ML_ENABLED=false delegam a geração de embeddings
+    para cá. Exige o token compartilhado ML_SERVICE_TOKEN.
+    """
+    if not settings.ML_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="ML desabilitado neste nó"
         )
-        for r in results
-    ]
-    
-    return BiometrySearchResponse(
-        found=True,
-        results=pet_results,
-        message=f"Encontrado(s) {len(results)} pet(s) com similaridade acima de {data.threshold * 100:.0f}%"
+
+    if not settings.ML_SERVICE_TOKEN or not secrets.compare_digest(x_ml_token, settings.ML_SERVICE_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token inválido"
+        )
+
+    embedding, quality, issues = get_ml_service().generate_embedding(
+        data.image_base64,
+        snout_bbox=data.snout_bbox.as_tuple() if data.snout_bbox else None,
+        tta=data.tta
     )
+    return EmbeddingResponse(embedding=embedding, quality_score=quality, issues=issues)
 
 
 @router.get("/{pet_id}", response_model=BiometryResponse)
@@ -131,5 +230,37 @@ async def delete_pet_biometry(
             detail="Biometria não encontrada"
         )
     
+    pet_profile.invalidate_pet(pet_id)
     return None
 
+
+def _build_search_response(results: List[dict], threshold: float) -> BiometrySearchResponse:
+    """Monta a resposta da busca por focinho"""
+    if not results:
+        return BiometrySearchResponse(
+            found=False,
+            results=[],
+            message="Nenhum pet encontrado com esse focinho. Tente tirar uma foto mais nítida ou com melhor iluminação."
+        )
+    
+    pet_results = [
+        PetSearchResult(
+            pet_id=r["pet_id"],
+            pet_name=r["pet_name"],
+            species=r["species"],
+            breed=r["breed"],
+            owner_name=r["owner_name"],
+            owner_phone=r["owner_phone"],
+            similarity=r["similarity"],
+            distance_km=r["distance_km"],
+            has_contact_permission=r["has_contact_permission"]
+        )
+        for r in results
+    ]
+    
+    return BiometrySearchResponse(
+        found=True,
+        results=pet_results,
+        message=f"Encontrado(s) {len(results)} pet(s) com similaridade acima de {threshold * 100:.0f}%",
+        search_scope="nearby" if results[0]["distance_km"] is not None else "global"
+    )
@@ -13,6 +13,7 @@ from app.models.document import PetDocument
 from app.schemas.document import DocumentCreate, DocumentUpdate, DocumentResponse
 from app.core.security import get_current_user
 from app.core.config import settings
+from app.services import pet_profile
 
 router = APIRouter()
 
@@ -83,6 +84,7 @@ async def upload_pet_photo(
     # Armazenamos a chave para gerar presigned URL sob demanda
     pet.photo_url = f"{settings.S3_ENDPOINT}/{bucket}/{s3_key}"
     db.commit()
+    pet_profile.invalidate_pet(pet_id)
 
     return {"photo_url": photo_url, "s3_key": s3_key}
 
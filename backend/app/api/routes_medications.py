@@ -11,6 +11,7 @@ from app.schemas.medication import (
     MedicationLogCreate, MedicationLogResponse, MedicationResponseWithPet
 )
 from app.core.security import get_current_user
+from app.services import pet_profile
 
 router = APIRouter()
 
@@ -81,6 +82,7 @@ async def create_medication(
     db.add(medication)
     db.commit()
     db.refresh(medication)
+    pet_profile.invalidate_pet(pet_id)
     
     return medication
 
@@ -156,6 +158,7 @@ async def update_medication(
     
     db.commit()
     db.refresh(medication)
+    pet_profile.invalidate_pet(pet_id)
     
     return medication
 
@@ -183,6 +186,7 @@ async def delete_medication(
     
     db.delete(medication)
     db.commit()
+    pet_profile.invalidate_pet(pet_id)
     
     return None
 
@@ -6,6 +6,7 @@ from app.models.user import User
 from app.models.pet import Pet
 from app.schemas.pet import PetCreate, PetUpdate, PetResponse
 from app.core.security import get_current_user
+from app.services import pet_profile
 
 router = APIRouter()
 
@@ -86,6 +87,7 @@ async def update_pet(
     
     db.commit()
     db.refresh(pet)
+    pet_profile.invalidate_pet(pet_id)
     
     return pet
 
@@ -110,6 +112,7 @@ async def delete_pet(
     
     db.delete(pet)
     db.commit()
+    pet_profile.invalidate_pet(pet_id)
     
     return None
 
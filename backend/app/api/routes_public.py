@@ -1,38 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from typing import List, Optional
-from math import radians, cos, sin, asin, sqrt
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, and_, select, tuple_
+from typing import List, Optional, Tuple
+import asyncio
+import base64
+import json
 from datetime import datetime
 from app.db.session import get_db
 from app.models.pet import Pet
 from app.models.user import User
-from app.models.lost_pet import LostPetReport
-from app.models.snout_biometry import SnoutBiometry
+from app.models.lost_pet import LostPetReport, ACTIVE_STATUS
 from app.schemas.lost_pet import (
     LostPetReportCreate,
     FoundPetReportCreate,
     LostPetReportUpdate,
     LostPetReportResponse,
     NearbyReportsRequest,
-    PetPublicProfile
+    PetPublicProfile,
+    LostPetMatchResponse,
+    MapCluster,
+    MapClustersResponse,
 )
+from app.core.config import settings
+from app.core.http_cache import make_etag, not_modified, public_cache_control, set_cache_headers
 from app.core.security import get_current_user
+from app.services import edge_cache, geo, map_clusters, pet_profile
+from app.services.report_events import Subscriber, broker, report_payload, reports_version
+from app.services.alert_service import run_alert_fanout
+from app.services.report_matching_service import (
+    ReportMatchingService,
+    photo_object_key,
+    run_lost_report_matching,
+    run_pending_found_matching,
+)
 
 router = APIRouter()
 
 
-def haversine(lon1, lat1, lon2, lat2):
-    """Calcula distância em km entre dois pontos"""
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-    km = 6371 * c
-    return km
-
-
 def mask_phone(phone: str) -> str:
     """Mascara telefone para privacidade"""
     if not phone or len(phone) < 4:
@@ -40,9 +45,6 @@ def mask_phone(phone: str) -> str:
     return phone[:3] + "*" * (len(phone) - 5) + phone[-2:]
 
 
-from app.models.record import MedicalRecord
-from app.models.medication import Medication
-
 # ==================== PERFIL PÚBLICO (QR CODE) ====================
 
 
@@ -54,6 +56,8 @@ class PetIdentifiedProfile(PetPublicProfile):
 @router.get("/pet/{pet_id}/identified", response_model=PetIdentifiedProfile)
 async def get_identified_pet_profile(
     pet_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
     """
@@ -62,73 +66,28 @@ async def get_identified_pet_profile(
     Este endpoint retorna o telefone completo do tutor para permitir
     contato direto quando alguém identifica um pet pelo focinho.
     Usado principalmente para ajudar a reunir pets perdidos.
-    """
-    pet = db.query(Pet).filter(Pet.id == pet_id).first()
 
-    if not pet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Pet não encontrado"
-        )
-
-    # Verifica se tem reporte de perdido ativo
-    is_lost = db.query(LostPetReport).filter(
-        LostPetReport.pet_id == pet_id,
-        LostPetReport.report_type == 'lost',
-        LostPetReport.status == 'active'
-    ).first() is not None
-
-    # Verifica se tem biometria
-    has_biometry = db.query(SnoutBiometry).filter(
-        SnoutBiometry.pet_id == pet_id,
-        SnoutBiometry.is_active == True
-    ).first() is not None
-
-    # Busca vacinas recentes (últimas 5)
-    vaccines = db.query(MedicalRecord).filter(
-        MedicalRecord.pet_id == pet_id,
-        MedicalRecord.type == 'vaccine'
-    ).order_by(MedicalRecord.event_date.desc()).limit(5).all()
-
-    # Busca medicamentos ativos
-    active_meds = db.query(Medication).filter(
-        Medication.pet_id == pet_id,
-        Medication.is_active == True
-    ).all()
-
-    # Busca dados do dono - TELEFONE COMPLETO para identificação por biometria
-    owner = db.query(User).filter(User.id == pet.owner_id).first()
-
-    return PetIdentifiedProfile(
-        id=pet.id,
-        name=pet.name,
-        species=pet.species,
-        breed=pet.breed,
-        sex=pet.sex,
-        photo_url=pet.photo_url,
-        is_lost=is_lost,
-        owner_name=owner.full_name if owner else None,
-        owner_phone=owner.phone if owner else None,  # Telefone COMPLETO
-        has_biometry=has_biometry,
-        vaccines=[
-            {"title": v.title, "event_date": v.event_date}
-            for v in vaccines
-        ],
-        active_medications=[
-            {
-                "name": m.name,
-                "dosage": m.dosage,
-                "frequency": m.frequency,
-                "is_active": m.is_active
-            }
-            for m in active_meds
-        ]
-    )
+    Com o telefone completo, a resposta não vai para caches
+    compartilhados; o app revalida com If-None-Match.
+    """
+    profile = _get_profile_or_404(db, pet_id, request)
+    etag = make_etag(profile["etag"], "identified")
+    cache_control = "private, no-cache"
+    
+    cached = not_modified(request, etag, cache_control, profile["last_modified"])
+    if cached:
+        return cached
+    
+    set_cache_headers(response, etag, cache_control, profile["last_modified"])
+    # TELEFONE COMPLETO para identificação por biometria
+    return PetIdentifiedProfile(**profile)
 
 
 @router.get("/pet/{pet_id}", response_model=PetPublicProfile)
 async def get_public_pet_profile(
     pet_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
     """
@@ -136,68 +95,38 @@ async def get_public_pet_profile(
     
     Não requer autenticação - qualquer pessoa pode ver.
     Dados sensíveis são mascarados.
+    
+    Responde 304 se o If-None-Match/If-Modified-Since do cliente ainda
+    corresponde ao perfil atual.
     """
-    pet = db.query(Pet).filter(Pet.id == pet_id).first()
+    profile = _get_profile_or_404(db, pet_id, request)
+    etag = make_etag(profile["etag"], "public")
+    cache_control = public_cache_control(settings.PUBLIC_PROFILE_MAX_AGE)
+    edge_ttl = settings.EDGE_CACHE_PROFILE_TTL
     
-    if not pet:
+    cached = not_modified(request, etag, cache_control, profile["last_modified"], edge_ttl)
+    if cached:
+        return cached
+    
+    set_cache_headers(response, etag, cache_control, profile["last_modified"], edge_ttl)
+    owner_phone = profile["owner_phone"]
+    return PetPublicProfile(**{
+        **profile,
+        "owner_phone": mask_phone(owner_phone) if owner_phone else None,
+    })
+
+
+def _get_profile_or_404(db: Session, pet_id: int, request: Request) -> dict:
+    """Perfil do pet (uma query, com cache) ou 404"""
+    profile = pet_profile.get_pet_profile(db, pet_id, refresh=edge_cache.is_refresh(request.headers))
+    if not profile:
+        # O 404 também fica no nginx: substitui o perfil de um pet removido
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Pet não encontrado"
+            detail="Pet não encontrado",
+            headers={"X-Accel-Expires": str(settings.EDGE_CACHE_REPORTS_TTL)},
         )
-    
-    # Verifica se tem reporte de perdido ativo
-    is_lost = db.query(LostPetReport).filter(
-        LostPetReport.pet_id == pet_id,
-        LostPetReport.report_type == 'lost',
-        LostPetReport.status == 'active'
-    ).first() is not None
-    
-    # Verifica se tem biometria
-    has_biometry = db.query(SnoutBiometry).filter(
-        SnoutBiometry.pet_id == pet_id,
-        SnoutBiometry.is_active == True
-    ).first() is not None
-    
-    # Busca vacinas recentes (últimas 5)
-    vaccines = db.query(MedicalRecord).filter(
-        MedicalRecord.pet_id == pet_id,
-        MedicalRecord.type == 'vaccine'
-    ).order_by(MedicalRecord.event_date.desc()).limit(5).all()
-    
-    # Busca medicamentos ativos
-    active_meds = db.query(Medication).filter(
-        Medication.pet_id == pet_id,
-        Medication.is_active == True
-    ).all()
-    
-    # Busca dados do dono
-    owner = db.query(User).filter(User.id == pet.owner_id).first()
-    
-    return PetPublicProfile(
-        id=pet.id,
-        name=pet.name,
-        species=pet.species,
-        breed=pet.breed,
-        sex=pet.sex,
-        photo_url=pet.photo_url,
-        is_lost=is_lost,
-        owner_name=owner.full_name if owner else None,
-        owner_phone=mask_phone(owner.phone) if owner and owner.phone else None,
-        has_biometry=has_biometry,
-        vaccines=[
-            {"title": v.title, "event_date": v.event_date}
-            for v in vaccines
-        ],
-        active_medications=[
-            {
-                "name": m.name,
-                "dosage": m.dosage,
-                "frequency": m.frequency,
-                "is_active": m.is_active
-            }
-            for m in active_meds
-        ]
-    )
+    return profile
 
 
 # ==================== PETS PERDIDOS/ENCONTRADOS ====================
@@ -205,10 +134,17 @@ async def get_public_pet_profile(
 @router.post("/lost-pets/report", response_model=LostPetReportResponse, status_code=status.HTTP_201_CREATED)
 async def create_lost_pet_report(
     data: LostPetReportCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Reportar que seu pet está perdido"""
+    """
+    Reportar que seu pet está perdido.
+
+    Se o pet tem biometria, ele é comparado em background com os pets
+    encontrados já reportados (ver GET /lost-pets/{report_id}/matches).
+    Quem tem área de alerta cobrindo o local recebe um aviso.
+    """
     # Verifica se o pet pertence ao usuário
     pet = db.query(Pet).filter(
         Pet.id == data.pet_id,
@@ -251,6 +187,12 @@ async def create_lost_pet_report(
     db.add(report)
     db.commit()
     db.refresh(report)
+    map_clusters.invalidate_point(report.latitude, report.longitude)
+    pet_profile.invalidate_pet(report.pet_id)
+    await broker.publish("created", report_payload(report))
+    
+    background_tasks.add_task(run_lost_report_matching, report.id)
+    background_tasks.add_task(run_alert_fanout, report.id)
     
     return _build_report_response(report, pet)
 
@@ -258,10 +200,17 @@ async def create_lost_pet_report(
 @router.post("/lost-pets/found", response_model=LostPetReportResponse, status_code=status.HTTP_201_CREATED)
 async def create_found_pet_report(
     data: FoundPetReportCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Reportar que encontrou um pet"""
+    """
+    Reportar que encontrou um pet.
+
+    Com found_photo_url (foto do focinho enviada ao bucket), o embedding
+    é gerado em background e comparado com os pets perdidos ativos. Quem tem área de
+    alerta cobrindo o local recebe um aviso.
+    """
     pet = None
     if data.pet_id:
         pet = db.query(Pet).filter(Pet.id == data.pet_id).first()
@@ -281,73 +230,256 @@ async def create_found_pet_report(
         found_species=data.found_species,
         found_breed=data.found_breed,
         found_color=data.found_color,
+        found_photo_url=data.found_photo_url,
+        # Só fotos do bucket entram no pareamento (a API não baixa URLs externas)
+        match_status='pending' if photo_object_key(data.found_photo_url) else None,
         status='active'
     )
     
     db.add(report)
     db.commit()
     db.refresh(report)
+    map_clusters.invalidate_point(report.latitude, report.longitude)
+    await broker.publish("created", report_payload(report))
+    
+    if report.match_status == 'pending':
+        background_tasks.add_task(run_pending_found_matching)
+    background_tasks.add_task(run_alert_fanout, report.id)
     
     return _build_report_response(report, pet)
 
 
 @router.get("/lost-pets/nearby", response_model=List[LostPetReportResponse])
 async def get_nearby_lost_pets(
+    request: Request,
+    response: Response,
     latitude: float = Query(..., description="Latitude atual"),
     longitude: float = Query(..., description="Longitude atual"),
     radius_km: float = Query(10, ge=1, le=5000, description="Raio de busca em km"),
     report_type: Optional[str] = Query(None, description="Filtrar por tipo: lost, found"),
+    limit: int = Query(settings.NEARBY_PAGE_SIZE, ge=1, le=settings.NEARBY_PAGE_MAX_SIZE, description="Tamanho da página"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (header X-Next-Cursor)"),
+    include_total: bool = Query(False, description="Retorna a estimativa do total no header X-Total-Estimate"),
     db: Session = Depends(get_db),
 ):
     """
     Busca reportes de pets perdidos/encontrados próximos.
     
     Não requer autenticação para permitir que qualquer pessoa ajude.
+    
+    O raio é filtrado no banco pelo índice espacial dos reportes ativos e
+    os resultados vêm ordenados por (distância, id), em páginas de até
+    `limit` itens. Se houver mais resultados, o header X-Next-Cursor traz
+    o cursor para a próxima página (paginação por keyset: o custo não
+    cresce com o número da página).
+    
+    O ETag vem das linhas da página (id e updated_at do reporte e do pet)
+    e da versão do conjunto de reportes, que muda a cada criação,
+    resolução, remoção e expiração: se nada mudou, responde 304 sem
+    serializar a página. Não há Last-Modified, que não captaria reportes
+    que saíram do conjunto.
     """
-    query = db.query(LostPetReport).filter(
-        LostPetReport.status == 'active'
+    distance = geo.distance_km(LostPetReport.latitude, LostPetReport.longitude, latitude, longitude)
+    
+    query = db.query(LostPetReport, distance.label("distance_km")).filter(
+        LostPetReport.status == ACTIVE_STATUS,
+        geo.within_radius(LostPetReport.latitude, LostPetReport.longitude, latitude, longitude, radius_km)
     )
     
     if report_type:
         query = query.filter(LostPetReport.report_type == report_type)
     
-    reports = query.all()
+    total = None
+    if include_total:
+        capped = query.with_entities(LostPetReport.id).limit(settings.NEARBY_TOTAL_ESTIMATE_CAP).subquery()
+        total = db.execute(select(func.count()).select_from(capped)).scalar()
+    
+    if cursor:
+        last_distance, last_id = _decode_cursor(cursor)
+        query = query.filter(tuple_(distance, LostPetReport.id) > tuple_(last_distance, last_id))
+    
+    # Lida antes da página: uma alteração durante a query muda o ETag seguinte
+    version = reports_version()
+    
+    # Um item a mais indica se existe próxima página
+    rows = query.options(
+        joinedload(LostPetReport.pet)
+    ).order_by(distance, LostPetReport.id).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_report, last_distance = rows[-1]
+        next_cursor = _encode_cursor(last_distance, last_report.id)
+    
+    etag = make_etag(
+        latitude, longitude, radius_km, report_type, limit, cursor, version, total, next_cursor,
+        [(report.id, report.updated_at, report.pet.updated_at if report.pet else None) for report, _ in rows],
+    )
+    cache_control = public_cache_control(settings.PUBLIC_REPORTS_MAX_AGE)
+    edge_ttl = settings.EDGE_CACHE_REPORTS_TTL
+    
+    cached = not_modified(request, etag, cache_control, edge_ttl=edge_ttl)
+    if cached:
+        return cached
+    
+    set_cache_headers(response, etag, cache_control, edge_ttl=edge_ttl)
+    if total is not None:
+        response.headers["X-Total-Estimate"] = str(total)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
-    # Filtra por distância e adiciona informações
     results = []
-    for report in reports:
-        distance = haversine(longitude, latitude, report.longitude, report.latitude)
-        if distance <= radius_km:
-            pet = None
-            if report.pet_id:
-                pet = db.query(Pet).filter(Pet.id == report.pet_id).first()
-            
-            response = _build_report_response(report, pet)
-            response.distance_km = round(distance, 2)
-            results.append(response)
-    
-    # Ordena por distância
-    results.sort(key=lambda x: x.distance_km or 999)
+    for report, distance_km in rows:
+        item = _build_report_response(report, report.pet)
+        item.distance_km = round(distance_km, 2)
+        results.append(item)
     
     return results
 
 
+@router.get("/lost-pets/stream")
+async def stream_lost_pet_events(
+    request: Request,
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, ge=1, le=settings.REPORT_STREAM_MAX_RADIUS_KM, description="Raio em km"),
+    report_type: Optional[str] = Query(None, description="Filtrar por tipo: lost, found"),
+):
+    """
+    Feed em tempo real (Server-Sent Events) dos reportes de uma área.
+
+    Eventos `created`, `resolved` e `deleted` com os dados públicos do
+    reporte, mais um comentário de keep-alive periódico. O app carrega a
+    lista inicial com /lost-pets/nearby e depois só aplica os eventos, sem
+    polling. Se a conexão cair (ou o cliente não acompanhar o ritmo), o
+    app reconecta e recarrega a lista.
+    """
+    subscriber = Subscriber(latitude, longitude, radius_km, report_type)
+    broker.subscribe(subscriber)
+    
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while not subscriber.overflowed:
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=settings.REPORT_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event['report'])}\n\n"
+        finally:
+            broker.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: o nginx repassa cada evento sem bufferizar
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/lost-pets/clusters", response_model=MapClustersResponse)
+async def get_lost_pet_clusters(
+    request: Request,
+    response: Response,
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    zoom: int = Query(..., ge=0, le=map_clusters.MAX_ZOOM, description="Nível de zoom do mapa"),
+    db: Session = Depends(get_db),
+):
+    """
+    Reportes ativos agrupados em células para o mapa.
+
+    Cada cluster traz a contagem, o centroide e quantos são perdidos e
+    encontrados. A grade depende do zoom; os tiles são calculados no banco
+    e ficam em cache até algum reporte da área mudar.
+    """
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bounding box inválido"
+        )
+    
+    cells = map_clusters.get_clusters(db, min_lat, min_lon, max_lat, max_lon, zoom)
+    if cells is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Área grande demais para o zoom informado"
+        )
+    
+    etag = make_etag(zoom, cells)
+    cache_control = public_cache_control(settings.PUBLIC_REPORTS_MAX_AGE)
+    edge_ttl = settings.EDGE_CACHE_REPORTS_TTL
+    
+    cached = not_modified(request, etag, cache_control, edge_ttl=edge_ttl)
+    if cached:
+        return cached
+    
+    set_cache_headers(response, etag, cache_control, edge_ttl=edge_ttl)
+    return MapClustersResponse(
+        zoom=zoom,
+        total=sum(cell["count"] for cell in cells),
+        clusters=[MapCluster(**cell) for cell in cells],
+    )
+
+
 @router.get("/lost-pets/my-reports", response_model=List[LostPetReportResponse])
 async def get_my_reports(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Lista reportes criados pelo usuário"""
-    reports = db.query(LostPetReport).filter(
+    reports = db.query(LostPetReport).options(
+        joinedload(LostPetReport.pet)
+    ).filter(
         LostPetReport.reporter_id == current_user.id
     ).order_by(LostPetReport.created_at.desc()).all()
     
+    return [_build_report_response(report, report.pet) for report in reports]
+
+
+@router.get("/lost-pets/{report_id}/matches", response_model=List[LostPetMatchResponse])
+async def get_report_matches(
+    report_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Lista os candidatos a pareamento biométrico de um reporte.
+
+    Para um reporte de perdido, retorna os pets encontrados compatíveis;
+    para um de encontrado, os pets perdidos compatíveis. Os resultados são
+    pré-calculados em background.
+    """
+    report = db.query(LostPetReport).filter(
+        LostPetReport.id == report_id,
+        LostPetReport.reporter_id == current_user.id
+    ).first()
+    
+    if not report:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reporte não encontrado"
+        )
+    
     results = []
-    for report in reports:
-        pet = None
-        if report.pet_id:
-            pet = db.query(Pet).filter(Pet.id == report.pet_id).first()
-        results.append(_build_report_response(report, pet))
+    for match in ReportMatchingService(db).get_matches(report):
+        other = match.found_report if report.report_type == 'lost' else match.lost_report
+        results.append(LostPetMatchResponse(
+            id=match.id,
+            similarity=round(match.similarity, 4),
+            distance_km=round(match.distance_km, 2) if match.distance_km is not None else None,
+            status=match.status,
+            created_at=match.created_at,
+            report=_build_report_response(other, other.pet),
+        ))
     
     return results
 
@@ -372,7 +504,12 @@ async def resolve_report(
     
     report.status = 'resolved'
     report.resolved_at = datetime.utcnow()
+    payload = report_payload(report)
     db.commit()
+    map_clusters.invalidate_point(payload["latitude"], payload["longitude"])
+    if report.pet_id:
+        pet_profile.invalidate_pet(report.pet_id)
+    await broker.publish("resolved", payload)
     
     return {"message": "Reporte marcado como resolvido!"}
 
@@ -395,11 +532,36 @@ async def delete_report(
             detail="Reporte não encontrado"
         )
     
+    payload = report_payload(report)
     db.delete(report)
     db.commit()
+    map_clusters.invalidate_point(report.latitude, report.longitude)
+    if report.pet_id:
+        pet_profile.invalidate_pet(report.pet_id)
+    await broker.publish("deleted", payload)
     return None
 
 
+def _encode_cursor(distance_km: float, report_id: int) -> str:
+    """Cursor opaco com a chave (distância, id) do último item da página"""
+    # repr() preserva o float exato, para a comparação do keyset
+    raw = json.dumps([repr(distance_km), report_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Decodifica o cursor de _encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        distance_km, report_id = json.loads(raw)
+        return float(distance_km), int(report_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+
 def _build_report_response(report: LostPetReport, pet: Pet = None) -> LostPetReportResponse:
     """Constrói response do reporte"""
     return LostPetReportResponse(
@@ -425,4 +587,5 @@ def _build_report_response(report: LostPetReport, pet: Pet = None) -> LostPetRep
         found_breed=report.found_breed,
         found_color=report.found_color,
         found_photo_url=report.found_photo_url,
+        match_status=report.match_status,
     )
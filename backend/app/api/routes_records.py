@@ -9,6 +9,7 @@ from app.models.record import MedicalRecord
 from app.models.vaccine_reminder import VaccineReminder
 from app.schemas.record import MedicalRecordCreate, MedicalRecordUpdate, MedicalRecordResponse
 from app.core.security import get_current_user
+from app.services import pet_profile
 
 router = APIRouter()
 
@@ -52,6 +53,7 @@ async def create_record(
     db.add(new_record)
     db.commit()
     db.refresh(new_record)
+    pet_profile.invalidate_pet(pet_id)
     
     # Se for vacina, cria automaticamente um VaccineReminder
     if record_data.type == 'vaccine':
@@ -154,6 +156,7 @@ async def update_record(
     
     db.commit()
     db.refresh(record)
+    pet_profile.invalidate_pet(pet_id)
     
     return record
 
@@ -182,6 +185,7 @@ async def delete_record(
     
     db.delete(record)
     db.commit()
+    pet_profile.invalidate_pet(pet_id)
     
     return None
 
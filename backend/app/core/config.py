@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -21,6 +21,128 @@ class Settings(BaseSettings):
     S3_REGION: str = "us-east-1"
     S3_USE_SSL: bool = False
     
+    # ML (biometria)
+    ML_ENABLED: bool = True  # False: não carrega torch/modelo, delega ao nó de ML
+    # Nó de ML usado se ML_ENABLED=false:
+    #   unix:///tmp/petid-ml.sock ou tcp://ml:9100 -> serviço de embeddings (app.ml_server)
+    #   http://ml:8000 -> outra instância da API com ML habilitado
+    ML_SERVICE_URL: Optional[str] = None
+    ML_SERVICE_TOKEN: str = ""  # Token compartilhado entre nós da API e nó de ML (http)
+    ML_SERVICE_TIMEOUT: float = 10.0  # Segundos
+    ML_SERVICE_POOL_SIZE: int = 4  # Conexões simultâneas por worker com o serviço de embeddings
+
+    # Limites de imagem (proteção contra decompression bombs)
+    IMAGE_MAX_BYTES: int = 10 * 1024 * 1024  # Tamanho máximo do arquivo
+    IMAGE_MAX_PIXELS: int = 40_000_000  # Acima disso a imagem é rejeitada
+    IMAGE_MAX_SIDE: int = 2048  # Imagens maiores são decodificadas reduzidas
+    IMAGE_MAX_FRAMES: int = 2  # MPO de celulares tem 2 quadros; animações são rejeitadas
+
+    # Tamanho máximo do corpo das requisições (verificado durante o streaming)
+    MAX_REQUEST_BODY_BYTES: int = 50 * 1024 * 1024
+    BIOMETRY_MAX_BODY_BYTES: int = 30 * 1024 * 1024
+
+    # Detecção do focinho (recorte antes do modelo). Só recorta com um
+    # cascade treinado em SNOUT_CASCADE_PATH. Mudar o recorte exige
+    # reprocessar a galeria: python -m app.reembed_biometries
+    SNOUT_DETECTION_ENABLED: bool = False
+    SNOUT_CASCADE_PATH: Optional[str] = None  # Cascade OpenCV treinado
+    BIOMETRY_SOURCE_IMAGE_PREFIX: str = "biometry/"  # Fotos do cadastro no bucket (para reprocessar)
+
+    # Busca biométrica (calibre com evaluate_threshold.py)
+    BIOMETRY_MATCH_THRESHOLD: float = 0.85  # Similaridade mínima para considerar o mesmo animal
+    BIOMETRY_ANN_OVERFETCH: int = 4  # Candidatos do índice IVFFlat = max_results * fator
+    BIOMETRY_NEARBY_RADIUS_KM: float = 20.0  # Raio da busca entre pets perdidos próximos
+
+    # Embeddings calculados no app (modelo quantizado on-device)
+    CLIENT_EMBEDDING_ENABLED: bool = True
+    CLIENT_EMBEDDING_MODEL_VERSIONS: List[str] = [
+        "BVRA/MegaDescriptor-T-224",
+        "BVRA/MegaDescriptor-T-224-int8",
+    ]
+    CLIENT_EMBEDDING_NORM_TOLERANCE: float = 0.02  # | ||v|| - 1 | aceito
+    CLIENT_EMBEDDING_VERIFY_RATE: float = 0.05  # Fração recalculada no servidor a partir da miniatura
+    CLIENT_EMBEDDING_MIN_AGREEMENT: float = 0.90  # Similaridade mínima cliente x servidor
+    CLIENT_THUMBNAIL_MAX_BYTES: int = 256 * 1024
+
+    # Paginação da busca de reportes próximos (/public/lost-pets/nearby)
+    NEARBY_PAGE_SIZE: int = 50
+    NEARBY_PAGE_MAX_SIZE: int = 200
+    NEARBY_TOTAL_ESTIMATE_CAP: int = 10000  # X-Total-Estimate informa no máximo este valor
+
+    # Clusters do mapa (/public/lost-pets/clusters), cache por tile em cada worker,
+    # invalidado em todos os processos pelas versões no Redis (REDIS_URL)
+    CLUSTER_CACHE_TTL_SECONDS: float = 30.0
+    CLUSTER_CACHE_MAX_TILES: int = 20000
+
+    # Perfil público do pet (QR Code), cache por pet em cada worker,
+    # invalidado em todos os processos pelas versões no Redis (REDIS_URL)
+    PET_PROFILE_CACHE_TTL_SECONDS: float = 60.0
+    PET_PROFILE_CACHE_MAX_ITEMS: int = 10000
+
+    # Versões dos caches em memória no Redis (ver app.services.cache)
+    CACHE_VERSION_TTL_SECONDS: int = 86400
+    CACHE_REDIS_TIMEOUT: float = 0.5  # Segundos; sem resposta, o cache é ignorado
+
+    # Cache-Control das respostas públicas (segundos); o cliente revalida
+    # com ETag depois disso
+    PUBLIC_PROFILE_MAX_AGE: int = 60
+    PUBLIC_REPORTS_MAX_AGE: int = 15
+
+    # Micro-cache do nginx para /api/v1/public (X-Accel-Expires, segundos).
+    # Perfis são atualizados a cada alteração (EDGE_CACHE_PURGE_URL); listas
+    # de reportes dependem só do tempo curto
+    EDGE_CACHE_PROFILE_TTL: int = 60
+    EDGE_CACHE_REPORTS_TTL: int = 5
+    EDGE_CACHE_PURGE_URL: str = ""  # Ex.: http://nginx (vazio = desligado)
+    EDGE_CACHE_REFRESH_TOKEN: str = ""  # Segredo compartilhado com o nginx (vazio = desligado)
+    EDGE_CACHE_PURGE_TIMEOUT: float = 2.0
+
+    # Expiração de reportes antigos (python -m app.expire_reports)
+    LOST_REPORT_EXPIRY_DAYS: int = 90
+    FOUND_REPORT_EXPIRY_DAYS: int = 30
+    REPORT_EXPIRY_BATCH_SIZE: int = 1000
+
+    # Feed em tempo real (SSE) de /public/lost-pets/stream. Com REDIS_URL
+    # os eventos passam pelo Redis e chegam às conexões de todos os workers
+    REDIS_URL: Optional[str] = None  # Ex.: redis://redis:6379/0
+    REPORT_STREAM_QUEUE_SIZE: int = 100  # Eventos pendentes por conexão antes de derrubá-la
+    REPORT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    REPORT_STREAM_MAX_RADIUS_KM: float = 100.0
+    REPORT_STREAM_REDIS_RETRY_SECONDS: float = 5.0
+
+    # Alertas por área (inscrições indexadas por célula da grade)
+    ALERT_MAX_RADIUS_KM: float = 50.0
+    ALERT_MAX_SUBSCRIPTIONS_PER_USER: int = 10
+    ALERT_ENQUEUE_BATCH_SIZE: int = 5000  # Inscrições por INSERT ... SELECT
+
+    # Pareamento automático de reportes encontrado x perdido
+    REPORT_MATCH_BATCH_SIZE: int = 16  # Fotos de pets encontrados por forward pass
+    REPORT_MATCH_MAX_CANDIDATES: int = 10  # Candidatos guardados por reporte
+    REPORT_PHOTO_FETCH_TIMEOUT: float = 10.0  # Segundos para baixar a foto
+    REPORT_MATCH_CLAIM_TIMEOUT_SECONDS: int = 600  # Lote reservado há mais tempo volta para a fila
+    REPORT_MATCH_MAX_ATTEMPTS: int = 5  # Falhas de S3/modelo antes de desistir ('failed')
+    REPORT_MATCH_RETRY_BACKOFF_SECONDS: float = 60.0  # Espera antes da 2ª tentativa (dobra a cada uma)
+
+    # Índice ANN reduzido (python -m app.reduce_embeddings): candidatos pelo
+    # vetor projetado (128 dims), rerank pelo embedding completo
+    BIOMETRY_REDUCED_INDEX_ENABLED: bool = False
+    BIOMETRY_PROJECTION_PATH: str = "/app/data/embedding_projection.npz"
+    BIOMETRY_REDUCED_OVERFETCH: int = 10  # Candidatos reduzidos = max_results * fator
+
+    # Job de detecção de cadastros duplicados (python -m app.detect_duplicates)
+    BIOMETRY_DUPLICATE_THRESHOLD: float = 0.95
+    BIOMETRY_DUPLICATE_BLOCK_SIZE: int = 4096  # Bloco da multiplicação: 4096² floats = 64 MB
+
+    # Test-time augmentation por endpoint (~5x o custo de inferência quando ligado)
+    BIOMETRY_TTA_REGISTER: bool = True
+    BIOMETRY_TTA_SEARCH: bool = False
+
+    # Serviço de embeddings standalone (python -m app.ml_server)
+    ML_SERVER_BIND: str = "unix:///tmp/petid-ml.sock"
+    ML_BATCH_MAX_SIZE: int = 16
+    ML_BATCH_MAX_WAIT_MS: float = 10.0
+    ML_QUEUE_MAX_SIZE: int = 64  # Acima disso responde "ocupado"
+
     # App
     APP_NAME: str = "PetID"
     DEBUG: bool = True
@@ -0,0 +1,93 @@
+"""
+Cache HTTP condicional (ETag / Last-Modified) para os endpoints públicos.
+
+As rotas calculam o validador (hash do conteúdo ou dos updated_at das
+linhas envolvidas) antes de montar a resposta; se o cliente já tem essa
+versão, respondem 304 sem serializar nada.
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """ETag forte a partir de valores serializáveis (datas viram ISO)."""
+    payload = json.dumps(parts, default=str, sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.sha1(payload.encode()).hexdigest()[:20] + '"'
+
+
+def public_cache_control(max_age: int) -> str:
+    """Cache-Control de resposta pública (clientes e proxies)."""
+    return f"public, max-age={max_age}, stale-while-revalidate={max_age}"
+
+
+def set_cache_headers(
+    response: Response,
+    etag: str,
+    cache_control: str,
+    last_modified: Optional[datetime] = None,
+    edge_ttl: Optional[int] = None,
+):
+    """
+    Headers de cache da resposta. edge_ttl vira X-Accel-Expires: tempo no
+    micro-cache do nginx (que não repassa o header ao cliente).
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    if last_modified:
+        response.headers["Last-Modified"] = _http_date(last_modified)
+    if edge_ttl:
+        response.headers["X-Accel-Expires"] = str(edge_ttl)
+
+
+def not_modified(
+    request: Request,
+    etag: str,
+    cache_control: str,
+    last_modified: Optional[datetime] = None,
+    edge_ttl: Optional[int] = None,
+) -> Optional[Response]:
+    """
+    Resposta 304 se a versão do cliente ainda vale, senão None.
+
+    If-None-Match tem precedência; If-Modified-Since só é considerado
+    quando o cliente não manda ETag (RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        fresh = "*" in tags or etag in tags
+    else:
+        fresh = _not_modified_since(request.headers.get("if-modified-since"), last_modified)
+
+    if not fresh:
+        return None
+
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag, cache_control, last_modified, edge_ttl)
+    return response
+
+
+def _not_modified_since(header: Optional[str], last_modified: Optional[datetime]) -> bool:
+    if not header or not last_modified:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since is None:
+        return False
+    # Last-Modified tem resolução de segundos
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Os modelos gravam datetime.utcnow() (sem fuso)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value), usegmt=True)
@@ -0,0 +1,31 @@
+"""
+Job periódico de detecção de cadastros duplicados.
+
+Compara todas as biometrias ativas (ver DuplicateDetectionService) e grava
+os pares suspeitos em biometry_duplicate_candidates para revisão.
+
+Uso (ex.: cron diário):
+    python -m app.detect_duplicates [--threshold 0.95] [--block-size 4096]
+"""
+import argparse
+import logging
+from app.db.session import SessionLocal
+from app.services.duplicate_detection_service import DuplicateDetectionService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detecta biometrias duplicadas")
+    parser.add_argument("--threshold", type=float, default=None, help="Similaridade mínima do par")
+    parser.add_argument("--block-size", type=int, default=None, help="Linhas por bloco da multiplicação")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        DuplicateDetectionService(db).run(threshold=args.threshold, block_size=args.block_size)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
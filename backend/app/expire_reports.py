@@ -0,0 +1,50 @@
+"""
+Job de expiração dos reportes de pets perdidos/encontrados antigos.
+
+Uso:
+    python -m app.expire_reports              # expira os vencidos e sai
+    python -m app.expire_reports --loop 3600  # repete a cada hora
+
+Idades em LOST_REPORT_EXPIRY_DAYS e FOUND_REPORT_EXPIRY_DAYS. Pode rodar
+em mais de um processo ao mesmo tempo (lotes com SKIP LOCKED).
+"""
+import argparse
+import logging
+import time
+from app.db.session import SessionLocal
+from app.services.report_expiry import expire_stale_reports
+
+logger = logging.getLogger(__name__)
+
+
+def run_once() -> int:
+    db = SessionLocal()
+    try:
+        return expire_stale_reports(db)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expiração de reportes antigos")
+    parser.add_argument("--loop", type=float, default=None, metavar="SEGUNDOS",
+                        help="Continua rodando, repetindo no intervalo informado")
+    args = parser.parse_args()
+
+    while True:
+        try:
+            expired = run_once()
+            if expired:
+                logger.info(f"{expired} reporte(s) expirado(s)")
+        except Exception as e:
+            if args.loop is None:
+                raise
+            logger.error(f"Erro na expiração de reportes: {e}")
+        if args.loop is None:
+            break
+        time.sleep(args.loop)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
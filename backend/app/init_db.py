@@ -1,8 +1,15 @@
+from sqlalchemy import text
 from app.db.session import engine, Base
 from app.models import *  # Import all models to register them with Base
 from app.create_admin import create_admin
 
 def init_db():
+    print("Creating extensions...")
+    with engine.begin() as conn:
+        # vector: embeddings; cube + earthdistance: índice espacial dos reportes
+        for extension in ("vector", "cube", "earthdistance"):
+            conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
     print("Tables created successfully.")
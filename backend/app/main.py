@@ -1,7 +1,7 @@
 from fastapi import FastAPI, APIRouter, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from app.api import routes_auth, routes_pets, routes_records, routes_attachments, routes_audit, routes_biometry, routes_vaccines, routes_public, routes_veterinarians, routes_medications, routes_documents
+from app.api import routes_auth, routes_pets, routes_records, routes_attachments, routes_audit, routes_biometry, routes_vaccines, routes_public, routes_veterinarians, routes_medications, routes_documents, routes_alerts
 from app.core.config import settings
 from collections import defaultdict
 import time
@@ -22,6 +22,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Estimate"],  # Paginação de /public/lost-pets/nearby
 )
 
 
@@ -52,6 +53,78 @@ class RateLimiter:
 rate_limiter = RateLimiter(requests_per_minute=100)
 
 
+class BodySizeLimitMiddleware:
+    """
+    Limita o tamanho do corpo das requisições.
+
+    Rejeita pelo Content-Length antes de ler qualquer byte e, para corpos
+    sem Content-Length (chunked), conta os bytes conforme chegam: ao passar
+    do limite responde 413 e sinaliza desconexão para a aplicação, sem
+    bufferizar o corpo inteiro.
+    """
+
+    def __init__(self, app, max_body_size: int, path_limits: dict = None):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_limits = path_limits or {}
+
+    def _limit_for(self, path: str) -> int:
+        for prefix, limit in self.path_limits.items():
+            if path.startswith(prefix):
+                return limit
+        return self.max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        limit = self._limit_for(scope["path"])
+        too_large = JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content={"detail": f"Requisição muito grande. Máximo: {limit // (1024 * 1024)} MB"},
+        )
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            return await too_large(scope, receive, send)
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    if not response_started and not rejected:
+                        rejected = True
+                        await too_large(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if rejected:
+                # Já respondemos 413; descarta a resposta de erro da aplicação
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        await self.app(scope, limited_receive, tracked_send)
+
+
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=settings.MAX_REQUEST_BODY_BYTES,
+    path_limits={
+        "/api/v1/biometry": settings.BIOMETRY_MAX_BODY_BYTES,
+    },
+)
+
+
 @app.middleware("http")
 async def rate_limit_middleware(request: Request, call_next):
     """Middleware de rate limiting"""
@@ -89,6 +162,7 @@ api_v1_router.include_router(routes_public.router, prefix="/public", tags=["Púb
 api_v1_router.include_router(routes_veterinarians.router, prefix="/pets", tags=["Veterinários"])
 api_v1_router.include_router(routes_medications.router, prefix="/pets", tags=["Medicamentos"])
 api_v1_router.include_router(routes_documents.router, prefix="/pets", tags=["Documentos"])
+api_v1_router.include_router(routes_alerts.router, prefix="/alerts", tags=["Alertas"])
 
 # Incluir router versionado no app
 app.include_router(api_v1_router)
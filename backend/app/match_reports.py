@@ -0,0 +1,53 @@
+"""
+Worker do pareamento biométrico de reportes encontrado x perdido.
+
+As tarefas de background da API processam cada reporte logo após a
+criação; este worker recupera o que ficou pendente (ex.: reinício da API)
+e pode rodar continuamente como processo dedicado.
+
+Uso:
+    python -m app.match_reports            # processa os pendentes e sai
+    python -m app.match_reports --loop 30  # verifica a cada 30 segundos
+"""
+import argparse
+import logging
+import time
+from app.db.session import SessionLocal
+from app.services.report_matching_service import ReportMatchingService
+
+logger = logging.getLogger(__name__)
+
+
+def process_all() -> int:
+    """Processa lotes até não restar reporte pendente."""
+    db = SessionLocal()
+    try:
+        service = ReportMatchingService(db)
+        total = 0
+        while True:
+            processed = service.process_pending_found()
+            if not processed:
+                return total
+            total += processed
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pareamento de reportes encontrado x perdido")
+    parser.add_argument("--loop", type=float, default=None, metavar="SEGUNDOS",
+                        help="Continua rodando, verificando pendentes no intervalo informado")
+    args = parser.parse_args()
+
+    while True:
+        processed = process_all()
+        if processed:
+            logger.info(f"{processed} reporte(s) de encontrado processado(s)")
+        if args.loop is None:
+            break
+        time.sleep(args.loop)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,150 @@
+"""
+Serviço de embeddings standalone (processo separado da API).
+
+Carrega o MegaDescriptor uma única vez e atende requisições no protocolo
+binário de app.services.ml_protocol, via Unix socket ou TCP local. As
+requisições de várias conexões são agrupadas em lotes (até
+ML_BATCH_MAX_SIZE imagens ou ML_BATCH_MAX_WAIT_MS de espera) e processadas
+em um único forward pass.
+
+A fila é limitada (ML_QUEUE_MAX_SIZE): quando o modelo não dá conta, o
+servidor responde "ocupado" imediatamente em vez de acumular trabalho, e a
+API nunca fica presa esperando.
+
+Uso:
+    ML_SERVER_BIND=unix:///tmp/petid-ml.sock python -m app.ml_server
+    ML_SERVER_BIND=tcp://0.0.0.0:9100 python -m app.ml_server
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from app.core.config import settings
+from app.services.ml_embedding_service import MLEmbeddingService
+from app.services.ml_protocol import (
+    REQUEST_HEADER,
+    STATUS_BUSY,
+    STATUS_ERROR,
+    STATUS_OK,
+    ProtocolError,
+    decode_request_header,
+    decode_request_payload,
+    encode_response,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingServer:
+    """Servidor asyncio com loop de batching na frente do modelo."""
+
+    def __init__(
+        self,
+        service: MLEmbeddingService,
+        max_batch_size: int,
+        max_wait_ms: float,
+        queue_size: int,
+    ):
+        self.service = service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Uma única thread de inferência: o paralelismo fica dentro do torch
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ml-inference")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende requisições de uma conexão (mantida aberta pelo pool do cliente)."""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                header = await reader.readexactly(REQUEST_HEADER.size)
+                op, length = decode_request_header(header)
+                image_data, snout_bbox, tta = decode_request_payload(op, await reader.readexactly(length))
+
+                future = loop.create_future()
+                try:
+                    self.queue.put_nowait((image_data, snout_bbox, tta, future))
+                except asyncio.QueueFull:
+                    writer.write(encode_response(STATUS_BUSY, issues=["Serviço de ML ocupado"]))
+                    await writer.drain()
+                    continue
+
+                embedding, quality, issues = await future
+                status = STATUS_OK if embedding is not None else STATUS_ERROR
+                writer.write(encode_response(status, embedding, quality, issues))
+                await writer.drain()
+
+        except asyncio.IncompleteReadError:
+            # Cliente fechou a conexão
+            pass
+        except ProtocolError as e:
+            logger.warning(f"Requisição inválida: {e}")
+            writer.write(encode_response(STATUS_ERROR, issues=[str(e)]))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def batch_loop(self):
+        """Agrupa requisições pendentes e roda um forward pass por lote."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            images = [item[0] for item in batch]
+            snout_bboxes = [item[1] for item in batch]
+            tta = [item[2] for item in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.service.generate_embeddings_batch, images, snout_bboxes, tta
+                )
+            except Exception as e:
+                logger.error(f"Erro no lote de inferência: {e}")
+                results = [(None, 0, [f"Erro interno: {e}"])] * len(batch)
+
+            for item, result in zip(batch, results):
+                future = item[3]
+                if not future.done():
+                    future.set_result(result)
+
+
+async def serve(bind: str):
+    """Sobe o servidor no endereço unix:// ou tcp:// informado."""
+    service = MLEmbeddingService()
+    service._load_model()
+
+    server = EmbeddingServer(
+        service,
+        max_batch_size=settings.ML_BATCH_MAX_SIZE,
+        max_wait_ms=settings.ML_BATCH_MAX_WAIT_MS,
+        queue_size=settings.ML_QUEUE_MAX_SIZE,
+    )
+
+    address = urlparse(bind)
+    if address.scheme == "unix":
+        listener = await asyncio.start_unix_server(server.handle_connection, path=address.path)
+    elif address.scheme == "tcp":
+        listener = await asyncio.start_server(server.handle_connection, address.hostname, address.port)
+    else:
+        raise ValueError(f"ML_SERVER_BIND inválido: {bind} (use unix:///caminho ou tcp://host:porta)")
+
+    logger.info(f"Serviço de embeddings ouvindo em {bind}")
+
+    async with listener:
+        await asyncio.gather(listener.serve_forever(), server.batch_loop())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve(settings.ML_SERVER_BIND))
@@ -7,14 +7,18 @@ from app.models.audit_log import AuditLog
 from app.models.snout_biometry import SnoutBiometry
 from app.models.vaccine_reminder import VaccineReminder
 from app.models.lost_pet import LostPetReport
+from app.models.lost_pet_match import LostPetMatch
 from app.models.veterinarian import Veterinarian
 from app.models.medication import Medication, MedicationLog
 from app.models.document import PetDocument
+from app.models.biometry_duplicate import BiometryDuplicateCandidate
+from app.models.alert import AlertSubscription, AlertSubscriptionCell, AlertNotification
 
 __all__ = [
     "User", "Pet", "MedicalRecord", "Attachment", 
     "Permission", "AuditLog", "SnoutBiometry", "VaccineReminder",
-    "LostPetReport", "Veterinarian", "Medication", "MedicationLog",
-    "PetDocument"
+    "LostPetReport", "LostPetMatch", "Veterinarian", "Medication", "MedicationLog",
+    "PetDocument", "BiometryDuplicateCandidate",
+    "AlertSubscription", "AlertSubscriptionCell", "AlertNotification"
 ]
 
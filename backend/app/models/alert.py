@@ -0,0 +1,63 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Float, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.session import Base
+
+
+class AlertSubscription(Base):
+    """Área (ponto + raio) em que o usuário quer ser avisado de novos reportes"""
+    __tablename__ = "alert_subscriptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    label = Column(String, nullable=True)  # Ex.: "Casa", "Trabalho"
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    radius_km = Column(Float, nullable=False)
+    report_type = Column(String, nullable=True)  # 'lost', 'found' ou None para ambos
+    is_active = Column(Boolean, default=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    user = relationship("User")
+    cells = relationship("AlertSubscriptionCell", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class AlertSubscriptionCell(Base):
+    """
+    Índice espacial das inscrições: uma linha por célula da grade que a
+    área da inscrição toca (ver app.services.alert_service).
+    """
+    __tablename__ = "alert_subscription_cells"
+
+    # PK (cell_id, subscription_id): busca por célula em ordem de inscrição
+    cell_id = Column(BigInteger, primary_key=True)
+    subscription_id = Column(Integer, ForeignKey("alert_subscriptions.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+class AlertNotification(Base):
+    """Aviso de um reporte novo para um usuário inscrito na área"""
+    __tablename__ = "alert_notifications"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    subscription_id = Column(Integer, ForeignKey("alert_subscriptions.id", ondelete="CASCADE"), nullable=False)
+    report_id = Column(Integer, ForeignKey("lost_pet_reports.id", ondelete="CASCADE"), nullable=False)
+    distance_km = Column(Float, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    read_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    report = relationship("LostPetReport")
+
+    __table_args__ = (
+        # Um aviso por usuário e reporte, mesmo com inscrições sobrepostas
+        UniqueConstraint('user_id', 'report_id', name='uq_alert_notification_user_report'),
+        Index('ix_alert_notifications_user_id_id', 'user_id', 'id'),
+    )
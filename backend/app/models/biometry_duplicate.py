@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.session import Base
+
+
+class BiometryDuplicateCandidate(Base):
+    """Par de biometrias suspeito de ser o mesmo animal (fila de revisão)"""
+    __tablename__ = "biometry_duplicate_candidates"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Sempre biometry_a_id < biometry_b_id (um registro por par)
+    biometry_a_id = Column(Integer, ForeignKey("snout_biometries.id", ondelete="CASCADE"), nullable=False)
+    biometry_b_id = Column(Integer, ForeignKey("snout_biometries.id", ondelete="CASCADE"), nullable=False)
+    pet_a_id = Column(Integer, ForeignKey("pets.id", ondelete="CASCADE"), nullable=False)
+    pet_b_id = Column(Integer, ForeignKey("pets.id", ondelete="CASCADE"), nullable=False)
+    
+    similarity = Column(Float, nullable=False)
+    
+    # Status da revisão
+    status = Column(String, default='pending')  # 'pending', 'confirmed', 'dismissed'
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    reviewed_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    pet_a = relationship("Pet", foreign_keys=[pet_a_id])
+    pet_b = relationship("Pet", foreign_keys=[pet_b_id])
+    
+    __table_args__ = (
+        UniqueConstraint('biometry_a_id', 'biometry_b_id', name='uq_biometry_duplicate_pair'),
+        Index('ix_biometry_duplicate_candidates_status', 'status'),
+    )
@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Boolean, Text, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Boolean, Text, Float, Index, func, literal_column, text
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
+from pgvector.sqlalchemy import Vector
 from app.db.session import Base
 
 
+# Status ativo como literal (não parâmetro): com prepared statements o
+# planner só usa os índices parciais "WHERE status = 'active'" se o valor
+# estiver no SQL
+ACTIVE_STATUS = literal_column("'active'")
+
+
 class LostPetReport(Base):
     """Reportes de pets perdidos/encontrados"""
     __tablename__ = "lost_pet_reports"
@@ -35,6 +42,13 @@ class LostPetReport(Base):
     found_color = Column(String, nullable=True)
     found_photo_url = Column(String, nullable=True)
     
+    # Embedding do focinho da foto do pet encontrado (gerado em background)
+    found_embedding = deferred(Column(Vector(768), nullable=True))  # Não carregado nas listagens
+    # Pareamento biométrico: 'pending', 'processing', 'done', 'failed' (None = sem foto)
+    match_status = Column(String, nullable=True)
+    match_claimed_at = Column(DateTime, nullable=True)  # Reserva do lote em 'processing'
+    match_attempts = Column(Integer, nullable=False, default=0, server_default='0')  # Reservas feitas
+    
     # Data do evento
     event_date = Column(Date, nullable=False)
     
@@ -46,3 +60,32 @@ class LostPetReport(Base):
     # Relationships
     pet = relationship("Pet", backref="lost_reports")
     reporter = relationship("User", backref="lost_pet_reports")
+    
+    # Índice espacial (cube + earthdistance) só dos reportes ativos, usados
+    # pelas buscas por proximidade
+    __table_args__ = (
+        Index(
+            'ix_lost_pet_reports_earth_active',
+            func.ll_to_earth(latitude, longitude),
+            postgresql_using='gist',
+            postgresql_where=text("status = 'active'")
+        ),
+        # Filtro por bbox dos clusters do mapa
+        Index(
+            'ix_lost_pet_reports_lat_lon_active',
+            latitude, longitude,
+            postgresql_where=text("status = 'active'")
+        ),
+        # Fila do pareamento automático (aguardando embedding ou reservados)
+        Index(
+            'ix_lost_pet_reports_match_pending',
+            id,
+            postgresql_where=text("match_status IN ('pending', 'processing')")
+        ),
+        # Varredura da expiração (python -m app.expire_reports)
+        Index(
+            'ix_lost_pet_reports_created_at_active',
+            created_at,
+            postgresql_where=text("status = 'active'")
+        ),
+    )
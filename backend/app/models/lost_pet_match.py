@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.session import Base
+
+
+class LostPetMatch(Base):
+    """Candidato a pareamento entre um reporte de perdido e um de encontrado"""
+    __tablename__ = "lost_pet_matches"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    lost_report_id = Column(Integer, ForeignKey("lost_pet_reports.id", ondelete="CASCADE"), nullable=False, index=True)
+    found_report_id = Column(Integer, ForeignKey("lost_pet_reports.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    # Similaridade biométrica (focinho) e distância entre os reportes
+    similarity = Column(Float, nullable=False)
+    distance_km = Column(Float, nullable=True)
+    
+    # Status
+    status = Column(String, default='suggested')  # 'suggested', 'confirmed', 'dismissed'
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    lost_report = relationship("LostPetReport", foreign_keys=[lost_report_id])
+    found_report = relationship("LostPetReport", foreign_keys=[found_report_id])
+    
+    __table_args__ = (
+        UniqueConstraint('lost_report_id', 'found_report_id', name='uq_lost_pet_match_pair'),
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Boolean, Float, Index
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from pgvector.sqlalchemy import Vector
@@ -15,6 +16,21 @@ class SnoutBiometry(Base):
     # Embedding do focinho (768 dimensões - MegaDescriptor Swin Transformer)
     embedding = Column(Vector(768), nullable=False)
     
+    # Embedding projetado (PCA/aleatória) para o índice ANN; o rerank usa o
+    # completo. NULL enquanto a projeção não for ajustada/aplicada
+    embedding_reduced = Column(Vector(128), nullable=True)
+    
+    # Hash perceptual (dHash 64 bits) do recorte do focinho; reenvio da
+    # mesma foto do mesmo pet não roda o modelo
+    perceptual_hash = Column(BigInteger, nullable=True)
+    
+    # Foto do cadastro no bucket, caixa do focinho informada pelo app e
+    # recorte usado no embedding ('client', 'cascade', 'full'), para
+    # reprocessar a galeria (python -m app.reembed_biometries)
+    source_image_key = Column(String, nullable=True)
+    source_snout_bbox = Column(ARRAY(Float), nullable=True)
+    crop_mode = Column(String, nullable=True)
+    
     # Metadados
     quality_score = Column(Integer, nullable=True)  # 0-100, qualidade da imagem capturada
     is_active = Column(Boolean, default=True)  # Permite desativar sem deletar
@@ -34,5 +50,12 @@ class SnoutBiometry(Base):
             postgresql_with={'lists': 100},
             postgresql_ops={'embedding': 'vector_cosine_ops'}
         ),
+        Index(
+            'ix_snout_biometries_embedding_reduced',
+            embedding_reduced,
+            postgresql_using='ivfflat',
+            postgresql_with={'lists': 100},
+            postgresql_ops={'embedding_reduced': 'vector_cosine_ops'}
+        ),
     )
 
@@ -0,0 +1,267 @@
+"""
+Ajuste e aplicação da projeção dos embeddings para o índice ANN reduzido.
+
+Uso:
+    python -m app.reduce_embeddings fit [--method pca|random] [--sample 50000]
+    python -m app.reduce_embeddings apply
+    python -m app.reduce_embeddings report [--queries 200] [--k 5]
+
+fit ajusta a projeção sobre uma amostra de snout_biometries, preenche
+embedding_reduced de toda a galeria, reconstrói o índice IVFFlat da coluna
+e só então publica o arquivo em BIOMETRY_PROJECTION_PATH (a API recarrega
+sozinha). Registros alterados durante o processo são reprojetados no final.
+
+apply reprojeta a galeria com a projeção já publicada e reconstrói o índice.
+
+report compara recall@k e latência de três estratégias contra a busca
+exata (varredura completa): IVFFlat no embedding completo, IVFFlat no
+reduzido com rerank, e mostra o ganho de latência.
+
+Ative na API com BIOMETRY_REDUCED_INDEX_ENABLED=true.
+"""
+import argparse
+import logging
+import os
+import time
+from datetime import datetime
+import numpy as np
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.embedding_projection import REDUCED_DIM, EmbeddingProjection, to_pgvector
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+
+
+def print_header(text):
+    """Imprime cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f"  {text}")
+    print("=" * 60)
+
+
+def _parse_vector(value: str) -> np.ndarray:
+    return np.array(value.strip("[]").split(","), dtype=np.float32)
+
+
+def load_sample(db, size: int) -> np.ndarray:
+    """Amostra aleatória de embeddings ativos (TABLESAMPLE não garante tamanho)."""
+    rows = db.execute(text("""
+        SELECT embedding::text FROM snout_biometries
+        WHERE is_active = true
+        ORDER BY random()
+        LIMIT :size
+    """), {"size": size}).fetchall()
+    return np.stack([_parse_vector(row[0]) for row in rows]) if rows else np.empty((0, 768), np.float32)
+
+
+def project_gallery(db, projection: EmbeddingProjection, updated_since: datetime = None) -> int:
+    """Preenche embedding_reduced em lotes (keyset por id)."""
+    last_id, total = 0, 0
+    since_filter = "AND updated_at >= :since" if updated_since else ""
+
+    while True:
+        rows = db.execute(text(f"""
+            SELECT id, embedding::text FROM snout_biometries
+            WHERE id > :last_id {since_filter}
+            ORDER BY id
+            LIMIT :batch
+        """), {"last_id": last_id, "batch": BATCH_SIZE, "since": updated_since}).fetchall()
+        if not rows:
+            return total
+
+        reduced = projection.transform(np.stack([_parse_vector(row[1]) for row in rows]))
+        db.execute(text("""
+            UPDATE snout_biometries sb
+            SET embedding_reduced = CAST(v.embedding AS vector)
+            FROM unnest(CAST(:ids AS integer[]), CAST(:embeddings AS text[])) AS v(id, embedding)
+            WHERE sb.id = v.id
+        """), {"ids": [row[0] for row in rows], "embeddings": [to_pgvector(r) for r in reduced]})
+        db.commit()
+
+        last_id = rows[-1][0]
+        total += len(rows)
+        logger.info(f"Projetados {total} embeddings")
+
+
+def rebuild_reduced_index(db):
+    """
+    Reconstrói o IVFFlat de embedding_reduced. As listas do IVFFlat são
+    treinadas na criação do índice: criado com a coluna vazia (migração
+    005) ou com outra projeção, o recall da busca reduzida despenca.
+    CONCURRENTLY não bloqueia a busca nem os cadastros durante a
+    reconstrução.
+    """
+    db.commit()
+    with db.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("REINDEX INDEX CONCURRENTLY ix_snout_biometries_embedding_reduced"))
+
+
+def cmd_fit(args):
+    db = SessionLocal()
+    try:
+        started_at = datetime.utcnow()
+
+        if args.method == "pca":
+            sample = load_sample(db, args.sample)
+            if len(sample) < REDUCED_DIM:
+                print(f"São necessários pelo menos {REDUCED_DIM} embeddings para o PCA (há {len(sample)})")
+                return
+            projection = EmbeddingProjection.fit_pca(sample, REDUCED_DIM)
+            explained = _explained_variance(sample, projection)
+            print(f"PCA ajustado em {len(sample)} embeddings | variância explicada: {explained:.1%}")
+        else:
+            projection = EmbeddingProjection.fit_random(768, REDUCED_DIM, seed=args.seed)
+            print(f"Projeção ortogonal aleatória (seed={args.seed})")
+
+        print(f"Projetados: {project_gallery(db, projection)}")
+
+        # Com a coluna preenchida, reconstrói o IVFFlat (listas treinadas
+        # sobre os vetores novos) antes de a API passar a usá-lo
+        rebuild_reduced_index(db)
+        print("Índice ix_snout_biometries_embedding_reduced reconstruído")
+
+        # Publica atomicamente: a API passa a usar a projeção nova
+        path = settings.BIOMETRY_PROJECTION_PATH
+        tmp_path = path + ".tmp.npz"
+        projection.save(tmp_path)
+        os.replace(tmp_path, path)
+        print(f"Projeção publicada em {path}")
+
+        # Registros criados/atualizados pela API com a projeção anterior
+        print(f"Reprojetados após a publicação: {project_gallery(db, projection, started_at)}")
+    finally:
+        db.close()
+
+
+def cmd_apply(args):
+    db = SessionLocal()
+    try:
+        projection = EmbeddingProjection.load(settings.BIOMETRY_PROJECTION_PATH)
+        print(f"Projetados: {project_gallery(db, projection)}")
+        rebuild_reduced_index(db)
+        print("Índice ix_snout_biometries_embedding_reduced reconstruído")
+    finally:
+        db.close()
+
+
+def _explained_variance(sample: np.ndarray, projection: EmbeddingProjection) -> float:
+    centered = sample - projection.mean
+    projected = centered @ projection.components.T
+    return float((projected ** 2).sum() / (centered ** 2).sum())
+
+
+def cmd_report(args):
+    db = SessionLocal()
+    try:
+        projection = EmbeddingProjection.load(settings.BIOMETRY_PROJECTION_PATH)
+        queries = db.execute(text("""
+            SELECT id, embedding::text FROM snout_biometries
+            WHERE is_active = true AND embedding_reduced IS NOT NULL
+            ORDER BY random()
+            LIMIT :queries
+        """), {"queries": args.queries}).fetchall()
+        if not queries:
+            print("Nenhum embedding projetado: rode `fit` antes")
+            return
+
+        k = args.k
+        exact_query = text("""
+            SELECT id FROM snout_biometries
+            WHERE is_active = true AND id <> :id
+            ORDER BY embedding <=> CAST(:embedding AS vector)
+            LIMIT :k
+        """)
+        full_query = text("""
+            SELECT id FROM (
+                SELECT id, embedding <=> CAST(:embedding AS vector) AS distance
+                FROM snout_biometries
+                WHERE is_active = true AND id <> :id
+                ORDER BY embedding <=> CAST(:embedding AS vector)
+                LIMIT :candidates
+            ) c ORDER BY distance LIMIT :k
+        """)
+        reduced_query = text("""
+            SELECT sb.id FROM (
+                SELECT id FROM snout_biometries
+                WHERE is_active = true AND id <> :id
+                ORDER BY embedding_reduced <=> CAST(:reduced AS vector)
+                LIMIT :candidates
+            ) ann
+            JOIN snout_biometries sb ON sb.id = ann.id
+            ORDER BY sb.embedding <=> CAST(:embedding AS vector)
+            LIMIT :k
+        """)
+
+        params = []
+        for row_id, embedding in queries:
+            vector = _parse_vector(embedding)
+            params.append({
+                "id": row_id,
+                "embedding": embedding,
+                "reduced": to_pgvector(projection.transform(vector)),
+                "k": k,
+            })
+
+        def run(query, extra=None):
+            results = []
+            start_time = time.perf_counter()
+            for p in params:
+                results.append({row[0] for row in db.execute(query, {**p, **(extra or {})}).fetchall()})
+            return results, (time.perf_counter() - start_time) / len(params) * 1000
+
+        # Verdade: varredura completa, sem índice
+        db.execute(text("SET LOCAL enable_indexscan = off"))
+        db.execute(text("SET LOCAL enable_bitmapscan = off"))
+        truth, exact_ms = run(exact_query)
+        db.rollback()
+
+        def recall(results):
+            found = sum(len(r & t) for r, t in zip(results, truth))
+            return found / max(1, sum(len(t) for t in truth))
+
+        gallery = db.execute(text("SELECT count(*) FROM snout_biometries WHERE is_active = true")).scalar()
+        print_header("Índice ANN: completo x reduzido")
+        print(f"Galeria: {gallery} | Consultas: {len(params)} | k={k} | "
+              f"Projeção: {projection.method} {REDUCED_DIM}d ({projection.fitted_at})")
+        print(f"\n{'Estratégia':<32} {'Recall@k':>10} {'ms/consulta':>12}")
+        print(f"{'Exata (varredura)':<32} {1.0:>10.2%} {exact_ms:>12.2f}")
+
+        for factor in sorted({settings.BIOMETRY_ANN_OVERFETCH, 1, 4}):
+            results, ms = run(full_query, {"candidates": k * factor})
+            print(f"{f'IVFFlat 768d (x{factor})':<32} {recall(results):>10.2%} {ms:>12.2f}")
+
+        for factor in sorted({settings.BIOMETRY_REDUCED_OVERFETCH, 4, 20}):
+            results, ms = run(reduced_query, {"candidates": k * factor})
+            print(f"{f'IVFFlat {REDUCED_DIM}d + rerank (x{factor})':<32} {recall(results):>10.2%} {ms:>12.2f}")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Projeção dos embeddings para o índice ANN reduzido")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fit = subparsers.add_parser("fit", help="Ajusta, aplica e publica a projeção")
+    fit.add_argument("--method", choices=["pca", "random"], default="pca")
+    fit.add_argument("--sample", type=int, default=50000, help="Embeddings usados no PCA")
+    fit.add_argument("--seed", type=int, default=0, help="Semente da projeção aleatória")
+    fit.set_defaults(func=cmd_fit)
+
+    apply = subparsers.add_parser("apply", help="Reprojeta a galeria com a projeção publicada")
+    apply.set_defaults(func=cmd_apply)
+
+    report = subparsers.add_parser("report", help="Recall e latência: completo x reduzido")
+    report.add_argument("--queries", type=int, default=200)
+    report.add_argument("--k", type=int, default=5)
+    report.set_defaults(func=cmd_report)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,127 @@
+"""
+Reprocessa os embeddings da galeria a partir das fotos do cadastro.
+
+Necessário quando o recorte antes do modelo muda (SNOUT_DETECTION_ENABLED,
+SNOUT_CASCADE_PATH) ou quando o modelo é trocado: embeddings gerados com
+recortes diferentes não são comparáveis, e buscas com o recorte novo
+perdem similaridade contra a galeria antiga.
+
+Uso:
+    python -m app.reembed_biometries             # só os de recorte diferente do atual
+    python -m app.reembed_biometries --all       # toda a galeria (ex.: modelo novo)
+    python -m app.reembed_biometries --dry-run   # só conta o que seria reprocessado
+
+Rode com a configuração nova já aplicada (a mesma da API e do nó de ML).
+Biometrias sem foto guardada (cadastradas antes de source_image_key) não
+podem ser reprocessadas: os pets são listados para o tutor recadastrar.
+"""
+import argparse
+import base64
+import logging
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.snout_biometry import SnoutBiometry
+from app.services import perceptual_hash, pet_profile
+from app.services.biometry_service import get_s3_client
+from app.services.embedding_projection import get_projection
+from app.services.ml_embedding_service import get_ml_service, snout_crop_mode
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 64
+
+
+def print_header(text):
+    """Imprime cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f"  {text}")
+    print("=" * 60)
+
+
+def reembed(biometry: SnoutBiometry, s3, ml_service) -> bool:
+    """Gera de novo o embedding da biometria a partir da foto guardada."""
+    data = s3.get_object(Bucket=settings.S3_BUCKET, Key=biometry.source_image_key)["Body"].read()
+    snout_bbox = tuple(biometry.source_snout_bbox) if biometry.source_snout_bbox else None
+
+    embedding, quality, issues, phash = ml_service.generate_embedding_with_hash(
+        base64.b64encode(data).decode(), snout_bbox=snout_bbox, tta=settings.BIOMETRY_TTA_REGISTER
+    )
+    if embedding is None:
+        logger.warning(f"Biometria {biometry.id} (pet {biometry.pet_id}) não reprocessada: {issues}")
+        return False
+
+    projection = get_projection()
+    biometry.embedding = embedding
+    biometry.embedding_reduced = projection.transform(embedding).tolist() if projection is not None else None
+    biometry.quality_score = quality
+    biometry.crop_mode = snout_crop_mode(snout_bbox)
+    biometry.perceptual_hash = perceptual_hash.to_signed(phash) if phash is not None else None
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprocessa os embeddings da galeria a partir das fotos do cadastro")
+    parser.add_argument("--all", action="store_true", help="Reprocessa toda a galeria, não só os de recorte diferente")
+    parser.add_argument("--dry-run", action="store_true", help="Só conta o que seria reprocessado")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    s3 = get_s3_client()
+    ml_service = None if args.dry_run else get_ml_service()
+    last_id = 0
+    done, failed, missing = 0, 0, []
+
+    try:
+        while True:
+            batch = (
+                db.query(SnoutBiometry)
+                .filter(SnoutBiometry.id > last_id)
+                .order_by(SnoutBiometry.id)
+                .limit(BATCH_SIZE)
+                .all()
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            updated_pets = []
+
+            for biometry in batch:
+                snout_bbox = tuple(biometry.source_snout_bbox) if biometry.source_snout_bbox else None
+                if not args.all and biometry.crop_mode == snout_crop_mode(snout_bbox):
+                    continue
+                if not biometry.source_image_key:
+                    missing.append(biometry.pet_id)
+                    continue
+                if args.dry_run:
+                    done += 1
+                    continue
+                try:
+                    if reembed(biometry, s3, ml_service):
+                        updated_pets.append(biometry.pet_id)
+                        done += 1
+                    else:
+                        failed += 1
+                except Exception as e:
+                    logger.warning(f"Foto da biometria {biometry.id} indisponível: {e}")
+                    failed += 1
+
+            db.commit()
+            # Perfis públicos em cache (workers e nginx) mostram a biometria
+            for pet_id in updated_pets:
+                pet_profile.invalidate_pet(pet_id)
+            logger.info(f"Até a biometria {last_id}: {done} reprocessada(s), {failed} falha(s)")
+    finally:
+        db.close()
+
+    print_header("Reprocessamento da galeria")
+    print(f"Recorte atual (sem caixa do app): {snout_crop_mode()}")
+    print(f"{'A reprocessar' if args.dry_run else 'Reprocessadas'}: {done}")
+    print(f"Falhas: {failed}")
+    print(f"Sem foto guardada (recadastrar): {len(missing)}")
+    if missing:
+        print("Pets: " + ", ".join(str(pet_id) for pet_id in missing[:50]) + (" ..." if len(missing) > 50 else ""))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
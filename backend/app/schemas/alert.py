@@ -0,0 +1,48 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List, Literal
+from app.core.config import settings
+
+
+class AlertSubscriptionCreate(BaseModel):
+    """Criar área de alerta"""
+    label: Optional[str] = Field(default=None, max_length=60)
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    radius_km: float = Field(default=5, ge=0.5, le=settings.ALERT_MAX_RADIUS_KM)
+    report_type: Optional[Literal["lost", "found"]] = None  # None para ambos
+
+
+class AlertSubscriptionResponse(BaseModel):
+    """Response da área de alerta"""
+    id: int
+    label: Optional[str]
+    latitude: float
+    longitude: float
+    radius_km: float
+    report_type: Optional[str]
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class AlertNotificationResponse(BaseModel):
+    """Aviso de reporte novo em uma área de alerta"""
+    id: int
+    subscription_id: int
+    report_id: int
+    report_type: str
+    report_status: str
+    city: Optional[str]
+    pet_name: Optional[str] = None
+    pet_species: Optional[str] = None
+    distance_km: Optional[float]
+    created_at: datetime
+    read_at: Optional[datetime]
+
+
+class AlertMarkReadRequest(BaseModel):
+    """Marcar avisos como lidos (todos se ids vier vazio)"""
+    ids: Optional[List[int]] = None
@@ -1,25 +1,83 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from typing import Optional, List
+from typing import Annotated, Optional, List
+from app.core.config import settings
+
+# Base64 ocupa 4/3 do tamanho do arquivo (+ folga para o prefixo data:image/...)
+IMAGE_BASE64_MAX_LENGTH = settings.IMAGE_MAX_BYTES * 4 // 3 + 1024
+
+ImageBase64 = Annotated[str, Field(max_length=IMAGE_BASE64_MAX_LENGTH)]
 
 
 class SnoutImageUpload(BaseModel):
     """Schema para upload de imagem do focinho"""
-    image_base64: str = Field(..., description="Imagem em base64")
+    image_base64: str = Field(..., max_length=IMAGE_BASE64_MAX_LENGTH, description="Imagem em base64")
     quality_check: bool = Field(default=True, description="Verificar qualidade da imagem")
 
 
+class SnoutBoundingBox(BaseModel):
+    """Região do focinho na imagem (coordenadas normalizadas 0-1)"""
+    x: float = Field(..., ge=0, le=1)
+    y: float = Field(..., ge=0, le=1)
+    width: float = Field(..., gt=0, le=1)
+    height: float = Field(..., gt=0, le=1)
+
+    def as_tuple(self) -> tuple:
+        return (self.x, self.y, self.width, self.height)
+
+
 class BiometryRegisterRequest(BaseModel):
     """Schema para registrar biometria"""
     pet_id: int
-    image_base64: str = Field(..., description="Imagem do focinho em base64")
+    image_base64: str = Field(..., max_length=IMAGE_BASE64_MAX_LENGTH, description="Imagem do focinho em base64")
+    snout_bbox: Optional[SnoutBoundingBox] = Field(default=None, description="Região do focinho (pula a detecção automática)")
 
 
 class BiometrySearchRequest(BaseModel):
     """Schema para buscar pet por focinho"""
-    image_base64: str = Field(..., description="Imagem do focinho em base64")
-    threshold: float = Field(default=0.85, ge=0.5, le=1.0, description="Limiar de similaridade")
+    image_base64: str = Field(..., max_length=IMAGE_BASE64_MAX_LENGTH, description="Imagem do focinho em base64")
+    snout_bbox: Optional[SnoutBoundingBox] = Field(default=None, description="Região do focinho (pula a detecção automática)")
+    threshold: float = Field(default=settings.BIOMETRY_MATCH_THRESHOLD, ge=0.5, le=1.0, description="Limiar de similaridade")
     max_results: int = Field(default=5, ge=1, le=20, description="Número máximo de resultados")
+    # Onde o pet foi encontrado: prioriza pets perdidos nas redondezas
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90, description="Latitude de onde o pet foi encontrado")
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180, description="Longitude de onde o pet foi encontrado")
+    radius_km: float = Field(default=settings.BIOMETRY_NEARBY_RADIUS_KM, gt=0, le=500, description="Raio da busca entre pets perdidos próximos")
+
+    @model_validator(mode="after")
+    def check_coordinates(self):
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("Informe latitude e longitude juntas")
+        return self
+
+
+class BiometryEmbeddingSearchRequest(BaseModel):
+    """Schema para buscar com embedding calculado no app (on-device)"""
+    embedding: List[float] = Field(..., min_length=768, max_length=768, description="Embedding L2-normalizado de 768 dimensões")
+    model_version: str = Field(..., max_length=100, description="Modelo usado no app (ex.: BVRA/MegaDescriptor-T-224-int8)")
+    thumbnail_base64: str = Field(
+        ...,
+        max_length=settings.CLIENT_THUMBNAIL_MAX_BYTES * 4 // 3 + 1024,
+        description="Recorte do focinho usado pelo modelo (224x224), para verificação por amostragem"
+    )
+    threshold: float = Field(default=settings.BIOMETRY_MATCH_THRESHOLD, ge=0.5, le=1.0, description="Limiar de similaridade")
+    max_results: int = Field(default=5, ge=1, le=20, description="Número máximo de resultados")
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90, description="Latitude de onde o pet foi encontrado")
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180, description="Longitude de onde o pet foi encontrado")
+    radius_km: float = Field(default=settings.BIOMETRY_NEARBY_RADIUS_KM, gt=0, le=500, description="Raio da busca entre pets perdidos próximos")
+
+    @model_validator(mode="after")
+    def check_coordinates(self):
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("Informe latitude e longitude juntas")
+        return self
+
+
+class BiometryBatchSearchRequest(BaseModel):
+    """Schema para buscar vários pets por focinho de uma vez"""
+    images_base64: List[ImageBase64] = Field(..., min_length=1, max_length=20, description="Imagens dos focinhos em base64")
+    threshold: float = Field(default=settings.BIOMETRY_MATCH_THRESHOLD, ge=0.5, le=1.0, description="Limiar de similaridade")
+    max_results: int = Field(default=5, ge=1, le=20, description="Número máximo de resultados por imagem")
 
 
 class BiometryResponse(BaseModel):
@@ -43,6 +101,7 @@ class PetSearchResult(BaseModel):
     owner_name: Optional[str]
     owner_phone: Optional[str]  # Mascarado para privacidade
     similarity: float
+    distance_km: Optional[float] = None  # Distância do reporte de perdido (busca local)
     has_contact_permission: bool = True
 
 
@@ -51,4 +110,29 @@ class BiometrySearchResponse(BaseModel):
     found: bool
     results: List[PetSearchResult]
     message: str
+    search_scope: str = "global"  # 'nearby' (pets perdidos no raio) ou 'global'
+
+
+class BiometryBatchSearchItem(BiometrySearchResponse):
+    """Resultado da busca de uma das imagens do lote"""
+    index: int
+
+
+class BiometryBatchSearchResponse(BaseModel):
+    """Response da busca em lote (na ordem das imagens enviadas)"""
+    results: List[BiometryBatchSearchItem]
+
+
+
+class EmbeddingRequest(BaseModel):
+    """Request interno (nó da API -> nó de ML) para gerar embedding"""
+    image_base64: str = Field(..., max_length=IMAGE_BASE64_MAX_LENGTH, description="Imagem do focinho em base64")
+    snout_bbox: Optional[SnoutBoundingBox] = None
+    tta: bool = False
+
 
+class EmbeddingResponse(BaseModel):
+    """Embedding gerado pelo nó de ML"""
+    embedding: Optional[List[float]]
+    quality_score: int
+    issues: List[str]
@@ -32,6 +32,7 @@ class FoundPetReportCreate(BaseModel):
     found_species: str  # 'dog' ou 'cat'
     found_breed: Optional[str] = None
     found_color: Optional[str] = None
+    found_photo_url: Optional[str] = None  # Foto do focinho no bucket: dispara o pareamento automático
     pet_id: Optional[int] = None  # Se identificou pelo focinho
 
 
@@ -69,6 +70,8 @@ class LostPetReportResponse(BaseModel):
     found_breed: Optional[str] = None
     found_color: Optional[str] = None
     found_photo_url: Optional[str] = None
+    # Pareamento biométrico automático: 'pending', 'done', 'failed'
+    match_status: Optional[str] = None
     # Distância (calculada)
     distance_km: Optional[float] = None
     
@@ -76,6 +79,34 @@ class LostPetReportResponse(BaseModel):
         from_attributes = True
 
 
+class LostPetMatchResponse(BaseModel):
+    """Candidato a pareamento (o reporte do outro lado)"""
+    id: int
+    similarity: float
+    distance_km: Optional[float]
+    status: str
+    created_at: datetime
+    report: LostPetReportResponse
+
+
+class MapCluster(BaseModel):
+    """Célula da grade do mapa com os reportes ativos agrupados"""
+    cell_id: str  # "zoom/cx/cy"
+    latitude: float  # Centroide dos reportes da célula
+    longitude: float
+    count: int
+    lost_count: int
+    found_count: int
+    report_id: Optional[int] = None  # Preenchido quando a célula tem um só reporte
+
+
+class MapClustersResponse(BaseModel):
+    """Clusters dos reportes ativos em um bbox"""
+    zoom: int
+    total: int
+    clusters: List[MapCluster]
+
+
 class NearbyReportsRequest(BaseModel):
     """Request para buscar reportes próximos"""
     latitude: float
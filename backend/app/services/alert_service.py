@@ -0,0 +1,202 @@
+"""
+Alertas de pets perdidos/encontrados por área.
+
+O usuário se inscreve em uma área (ponto + raio). Para não varrer todas as
+inscrições a cada reporte, cada inscrição é indexada nas células de uma
+grade fixa de CELL_DEGREES graus que a sua bounding box toca
+(alert_subscription_cells). Um reporte cai em exatamente uma célula: os
+candidatos são só as inscrições daquela célula, e a distância exata
+(haversine) decide quem recebe.
+
+Os avisos são gravados em alert_notifications em background, logo após a
+criação do reporte, com INSERT ... SELECT em lotes de
+ALERT_ENQUEUE_BATCH_SIZE inscrições (keyset por id), então a criação do
+reporte não espera o fan-out.
+"""
+import logging
+import math
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session, joinedload
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.alert import AlertNotification, AlertSubscription, AlertSubscriptionCell
+from app.models.lost_pet import LostPetReport
+from app.services import geo
+
+logger = logging.getLogger(__name__)
+
+# Lado da célula (~5,5 km de latitude). Mudar exige reindexar as inscrições.
+CELL_DEGREES = 0.05
+_ROWS = int(round(180 / CELL_DEGREES))
+_COLS = int(round(360 / CELL_DEGREES))
+
+
+def cell_id(latitude: float, longitude: float) -> int:
+    """Célula da grade que contém o ponto."""
+    row = min(_ROWS - 1, int(math.floor((latitude + 90.0) / CELL_DEGREES)))
+    col = min(_COLS - 1, int(math.floor((longitude + 180.0) / CELL_DEGREES)))
+    return row * _COLS + col
+
+
+def cells_covering(latitude: float, longitude: float, radius_km: float) -> List[int]:
+    """Células tocadas pela bounding box do círculo."""
+    min_lat, max_lat, min_lon, max_lon = geo.bounding_box(latitude, longitude, radius_km)
+    first = cell_id(min_lat, min_lon)
+    last = cell_id(max_lat, max_lon)
+    row0, col0 = divmod(first, _COLS)
+    row1, col1 = divmod(last, _COLS)
+    return [row * _COLS + col for row in range(row0, row1 + 1) for col in range(col0, col1 + 1)]
+
+
+class AlertService:
+    """Inscrições de alerta e fan-out dos avisos"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_subscription(
+        self,
+        user_id: int,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        report_type: Optional[str] = None,
+        label: Optional[str] = None
+    ) -> Tuple[Optional[AlertSubscription], str]:
+        """
+        Cria a inscrição e indexa suas células.
+
+        Returns:
+            Tupla (inscrição, mensagem)
+        """
+        active = self.db.query(AlertSubscription).filter(
+            AlertSubscription.user_id == user_id,
+            AlertSubscription.is_active == True
+        ).count()
+        if active >= settings.ALERT_MAX_SUBSCRIPTIONS_PER_USER:
+            return None, f"Limite de {settings.ALERT_MAX_SUBSCRIPTIONS_PER_USER} áreas de alerta atingido"
+
+        subscription = AlertSubscription(
+            user_id=user_id,
+            label=label,
+            latitude=latitude,
+            longitude=longitude,
+            radius_km=radius_km,
+            report_type=report_type,
+            is_active=True
+        )
+        self.db.add(subscription)
+        self.db.flush()
+
+        self.db.execute(insert(AlertSubscriptionCell), [
+            {"cell_id": cell, "subscription_id": subscription.id}
+            for cell in cells_covering(latitude, longitude, radius_km)
+        ])
+        self.db.commit()
+        self.db.refresh(subscription)
+
+        return subscription, "Área de alerta criada"
+
+    def delete_subscription(self, subscription_id: int, user_id: int) -> bool:
+        subscription = self.db.query(AlertSubscription).filter(
+            AlertSubscription.id == subscription_id,
+            AlertSubscription.user_id == user_id
+        ).first()
+        if not subscription:
+            return False
+
+        # Células e avisos saem em cascata (ON DELETE CASCADE)
+        self.db.delete(subscription)
+        self.db.commit()
+        return True
+
+    def enqueue_for_report(self, report: LostPetReport) -> int:
+        """
+        Grava os avisos de um reporte para as inscrições que o cobrem.
+
+        Returns:
+            Quantidade de avisos gravados
+        """
+        query = text(f"""
+            WITH batch AS (
+                SELECT
+                    s.id,
+                    s.user_id,
+                    s.radius_km,
+                    {geo.haversine_sql("s.latitude", "s.longitude")} as distance_km
+                FROM alert_subscription_cells c
+                JOIN alert_subscriptions s ON s.id = c.subscription_id
+                WHERE c.cell_id = :cell_id
+                AND c.subscription_id > :last_id
+                AND s.is_active = true
+                AND (s.report_type IS NULL OR s.report_type = :report_type)
+                AND s.user_id <> :reporter_id
+                ORDER BY c.subscription_id
+                LIMIT :batch_size
+            ),
+            inserted AS (
+                INSERT INTO alert_notifications (user_id, subscription_id, report_id, distance_km, created_at)
+                SELECT user_id, id, :report_id, distance_km, timezone('utc', now())
+                FROM batch
+                WHERE distance_km <= radius_km
+                ON CONFLICT ON CONSTRAINT uq_alert_notification_user_report DO NOTHING
+                RETURNING 1
+            )
+            SELECT (SELECT max(id) FROM batch) as last_id, (SELECT count(*) FROM inserted) as inserted
+        """)
+
+        params = {
+            "cell_id": cell_id(report.latitude, report.longitude),
+            "latitude": report.latitude,
+            "longitude": report.longitude,
+            "report_type": report.report_type,
+            "reporter_id": report.reporter_id,
+            "report_id": report.id,
+            "batch_size": settings.ALERT_ENQUEUE_BATCH_SIZE,
+        }
+
+        last_id, total = 0, 0
+        while True:
+            row = self.db.execute(query, {**params, "last_id": last_id}).one()
+            self.db.commit()
+            if row.last_id is None:
+                return total
+            last_id = row.last_id
+            total += row.inserted
+
+    def get_notifications(self, user_id: int, unread_only: bool = False, limit: int = 50) -> List[AlertNotification]:
+        query = self.db.query(AlertNotification).options(
+            joinedload(AlertNotification.report).joinedload(LostPetReport.pet)
+        ).filter(AlertNotification.user_id == user_id)
+        if unread_only:
+            query = query.filter(AlertNotification.read_at.is_(None))
+        return query.order_by(AlertNotification.id.desc()).limit(limit).all()
+
+    def mark_read(self, user_id: int, ids: Optional[List[int]] = None) -> int:
+        """Marca avisos como lidos (todos, se ids não for informado)."""
+        query = self.db.query(AlertNotification).filter(
+            AlertNotification.user_id == user_id,
+            AlertNotification.read_at.is_(None)
+        )
+        if ids:
+            query = query.filter(AlertNotification.id.in_(ids))
+        count = query.update({AlertNotification.read_at: datetime.utcnow()}, synchronize_session=False)
+        self.db.commit()
+        return count
+
+
+def run_alert_fanout(report_id: int):
+    """Tarefa de background: avisos dos inscritos na área de um reporte novo."""
+    db = SessionLocal()
+    try:
+        report = db.query(LostPetReport).filter(LostPetReport.id == report_id).first()
+        if report:
+            total = AlertService(db).enqueue_for_report(report)
+            logger.info(f"Reporte {report_id}: {total} avisos de alerta")
+    except Exception as e:
+        logger.error(f"Erro nos alertas do reporte {report_id}: {e}")
+        db.rollback()
+    finally:
+        db.close()
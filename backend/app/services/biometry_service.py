@@ -1,17 +1,40 @@
 import base64
 import hashlib
 import logging
+import random
+import uuid
 from typing import Optional, List, Tuple
+import boto3
+import numpy as np
+from botocore.config import Config
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from app.core.config import settings
 from app.models.snout_biometry import SnoutBiometry
 from app.models.pet import Pet
 from app.models.user import User
-from app.services.ml_embedding_service import get_ml_service
+from app.services.ml_embedding_service import MLEmbeddingService, get_ml_service, snout_crop_mode, SnoutBBox
+from app.services import geo, perceptual_hash
+from app.services.embedding_projection import get_projection, to_pgvector
 
 logger = logging.getLogger(__name__)
 
 
+def get_s3_client(timeout: Optional[float] = None):
+    """Cria cliente S3 (MinIO); timeout de conexão e leitura em segundos (opcional)"""
+    config = Config(signature_version='s3v4')
+    if timeout is not None:
+        config = config.merge(Config(connect_timeout=timeout, read_timeout=timeout))
+    return boto3.client(
+        's3',
+        endpoint_url=settings.S3_ENDPOINT,
+        aws_access_key_id=settings.S3_ACCESS_KEY,
+        aws_secret_access_key=settings.S3_SECRET_KEY,
+        config=config,
+        region_name=settings.S3_REGION,
+    )
+
+
 class BiometryService:
     """
     Serviço de biometria por focinho usando ML REAL.
@@ -33,12 +56,19 @@ class BiometryService:
         self.db = db
         self.ml_service = get_ml_service()
     
-    def _generate_embedding(self, image_base64: str) -> Tuple[Optional[List[float]], int, List[str]]:
+    def _generate_embedding(
+        self,
+        image_base64: str,
+        snout_bbox: Optional[SnoutBBox] = None,
+        tta: bool = False
+    ) -> Tuple[Optional[List[float]], int, List[str]]:
         """
         Gera embedding ML REAL usando MegaDescriptor.
 
         Args:
             image_base64: Imagem em base64
+            snout_bbox: Região do focinho informada pelo cliente (opcional)
+            tta: Usa test-time augmentation
 
         Returns:
             (embedding, quality_score, issues):
@@ -46,13 +76,81 @@ class BiometryService:
                 - quality_score: Score 0-100
                 - issues: Lista de problemas detectados
         """
-        return self.ml_service.generate_embedding(image_base64)
+        return self.ml_service.generate_embedding(image_base64, snout_bbox=snout_bbox, tta=tta)
+
+    def _embed_with_phash(
+        self,
+        image_base64: str,
+        snout_bbox: Optional[SnoutBBox] = None,
+        tta: bool = False,
+        existing: Optional[SnoutBiometry] = None
+    ) -> Tuple[Optional[List[float]], int, List[str], Optional[int]]:
+        """
+        Gera o embedding e o dHash do recorte do focinho.
+
+        Se o hash for idêntico ao da biometria atual do próprio pet
+        (reenvio da mesma foto), reutiliza o embedding armazenado e não
+        roda o modelo. Fotos parecidas de outros pets nunca são resolvidas
+        pelo hash.
+
+        Returns:
+            (embedding, quality_score, issues, perceptual_hash)
+        """
+        known_hash = _reusable_hash(existing, snout_bbox)
+        embedding, quality, issues, phash = self.ml_service.generate_embedding_with_hash(
+            image_base64, snout_bbox=snout_bbox, tta=tta, known_hash=known_hash
+        )
+
+        if known_hash is not None and phash == known_hash:
+            logger.info(f"Mesma foto da biometria atual do pet {existing.pet_id}; reutilizando embedding")
+            return list(existing.embedding), existing.quality_score or quality, issues, phash
+
+        return embedding, quality, issues, phash
+
+    def _store_source_image(self, pet_id: int, image_base64: str) -> Optional[str]:
+        """
+        Guarda a foto do cadastro no bucket, para que a galeria possa ser
+        reprocessada (python -m app.reembed_biometries) se o recorte ou o
+        modelo mudarem. Falha no upload não impede o cadastro.
+        """
+        try:
+            if ',' in image_base64 and image_base64.startswith('data:'):
+                image_base64 = image_base64.split(',', 1)[1]
+            key = f"{settings.BIOMETRY_SOURCE_IMAGE_PREFIX}{pet_id}/{uuid.uuid4().hex}"
+            get_s3_client().put_object(Bucket=settings.S3_BUCKET, Key=key, Body=base64.b64decode(image_base64))
+            return key
+        except Exception as e:
+            logger.warning(f"Foto do cadastro do pet {pet_id} não foi guardada: {e}")
+            return None
+
+    def _apply_source(
+        self,
+        biometry: SnoutBiometry,
+        image_base64: str,
+        snout_bbox: Optional[SnoutBBox]
+    ) -> Optional[str]:
+        """
+        Grava foto de origem, caixa e recorte da biometria.
+
+        Returns:
+            Chave da foto anterior, a remover após o commit
+        """
+        previous = biometry.source_image_key
+        biometry.source_image_key = self._store_source_image(biometry.pet_id, image_base64)
+        biometry.source_snout_bbox = list(snout_bbox) if snout_bbox is not None else None
+        biometry.crop_mode = snout_crop_mode(snout_bbox)
+        return previous
+
+    def _apply_phash(self, biometry: SnoutBiometry, phash: Optional[int]):
+        """Grava o hash perceptual na biometria"""
+        biometry.perceptual_hash = perceptual_hash.to_signed(phash) if phash is not None else None
     
     def register_snout(
         self,
         pet_id: int,
         image_base64: str,
-        owner_id: int
+        owner_id: int,
+        snout_bbox: Optional[SnoutBBox] = None
     ) -> Tuple[Optional[SnoutBiometry], str]:
         """
         Registra a biometria do focinho de um pet usando ML REAL.
@@ -61,6 +159,7 @@ class BiometryService:
             pet_id: ID do pet
             image_base64: Imagem do focinho em base64
             owner_id: ID do dono
+            snout_bbox: Região do focinho (x, y, largura, altura normalizados)
 
         Returns:
             (SnoutBiometry, message) se sucesso
@@ -75,8 +174,15 @@ class BiometryService:
         if not pet:
             return None, "Pet não encontrado ou você não tem permissão"
 
-        # Gera embedding usando ML real
-        embedding, quality, issues = self._generate_embedding(image_base64)
+        # Biometria atual do pet (atualizada abaixo)
+        existing = self.db.query(SnoutBiometry).filter(
+            SnoutBiometry.pet_id == pet_id
+        ).first()
+
+        # Gera embedding usando ML real (ou reutiliza, se a mesma foto já foi enviada)
+        embedding, quality, issues, phash = self._embed_with_phash(
+            image_base64, snout_bbox, tta=settings.BIOMETRY_TTA_REGISTER, existing=existing
+        )
 
         if embedding is None:
             error_msg = "Erro ao processar imagem: " + "; ".join(issues)
@@ -90,31 +196,36 @@ class BiometryService:
 
         logger.info(f"Embedding gerado para pet {pet_id}. Qualidade: {quality}")
 
-        # Verifica se já existe biometria
-        existing = self.db.query(SnoutBiometry).filter(
-            SnoutBiometry.pet_id == pet_id
-        ).first()
-
         message_suffix = f"Qualidade: {quality}/100"
         if issues:
             message_suffix += f"\nAvisos: {', '.join(issues)}"
 
         if existing:
-            # Atualiza existente
+            # Atualiza existente (mesma foto: mantém a foto de origem guardada)
+            previous_key = None
+            if phash is None or phash != _reusable_hash(existing, snout_bbox):
+                previous_key = self._apply_source(existing, image_base64, snout_bbox)
             existing.embedding = embedding
+            existing.embedding_reduced = _reduce(embedding)
             existing.quality_score = quality
             existing.is_active = True
+            self._apply_phash(existing, phash)
             self.db.commit()
             self.db.refresh(existing)
+            if previous_key:
+                _delete_source_image(previous_key)
             return existing, f"Biometria atualizada com sucesso! {message_suffix}"
 
         # Cria nova
         biometry = SnoutBiometry(
             pet_id=pet_id,
             embedding=embedding,
+            embedding_reduced=_reduce(embedding),
             quality_score=quality,
             is_active=True
         )
+        self._apply_phash(biometry, phash)
+        self._apply_source(biometry, image_base64, snout_bbox)
 
         self.db.add(biometry)
         self.db.commit()
@@ -125,22 +236,38 @@ class BiometryService:
     def search_by_snout(
         self,
         image_base64: str,
-        threshold: float = 0.80,  # Reduzido para 0.80 (ML real é mais preciso)
-        max_results: int = 5
+        threshold: Optional[float] = None,
+        max_results: int = 5,
+        snout_bbox: Optional[SnoutBBox] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: Optional[float] = None
     ) -> List[dict]:
         """
         Busca pets por similaridade do focinho usando ML REAL.
 
+        Com coordenadas, busca primeiro entre os pets com reporte de perdido
+        ativo dentro do raio (poucos candidatos, comparação exata) e só
+        recorre ao índice global se nenhum passar do threshold.
+
         Args:
             image_base64: Imagem para buscar
-            threshold: Threshold de similaridade (0-1). Default: 0.80
+            threshold: Threshold de similaridade (0-1). Default: BIOMETRY_MATCH_THRESHOLD
             max_results: Máximo de resultados
+            snout_bbox: Região do focinho (x, y, largura, altura normalizados)
+            latitude: Latitude de onde o pet foi encontrado (opcional)
+            longitude: Longitude de onde o pet foi encontrado (opcional)
+            radius_km: Raio da busca local. Default: BIOMETRY_NEARBY_RADIUS_KM
 
         Returns:
             Lista de dicts com pet_id, similarity, e dados do pet
+            (distance_km preenchido quando o resultado veio da busca local)
         """
-        # Gera embedding da imagem de busca usando ML
-        query_embedding, quality, issues = self._generate_embedding(image_base64)
+        # Gera embedding da imagem de busca usando ML. Sempre roda o modelo:
+        # o hash perceptual não resolve buscas (ver app.services.perceptual_hash)
+        query_embedding, quality, issues = self._generate_embedding(
+            image_base64, snout_bbox, tta=settings.BIOMETRY_TTA_SEARCH
+        )
 
         if query_embedding is None:
             logger.error(f"Erro ao gerar embedding de busca: {issues}")
@@ -149,12 +276,137 @@ class BiometryService:
         if quality < 50:
             logger.warning(f"Qualidade baixa na busca ({quality}): {issues}")
             # Ainda tenta buscar, mas avisa no log
+
+        return self._search_embedding(query_embedding, threshold, max_results, latitude, longitude, radius_km)
+
+    def search_by_embedding(
+        self,
+        embedding: List[float],
+        model_version: str,
+        thumbnail_base64: str,
+        threshold: Optional[float] = None,
+        max_results: int = 5,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: Optional[float] = None
+    ) -> Tuple[Optional[List[dict]], str]:
+        """
+        Busca com um embedding calculado no app (modelo quantizado on-device).
+
+        O servidor não roda o modelo: valida dimensão, norma e versão do
+        modelo e, para uma amostra (CLIENT_EMBEDDING_VERIFY_RATE) das
+        requisições, recalcula o embedding a partir da miniatura e rejeita
+        se não conferir.
+
+        Returns:
+            (resultados, mensagem): resultados None se o embedding for rejeitado
+        """
+        if not settings.CLIENT_EMBEDDING_ENABLED:
+            return None, "Busca com embedding do app desabilitada"
+
+        if model_version not in settings.CLIENT_EMBEDDING_MODEL_VERSIONS:
+            return None, f"Versão de modelo não suportada: {model_version}"
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.shape != (MLEmbeddingService.EMBEDDING_DIM,) or not np.all(np.isfinite(vector)):
+            return None, "Embedding inválido"
+
+        norm = float(np.linalg.norm(vector))
+        if abs(norm - 1.0) > settings.CLIENT_EMBEDDING_NORM_TOLERANCE:
+            return None, f"Embedding não normalizado (norma {norm:.4f})"
+
+        if random.random() < settings.CLIENT_EMBEDDING_VERIFY_RATE:
+            # A miniatura já é o recorte do focinho: bbox da imagem inteira
+            # pula a detecção
+            server_embedding, _, issues = self.ml_service.generate_embedding(
+                thumbnail_base64, snout_bbox=(0.0, 0.0, 1.0, 1.0)
+            )
+            if server_embedding is None:
+                logger.warning(f"Miniatura inválida na verificação de embedding: {issues}")
+                return None, "Não foi possível verificar o embedding com a miniatura enviada"
+
+            agreement = float(np.dot(vector / norm, np.asarray(server_embedding, dtype=np.float32)))
+            if agreement < settings.CLIENT_EMBEDDING_MIN_AGREEMENT:
+                logger.warning(
+                    f"Embedding do app rejeitado ({model_version}): similaridade com o servidor {agreement:.4f}"
+                )
+                return None, "Embedding não confere com a miniatura enviada"
+
+        results = self._search_embedding((vector / norm).tolist(), threshold, max_results, latitude, longitude, radius_km)
+        return results, "OK"
+
+    def _search_embedding(
+        self,
+        query_embedding: List[float],
+        threshold: Optional[float],
+        max_results: int,
+        latitude: Optional[float],
+        longitude: Optional[float],
+        radius_km: Optional[float]
+    ) -> List[dict]:
+        """Busca local (se houver coordenadas) com fallback para a global."""
+        if threshold is None:
+            threshold = settings.BIOMETRY_MATCH_THRESHOLD
+
+        embedding = to_pgvector(query_embedding)
+
+        if latitude is not None and longitude is not None:
+            results = self._search_nearby_lost(
+                embedding, threshold, max_results,
+                latitude, longitude, radius_km or settings.BIOMETRY_NEARBY_RADIUS_KM
+            )
+            if results:
+                return results
+
+        return self._search_global(embedding, threshold, max_results, _reduce(query_embedding))
+
+    def _search_global(
+        self,
+        embedding: str,
+        threshold: float,
+        max_results: int,
+        reduced: Optional[List[float]] = None
+    ) -> List[dict]:
+        """
+        Busca em toda a galeria pelo índice IVFFlat.
+
+        Com a projeção ativa (reduced), os candidatos vêm do índice do
+        embedding reduzido e são reordenados pela distância do completo.
+        """
+        query_sql, overfetch = _global_search_sql(":embedding", ":reduced" if reduced is not None else None)
+        query = text(query_sql)
+        
+        params = {
+            "embedding": embedding,
+            "threshold": threshold,
+            "max_results": max_results,
+            "candidates": max_results * overfetch
+        }
+        if reduced is not None:
+            params["reduced"] = to_pgvector(reduced)
+        
+        results = self.db.execute(query, params).fetchall()
         
-        # Busca por similaridade de cosseno usando pgvector
-        # Quanto menor a distância, maior a similaridade
-        # cosine distance = 1 - cosine_similarity
-        query = text("""
-            SELECT 
+        return [_row_to_result(row) for row in results]
+
+    def _search_nearby_lost(
+        self,
+        embedding: str,
+        threshold: float,
+        max_results: int,
+        latitude: float,
+        longitude: float,
+        radius_km: float
+    ) -> List[dict]:
+        """
+        Busca exata entre os pets com reporte de perdido ativo no raio.
+
+        O conjunto é pequeno (dezenas de pets), então a distância de cosseno
+        é calculada para todos sem índice vetorial; a bounding box filtra os
+        reportes antes da haversine.
+        """
+        query = text(f"""
+            SELECT
                 sb.pet_id,
                 sb.quality_score,
                 1 - (sb.embedding <=> :embedding) as similarity,
@@ -163,46 +415,126 @@ class BiometryService:
                 p.breed,
                 p.photo_url,
                 u.full_name as owner_name,
-                u.phone as owner_phone
-            FROM snout_biometries sb
+                u.phone as owner_phone,
+                nearby.distance_km
+            FROM (
+                SELECT DISTINCT ON (lpr.pet_id)
+                    lpr.pet_id,
+                    {geo.haversine_sql("lpr.latitude", "lpr.longitude")} as distance_km
+                FROM lost_pet_reports lpr
+                WHERE lpr.status = 'active'
+                AND lpr.report_type = 'lost'
+                AND lpr.pet_id IS NOT NULL
+                AND lpr.latitude BETWEEN :min_lat AND :max_lat
+                AND lpr.longitude BETWEEN :min_lon AND :max_lon
+                ORDER BY lpr.pet_id, distance_km
+            ) nearby
+            JOIN snout_biometries sb ON sb.pet_id = nearby.pet_id AND sb.is_active = true
             JOIN pets p ON p.id = sb.pet_id
             JOIN users u ON u.id = p.owner_id
-            WHERE sb.is_active = true
+            WHERE nearby.distance_km <= :radius_km
             AND 1 - (sb.embedding <=> :embedding) >= :threshold
             ORDER BY similarity DESC
             LIMIT :max_results
         """)
-        
-        # Converte embedding para string no formato pgvector
-        embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
-        
+
         results = self.db.execute(
             query,
             {
-                "embedding": embedding_str,
+                "embedding": embedding,
                 "threshold": threshold,
-                "max_results": max_results
+                "max_results": max_results,
+                **geo.bounding_box_params(latitude, longitude, radius_km)
             }
         ).fetchall()
-        
-        # Mascara telefone para privacidade
-        def mask_phone(phone: str) -> str:
-            if not phone or len(phone) < 4:
-                return "****"
-            return phone[:2] + "*" * (len(phone) - 4) + phone[-2:]
-        
+
+        return [_row_to_result(row) for row in results]
+
+    def search_by_snout_batch(
+        self,
+        images_base64: List[str],
+        threshold: Optional[float] = None,
+        max_results: int = 5
+    ) -> List[Tuple[List[dict], List[str]]]:
+        """
+        Busca várias imagens de uma vez (abrigos/veterinários).
+
+        Os embeddings são gerados em um único forward pass e a busca de
+        vizinhos mais próximos de todas as imagens roda em uma única query
+        (LATERAL join por imagem), em vez de N chamadas a search_by_snout.
+        Os candidatos são os mesmos da busca global individual (inclusive
+        pelo índice reduzido, se ativo); não há busca local por coordenadas.
+
+        Args:
+            images_base64: Imagens para buscar
+            threshold: Threshold de similaridade (0-1)
+            max_results: Máximo de resultados por imagem
+
+        Returns:
+            Lista (na ordem das imagens) de (resultados, problemas)
+        """
+        if threshold is None:
+            threshold = settings.BIOMETRY_MATCH_THRESHOLD
+
+        generated = self.ml_service.generate_embeddings(images_base64, tta=settings.BIOMETRY_TTA_SEARCH)
+
+        indexes = []
+        embeddings = []
+        raw_embeddings = []
+        for i, (embedding, quality, issues) in enumerate(generated):
+            if embedding is None:
+                logger.error(f"Erro ao gerar embedding de busca (imagem {i}): {issues}")
+                continue
+            if quality < 50:
+                logger.warning(f"Qualidade baixa na busca (imagem {i}, {quality}): {issues}")
+            indexes.append(i)
+            raw_embeddings.append(embedding)
+            embeddings.append(to_pgvector(embedding))
+
+        matches: List[List[dict]] = [[] for _ in images_base64]
+
+        if indexes:
+            # Mesmos candidatos da busca individual (_search_global): índice
+            # reduzido + rerank quando a projeção está ativa, com o mesmo
+            # over-fetch; ORDER BY distância + LIMIT dentro do LATERAL usa o
+            # índice IVFFlat para cada vetor de consulta
+            reduced = [_reduce(embedding) for embedding in raw_embeddings]
+            use_reduced = reduced[0] is not None
+            ranked_sql, overfetch = _global_search_sql(
+                "CAST(q.embedding AS vector)",
+                "CAST(q.reduced AS vector)" if use_reduced else None
+            )
+            query = text(f"""
+                SELECT
+                    q.idx,
+                    m.*
+                FROM unnest(
+                    CAST(:indexes AS integer[]),
+                    CAST(:embeddings AS text[]),
+                    CAST(:reduced AS text[])
+                ) AS q(idx, embedding, reduced)
+                CROSS JOIN LATERAL ({ranked_sql}) m
+                ORDER BY q.idx, m.similarity DESC
+            """)
+
+            rows = self.db.execute(
+                query,
+                {
+                    "indexes": indexes,
+                    "embeddings": embeddings,
+                    "reduced": [to_pgvector(r) for r in reduced] if use_reduced else [None] * len(indexes),
+                    "threshold": threshold,
+                    "max_results": max_results,
+                    "candidates": max_results * overfetch
+                }
+            ).fetchall()
+
+            for row in rows:
+                matches[row.idx].append(_row_to_result(row))
+
         return [
-            {
-                "pet_id": row.pet_id,
-                "pet_name": row.pet_name,
-                "species": row.species,
-                "breed": row.breed,
-                "owner_name": row.owner_name,
-                "owner_phone": mask_phone(row.owner_phone) if row.owner_phone else None,
-                "similarity": round(row.similarity, 4),
-                "has_contact_permission": True  # TODO: Verificar permissões
-            }
-            for row in results
+            (matches[i], issues if embedding is None else [])
+            for i, (embedding, _, issues) in enumerate(generated)
         ]
     
     def delete_biometry(self, pet_id: int, owner_id: int) -> bool:
@@ -219,3 +551,117 @@ class BiometryService:
         self.db.commit()
         return True
 
+
+def _reusable_hash(biometry: Optional[SnoutBiometry], snout_bbox: Optional[SnoutBBox]) -> Optional[int]:
+    """dHash da biometria atual do pet, se o embedding dela vale para o recorte atual."""
+    if (biometry is None or not biometry.is_active or biometry.perceptual_hash is None
+            or biometry.crop_mode != snout_crop_mode(snout_bbox)):
+        return None
+    return perceptual_hash.to_unsigned(biometry.perceptual_hash)
+
+
+def _delete_source_image(key: str):
+    try:
+        get_s3_client().delete_object(Bucket=settings.S3_BUCKET, Key=key)
+    except Exception as e:
+        logger.warning(f"Foto de cadastro antiga não removida ({key}): {e}")
+
+
+def _global_search_sql(embedding: str, reduced: Optional[str] = None) -> Tuple[str, int]:
+    """
+    SQL da busca global (candidatos, rerank, threshold e dados do pet),
+    compartilhado pela busca individual e pelo LATERAL da busca em lote.
+
+    Args:
+        embedding: Expressão SQL do vetor de consulta completo
+        reduced: Expressão SQL do vetor projetado; com ela, os candidatos
+            vêm do índice do embedding reduzido e são reordenados pela
+            distância do completo
+
+    Returns:
+        (SQL, fator de over-fetch dos candidatos por resultado)
+    """
+    # Busca por similaridade de cosseno usando pgvector
+    # Quanto menor a distância, maior a similaridade
+    # cosine distance = 1 - cosine_similarity
+    #
+    # A subquery ordena pela distância (usa o índice IVFFlat) e traz
+    # max_results * BIOMETRY_ANN_OVERFETCH candidatos; o threshold é
+    # aplicado depois. Calibre os dois com evaluate_threshold.py.
+    if reduced is None:
+        candidates_sql = f"""
+            SELECT
+                sb.pet_id,
+                sb.quality_score,
+                1 - (sb.embedding <=> {embedding}) as similarity
+            FROM snout_biometries sb
+            WHERE sb.is_active = true
+            ORDER BY sb.embedding <=> {embedding}
+            LIMIT :candidates
+        """
+        overfetch = settings.BIOMETRY_ANN_OVERFETCH
+    else:
+        candidates_sql = f"""
+            SELECT
+                sb.pet_id,
+                sb.quality_score,
+                1 - (sb.embedding <=> {embedding}) as similarity
+            FROM (
+                SELECT id
+                FROM snout_biometries
+                WHERE is_active = true
+                ORDER BY embedding_reduced <=> {reduced}
+                LIMIT :candidates
+            ) ann
+            JOIN snout_biometries sb ON sb.id = ann.id
+        """
+        overfetch = settings.BIOMETRY_REDUCED_OVERFETCH
+
+    return f"""
+        SELECT 
+            c.pet_id,
+            c.quality_score,
+            c.similarity,
+            p.name as pet_name,
+            p.species,
+            p.breed,
+            p.photo_url,
+            u.full_name as owner_name,
+            u.phone as owner_phone
+        FROM ({candidates_sql}) c
+        JOIN pets p ON p.id = c.pet_id
+        JOIN users u ON u.id = p.owner_id
+        WHERE c.similarity >= :threshold
+        ORDER BY c.similarity DESC
+        LIMIT :max_results
+    """, overfetch
+
+
+def _reduce(embedding: List[float]) -> Optional[List[float]]:
+    """Embedding projetado para o índice reduzido (None sem projeção ativa)"""
+    projection = get_projection()
+    if projection is None:
+        return None
+    return projection.transform(embedding).tolist()
+
+
+def _mask_phone(phone: str) -> str:
+    """Mascara telefone para privacidade"""
+    if not phone or len(phone) < 4:
+        return "****"
+    return phone[:2] + "*" * (len(phone) - 4) + phone[-2:]
+
+
+def _row_to_result(row) -> dict:
+    """Converte uma linha da busca vetorial no dict de resultado"""
+    return {
+        "pet_id": row.pet_id,
+        "pet_name": row.pet_name,
+        "species": row.species,
+        "breed": row.breed,
+        "owner_name": row.owner_name,
+        "owner_phone": _mask_phone(row.owner_phone) if row.owner_phone else None,
+        "similarity": round(row.similarity, 4),
+        "distance_km": round(row.distance_km, 2) if getattr(row, "distance_km", None) is not None else None,
+        "has_contact_permission": True  # TODO: Verificar permissões
+    }
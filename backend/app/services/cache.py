@@ -0,0 +1,179 @@
+"""
+Cache em memória (por processo) com TTL e limite de itens.
+
+Usado para respostas públicas muito lidas (tiles do mapa, perfis). Cada
+worker do gunicorn tem o seu TTLCache.
+
+VersionedCache valida os itens locais contra um contador de versão por
+chave no Redis (REDIS_URL): invalidar incrementa a versão, o que vale para
+todos os workers e para jobs em outros processos (ex.: expiração de
+reportes), e cada leitura confere as versões com um único MGET. Sem
+REDIS_URL as versões são só do processo e o TTL limita por quanto tempo
+os outros workers podem servir um valor antigo.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+VERSION_KEY_PREFIX = "petid:version:"
+
+
+class TTLCache:
+    """LRU com expiração por item, seguro entre threads."""
+
+    def __init__(self, max_items: int, ttl_seconds: float):
+        self.max_items = max_items
+        self.ttl = ttl_seconds
+        self._items: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._items.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Retorna o valor em cache ou calcula, guarda e retorna."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self, predicate: Optional[Callable[[Hashable, Any], bool]] = None):
+        """Remove tudo, ou só os itens para os quais predicate(chave, valor) é True."""
+        with self._lock:
+            if predicate is None:
+                self._items.clear()
+                return
+            for key in [k for k, (_, v) in self._items.items() if predicate(k, v)]:
+                del self._items[key]
+
+
+_redis = None
+_local_versions: Dict[str, int] = {}
+_local_versions_lock = threading.Lock()
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        # Dependência só necessária com REDIS_URL configurado
+        import redis
+        _redis = redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.CACHE_REDIS_TIMEOUT,
+            socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT,
+        )
+    return _redis
+
+
+def get_versions(namespace: str, keys: List[Hashable]) -> Optional[List[int]]:
+    """
+    Versões atuais das chaves (0 se nunca invalidadas).
+
+    Returns:
+        Lista na ordem das chaves, ou None se o Redis não respondeu (o
+        chamador não deve usar nem guardar itens em cache)
+    """
+    names = [_version_name(namespace, key) for key in keys]
+    if not settings.REDIS_URL:
+        with _local_versions_lock:
+            return [_local_versions.get(name, 0) for name in names]
+    try:
+        return [int(value or 0) for value in _get_redis().mget(names)]
+    except Exception as e:
+        logger.warning(f"Versões do cache indisponíveis no Redis: {e}")
+        return None
+
+
+def bump_versions(namespace: str, keys: Iterable[Hashable]):
+    """Invalida as chaves em todos os processos (incrementa as versões)."""
+    names = [_version_name(namespace, key) for key in keys]
+    if not names:
+        return
+    if not settings.REDIS_URL:
+        with _local_versions_lock:
+            for name in names:
+                _local_versions[name] = _local_versions.get(name, 0) + 1
+        return
+    try:
+        with _get_redis().pipeline(transaction=False) as pipe:
+            for name in names:
+                pipe.incr(name)
+                # Sobrevive aos itens em cache; se expirar, a versão volta a
+                # 0 e os itens guardados com a antiga deixam de valer
+                pipe.expire(name, settings.CACHE_VERSION_TTL_SECONDS)
+            pipe.execute()
+    except Exception as e:
+        logger.warning(f"Falha ao invalidar cache no Redis: {e}")
+
+
+def _version_name(namespace: str, key: Hashable) -> str:
+    if isinstance(key, tuple):
+        key = "/".join(str(part) for part in key)
+    return f"{VERSION_KEY_PREFIX}{namespace}:{key}"
+
+
+class VersionedCache:
+    """TTLCache local cujos itens só valem enquanto a versão da chave não muda."""
+
+    def __init__(self, namespace: str, max_items: int, ttl_seconds: float):
+        self.namespace = namespace
+        self._items = TTLCache(max_items=max_items, ttl_seconds=ttl_seconds)
+
+    def lookup(self, keys: List[Hashable]) -> Tuple[Dict[Hashable, Any], Dict[Hashable, Optional[int]]]:
+        """
+        Itens válidos das chaves e as versões lidas.
+
+        Calcule os ausentes e guarde-os com store(chave, valor, versão
+        lida aqui): uma invalidação durante o cálculo muda a versão e o
+        valor guardado já nasce vencido.
+
+        Returns:
+            (itens encontrados, versão de cada chave ou None)
+        """
+        versions = get_versions(self.namespace, keys)
+        if versions is None:
+            return {}, {key: None for key in keys}
+
+        found = {}
+        for key, version in zip(keys, versions):
+            item = self._items.get(key)
+            if item is not None and item[0] == version:
+                found[key] = item[1]
+        return found, dict(zip(keys, versions))
+
+    def store(self, key: Hashable, value: Any, version: Optional[int]):
+        if version is not None:
+            self._items.set(key, (version, value))
+
+    def invalidate(self, *keys: Hashable):
+        for key in keys:
+            self._items.delete(key)
+        bump_versions(self.namespace, keys)
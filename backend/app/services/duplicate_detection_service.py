@@ -0,0 +1,188 @@
+"""
+Detecção de cadastros duplicados (o mesmo animal registrado em dois pets).
+
+Compara todas as biometrias ativas entre si sem um loop SQL por linha:
+1. Os embeddings são lidos uma única vez, em streaming ordenado por id,
+   para um arquivo temporário mapeado em memória (np.memmap): 1 milhão de
+   vetores de 768 floats ocupam ~3 GB em disco, não em RAM.
+2. A matriz de similaridade é calculada por blocos (bloco_i @ bloco_j.T,
+   j >= i). Só dois blocos e o produto entre eles ficam em memória, então o
+   pico é ~BLOCK_SIZE² floats independente do tamanho da galeria.
+3. Os pares acima do threshold são gravados em biometry_duplicate_candidates
+   a cada bloco. Pares já revisados ('confirmed'/'dismissed') não são
+   reabertos.
+"""
+import logging
+import os
+import tempfile
+import time
+from typing import Optional
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.biometry_duplicate import BiometryDuplicateCandidate
+from app.models.snout_biometry import SnoutBiometry
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 768
+INSERT_BATCH_SIZE = 5000
+
+
+class DuplicateDetectionService:
+    """Varre a galeria de biometrias em blocos e grava pares suspeitos"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def run(
+        self,
+        threshold: Optional[float] = None,
+        block_size: Optional[int] = None
+    ) -> dict:
+        """
+        Executa a varredura completa.
+
+        Args:
+            threshold: Similaridade mínima do par. Default: BIOMETRY_DUPLICATE_THRESHOLD
+            block_size: Linhas por bloco. Default: BIOMETRY_DUPLICATE_BLOCK_SIZE
+
+        Returns:
+            Estatísticas da execução
+        """
+        threshold = threshold if threshold is not None else settings.BIOMETRY_DUPLICATE_THRESHOLD
+        block_size = block_size or settings.BIOMETRY_DUPLICATE_BLOCK_SIZE
+        start_time = time.perf_counter()
+
+        total = self.db.scalar(
+            select(func.count()).select_from(SnoutBiometry).where(SnoutBiometry.is_active == True)
+        )
+        if total < 2:
+            return {"biometries": total, "pairs": 0, "seconds": 0.0}
+
+        with tempfile.TemporaryDirectory(prefix="petid-dups-") as tmp:
+            embeddings = np.memmap(
+                os.path.join(tmp, "embeddings.f32"), dtype=np.float32, mode="w+",
+                shape=(total, EMBEDDING_DIM)
+            )
+            biometry_ids = np.empty(total, dtype=np.int64)
+            pet_ids = np.empty(total, dtype=np.int64)
+
+            count = self._load_gallery(embeddings, biometry_ids, pet_ids, block_size)
+            pairs = self._compare_blocks(embeddings[:count], biometry_ids, pet_ids, threshold, block_size)
+
+            del embeddings
+
+        stats = {
+            "biometries": count,
+            "pairs": pairs,
+            "seconds": round(time.perf_counter() - start_time, 1),
+        }
+        logger.info(f"Detecção de duplicados concluída: {stats}")
+        return stats
+
+    def _load_gallery(
+        self,
+        embeddings: np.ndarray,
+        biometry_ids: np.ndarray,
+        pet_ids: np.ndarray,
+        block_size: int
+    ) -> int:
+        """Copia os embeddings ativos (normalizados) para o memmap, em streaming."""
+        rows = self.db.execute(
+            select(SnoutBiometry.id, SnoutBiometry.pet_id, SnoutBiometry.embedding)
+            .where(SnoutBiometry.is_active == True)
+            .order_by(SnoutBiometry.id)
+            .execution_options(yield_per=block_size)
+        )
+
+        count = 0
+        for partition in rows.partitions():
+            # Linhas criadas depois do COUNT ficam para a próxima execução
+            partition = partition[:len(biometry_ids) - count]
+            if not partition:
+                break
+
+            block = np.asarray([row.embedding for row in partition], dtype=np.float32)
+            block /= np.maximum(np.linalg.norm(block, axis=1, keepdims=True), 1e-12)
+
+            end = count + len(partition)
+            embeddings[count:end] = block
+            biometry_ids[count:end] = [row.id for row in partition]
+            pet_ids[count:end] = [row.pet_id for row in partition]
+            count = end
+
+        embeddings.flush()
+        return count
+
+    def _compare_blocks(
+        self,
+        embeddings: np.ndarray,
+        biometry_ids: np.ndarray,
+        pet_ids: np.ndarray,
+        threshold: float,
+        block_size: int
+    ) -> int:
+        """Produto em blocos do triângulo superior da matriz de similaridade."""
+        total = len(embeddings)
+        pairs = 0
+
+        for i_start in range(0, total, block_size):
+            i_end = min(i_start + block_size, total)
+            query_block = np.array(embeddings[i_start:i_end])
+
+            for j_start in range(i_start, total, block_size):
+                j_end = min(j_start + block_size, total)
+                similarity = query_block @ embeddings[j_start:j_end].T
+
+                if j_start == i_start:
+                    # Bloco diagonal: ignora o próprio vetor e pares repetidos
+                    similarity = np.triu(similarity, k=1)
+
+                rows, cols = np.nonzero(similarity >= threshold)
+                if len(rows) == 0:
+                    continue
+
+                pairs += self._save_pairs(
+                    rows + i_start, cols + j_start,
+                    similarity[rows, cols], biometry_ids, pet_ids
+                )
+
+            logger.info(f"Duplicados: {i_end}/{total} biometrias comparadas, {pairs} pares")
+
+        return pairs
+
+    def _save_pairs(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        scores: np.ndarray,
+        biometry_ids: np.ndarray,
+        pet_ids: np.ndarray
+    ) -> int:
+        """Upsert dos pares; atualiza a similaridade só dos ainda pendentes."""
+        values = [
+            {
+                "biometry_a_id": int(biometry_ids[a]),
+                "biometry_b_id": int(biometry_ids[b]),
+                "pet_a_id": int(pet_ids[a]),
+                "pet_b_id": int(pet_ids[b]),
+                "similarity": float(score),
+                "status": "pending",
+            }
+            for a, b, score in zip(rows, cols, scores)
+        ]
+
+        # Lotes abaixo do limite de 65535 parâmetros por comando do Postgres
+        for start in range(0, len(values), INSERT_BATCH_SIZE):
+            statement = insert(BiometryDuplicateCandidate).values(values[start:start + INSERT_BATCH_SIZE])
+            statement = statement.on_conflict_do_update(
+                constraint="uq_biometry_duplicate_pair",
+                set_={"similarity": statement.excluded.similarity, "updated_at": func.timezone("utc", func.now())},
+                where=BiometryDuplicateCandidate.status == "pending",
+            )
+            self.db.execute(statement)
+        self.db.commit()
+        return len(values)
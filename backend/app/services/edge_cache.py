@@ -0,0 +1,53 @@
+"""
+Atualização do micro-cache do nginx (/api/v1/public) após alterações.
+
+O nginx open source não tem purge; em vez disso a API pede a URL de novo
+com X-Cache-Refresh: <EDGE_CACHE_REFRESH_TOKEN>. Com o token correto, o
+nginx ignora a entrada atual, busca a resposta nova e a grava no lugar, e
+a API também ignora o próprio cache em memória nessa requisição. Sem o
+token (clientes externos, inclusive acessando a API direto) o header é
+ignorado.
+
+Desligado se EDGE_CACHE_PURGE_URL ou EDGE_CACHE_REFRESH_TOKEN estiverem
+vazios (ex.: sem nginx na frente).
+"""
+import hmac
+import logging
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REFRESH_HEADER = "X-Cache-Refresh"
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="edge-cache")
+
+
+def is_refresh(headers) -> bool:
+    """A requisição é uma atualização forçada (com o token) vinda do nginx?"""
+    token = settings.EDGE_CACHE_REFRESH_TOKEN
+    value = headers.get(REFRESH_HEADER)
+    return bool(token) and value is not None and hmac.compare_digest(value.encode(), token.encode())
+
+
+def purge(*paths: str):
+    """Atualiza as URLs (caminhos a partir de /api/v1) em background."""
+    if not settings.EDGE_CACHE_PURGE_URL or not settings.EDGE_CACHE_REFRESH_TOKEN:
+        return
+    for path in paths:
+        _executor.submit(_refresh, path)
+
+
+def _refresh(path: str):
+    url = settings.EDGE_CACHE_PURGE_URL.rstrip("/") + "/api/v1" + path
+    request = urllib.request.Request(url, headers={REFRESH_HEADER: settings.EDGE_CACHE_REFRESH_TOKEN})
+    try:
+        with urllib.request.urlopen(request, timeout=settings.EDGE_CACHE_PURGE_TIMEOUT):
+            pass
+    except urllib.error.HTTPError as e:
+        # 404 (pet removido) também substitui/descarta a entrada
+        if e.code != 404:
+            logger.warning(f"Falha ao atualizar cache do nginx ({path}): {e}")
+    except Exception as e:
+        logger.warning(f"Falha ao atualizar cache do nginx ({path}): {e}")
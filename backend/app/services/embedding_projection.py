@@ -0,0 +1,118 @@
+"""
+Projeção linear dos embeddings (768 -> REDUCED_DIM) para o índice ANN.
+
+O índice IVFFlat sobre vetores menores é mais rápido e ocupa menos memória;
+a projeção só escolhe os candidatos, e o rerank final usa o embedding
+completo, então a similaridade devolvida continua exata.
+
+Dois métodos, ajustados por `python -m app.reduce_embeddings fit`:
+- pca: componentes principais da galeria atual (melhor recall)
+- random: projeção ortogonal aleatória (não depende dos dados)
+
+A projeção é salva em BIOMETRY_PROJECTION_PATH (.npz) e carregada sob
+demanda. Sem o arquivo, a busca usa apenas o embedding completo.
+"""
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Dimensão da coluna snout_biometries.embedding_reduced
+REDUCED_DIM = 128
+
+
+class EmbeddingProjection:
+    """Projeção afim x -> normalize((x - mean) @ components.T)"""
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray, method: str, fitted_at: str = ""):
+        self.mean = mean.astype(np.float32)
+        self.components = components.astype(np.float32)
+        self.method = method
+        self.fitted_at = fitted_at or datetime.utcnow().isoformat()
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[0]
+
+    @classmethod
+    def fit_pca(cls, embeddings: np.ndarray, dim: int = REDUCED_DIM) -> "EmbeddingProjection":
+        """PCA via SVD da amostra centralizada."""
+        mean = embeddings.mean(axis=0)
+        # Vt já vem ordenado pela variância explicada
+        _, _, vt = np.linalg.svd(embeddings - mean, full_matrices=False)
+        return cls(mean, vt[:dim], "pca")
+
+    @classmethod
+    def fit_random(cls, input_dim: int, dim: int = REDUCED_DIM, seed: int = 0) -> "EmbeddingProjection":
+        """Projeção ortogonal aleatória (QR de uma matriz gaussiana)."""
+        rng = np.random.default_rng(seed)
+        q, _ = np.linalg.qr(rng.normal(size=(input_dim, dim)))
+        return cls(np.zeros(input_dim, dtype=np.float32), q.T, "random")
+
+    def transform(self, embeddings: np.ndarray) -> np.ndarray:
+        """Projeta (N, 768) ou (768,) e normaliza (busca por cosseno)."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        reduced = (embeddings - self.mean) @ self.components.T
+        norms = np.linalg.norm(reduced, axis=-1, keepdims=True)
+        return reduced / np.maximum(norms, 1e-12)
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez(path, mean=self.mean, components=self.components,
+                 method=self.method, fitted_at=self.fitted_at)
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingProjection":
+        data = np.load(path)
+        return cls(data["mean"], data["components"], str(data["method"]), str(data["fitted_at"]))
+
+
+def to_pgvector(embedding) -> str:
+    """Converte embedding para string no formato pgvector"""
+    return "[" + ",".join(str(float(x)) for x in embedding) + "]"
+
+
+_projection: Optional[EmbeddingProjection] = None
+_projection_mtime: Optional[float] = None
+_projection_lock = threading.Lock()
+
+
+def get_projection() -> Optional[EmbeddingProjection]:
+    """
+    Retorna a projeção ativa, ou None se desabilitada/não ajustada.
+
+    Recarrega o arquivo se ele mudou (novo `fit`), sem reiniciar a API.
+    """
+    global _projection, _projection_mtime
+
+    path = settings.BIOMETRY_PROJECTION_PATH
+    if not settings.BIOMETRY_REDUCED_INDEX_ENABLED or not path:
+        return None
+
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    if mtime != _projection_mtime:
+        with _projection_lock:
+            if mtime != _projection_mtime:
+                try:
+                    projection = EmbeddingProjection.load(path)
+                except Exception as e:
+                    logger.error(f"Projeção inválida em {path}: {e}")
+                    return None
+                if projection.dim != REDUCED_DIM:
+                    logger.error(f"Projeção com {projection.dim} dimensões; a coluna tem {REDUCED_DIM}")
+                    return None
+                _projection, _projection_mtime = projection, mtime
+                logger.info(f"Projeção {projection.method} carregada ({projection.fitted_at})")
+
+    return _projection
@@ -0,0 +1,96 @@
+"""
+Utilitários geográficos compartilhados pelas buscas por proximidade.
+
+A distância é calculada no próprio Postgres (fórmula de haversine), e uma
+caixa delimitadora (bounding box) em latitude/longitude é aplicada antes
+para descartar barato os pontos que certamente estão fora do raio.
+
+Para lost_pet_reports há um índice GiST em ll_to_earth(latitude,
+longitude) (extensões cube + earthdistance): within_radius() usa o
+earth_box do índice como pré-filtro e earth_distance para o raio exato.
+"""
+from math import cos, radians
+from typing import Tuple
+from sqlalchemy import func
+from sqlalchemy.sql.elements import ColumnElement
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.045
+
+# Haversine em SQL entre {lat}/{lon} e o ponto {ref_lat}/{ref_lon}
+# (least() evita asin(>1) por erro de arredondamento em pontos antípodas)
+HAVERSINE_SQL = (
+    "2 * 6371.0 * asin(least(1.0, sqrt("
+    "power(sin(radians({lat} - {ref_lat}) / 2), 2) + "
+    "cos(radians({ref_lat})) * cos(radians({lat})) * "
+    "power(sin(radians({lon} - {ref_lon}) / 2), 2)"
+    ")))"
+)
+
+
+def haversine_sql(
+    lat_column: str = "latitude",
+    lon_column: str = "longitude",
+    ref_lat: str = ":latitude",
+    ref_lon: str = ":longitude"
+) -> str:
+    """
+    Expressão SQL da distância (km) entre as colunas e o ponto de
+    referência (por padrão os parâmetros :latitude/:longitude).
+    """
+    return HAVERSINE_SQL.format(lat=lat_column, lon=lon_column, ref_lat=ref_lat, ref_lon=ref_lon)
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Caixa (min_lat, max_lat, min_lon, max_lon) que contém o círculo do raio.
+
+    Perto dos polos a caixa cobre todas as longitudes. Não trata o
+    antimeridiano (irrelevante para a área atendida).
+    """
+    delta_lat = radius_km / KM_PER_DEGREE_LAT
+    min_lat = max(-90.0, latitude - delta_lat)
+    max_lat = min(90.0, latitude + delta_lat)
+
+    lat_cos = cos(radians(latitude))
+    if lat_cos < 0.01 or max_lat >= 90.0 or min_lat <= -90.0:
+        return min_lat, max_lat, -180.0, 180.0
+
+    delta_lon = radius_km / (KM_PER_DEGREE_LAT * lat_cos)
+    return min_lat, max_lat, max(-180.0, longitude - delta_lon), min(180.0, longitude + delta_lon)
+
+
+def bounding_box_params(latitude: float, longitude: float, radius_km: float) -> dict:
+    """Parâmetros da query para o ponto, o raio e a bounding box."""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "radius_km": radius_km,
+        "min_lat": min_lat,
+        "max_lat": max_lat,
+        "min_lon": min_lon,
+        "max_lon": max_lon,
+    }
+
+
+def earth_point(lat_column, lon_column) -> ColumnElement:
+    """ll_to_earth(lat, lon): mesma expressão do índice GiST."""
+    return func.ll_to_earth(lat_column, lon_column)
+
+
+def distance_km(lat_column, lon_column, latitude: float, longitude: float) -> ColumnElement:
+    """Distância (km) em SQL entre as colunas e o ponto."""
+    return func.earth_distance(func.ll_to_earth(latitude, longitude), earth_point(lat_column, lon_column)) / 1000.0
+
+
+def within_radius(lat_column, lon_column, latitude: float, longitude: float, radius_km: float) -> ColumnElement:
+    """
+    Filtro "dentro do raio" que usa o índice GiST: o earth_box (cubo que
+    contém a esfera do raio) é resolvido pelo índice e o earth_distance
+    descarta os cantos do cubo.
+    """
+    center = func.ll_to_earth(latitude, longitude)
+    radius_m = radius_km * 1000.0
+    point = earth_point(lat_column, lon_column)
+    return func.earth_box(center, radius_m).op("@>")(point) & (func.earth_distance(center, point) <= radius_m)
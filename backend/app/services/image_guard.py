@@ -0,0 +1,84 @@
+"""
+Proteção contra imagens gigantes ou maliciosas (decompression bombs).
+
+Antes de decodificar, a imagem é inspecionada só pelo cabeçalho (formato,
+largura, altura e número de quadros), o que custa microssegundos. Imagens
+fora dos limites são rejeitadas; imagens grandes mas aceitáveis são
+decodificadas já reduzidas (modo draft do JPEG) e limitadas a
+IMAGE_MAX_SIDE, para que nenhum worker gaste segundos de CPU ou gigabytes
+de RAM em uma única foto.
+"""
+import io
+from PIL import Image
+from app.core.config import settings
+
+ALLOWED_FORMATS = {"JPEG", "MPO", "PNG", "WEBP"}
+
+
+def open_image(image_data: bytes) -> Image.Image:
+    """
+    Abre a imagem lendo apenas o cabeçalho e valida os limites.
+
+    Args:
+        image_data: Bytes da imagem
+
+    Returns:
+        PIL.Image ainda não decodificada (lazy)
+
+    Raises:
+        ValueError: Se a imagem for inválida ou exceder os limites
+    """
+    if len(image_data) > settings.IMAGE_MAX_BYTES:
+        raise ValueError(
+            f"Imagem muito grande ({len(image_data) / 1024 / 1024:.1f} MB). "
+            f"Máximo: {settings.IMAGE_MAX_BYTES / 1024 / 1024:.0f} MB"
+        )
+
+    try:
+        # Image.open só lê o cabeçalho; os pixels são decodificados depois
+        image = Image.open(io.BytesIO(image_data))
+    except Exception as e:
+        raise ValueError(f"Imagem inválida: {e}")
+
+    if image.format not in ALLOWED_FORMATS:
+        raise ValueError(f"Formato de imagem não suportado: {image.format}")
+
+    width, height = image.size
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValueError(
+            f"Resolução muito alta ({width}x{height}). "
+            f"Máximo: {settings.IMAGE_MAX_PIXELS / 1_000_000:.0f} megapixels"
+        )
+
+    if getattr(image, "n_frames", 1) > settings.IMAGE_MAX_FRAMES:
+        raise ValueError("Imagem animada/multi-quadro não suportada")
+
+    return image
+
+
+def decode_rgb(image_data: bytes) -> Image.Image:
+    """
+    Decodifica a imagem em RGB, reduzida a no máximo IMAGE_MAX_SIDE pixels.
+
+    Raises:
+        ValueError: Se a imagem for inválida ou exceder os limites
+    """
+    image = open_image(image_data)
+    max_side = settings.IMAGE_MAX_SIDE
+
+    try:
+        if max(image.size) > max_side:
+            # JPEG: decodifica direto em 1/2, 1/4 ou 1/8 da resolução
+            image.draft("RGB", (max_side, max_side))
+
+        # Converte para RGB se necessário
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        if max(image.size) > max_side:
+            image.thumbnail((max_side, max_side), Image.BILINEAR)
+
+        return image
+
+    except Exception as e:
+        raise ValueError(f"Imagem inválida: {e}")
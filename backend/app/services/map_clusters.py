@@ -0,0 +1,147 @@
+"""
+Agrupamento (clustering) dos reportes ativos para o mapa.
+
+O mundo é dividido numa grade equirretangular por nível de zoom: um tile
+tem 360 / 2^zoom graus de lado e é subdividido em CELLS_PER_TILE x
+CELLS_PER_TILE células. Cada célula vira um cluster com contagem, centroide
+e contagem por tipo (perdido/encontrado), calculados no Postgres com
+GROUP BY.
+
+Os resultados são guardados por tile (zoom, tx, ty) em cada worker: o
+pan/zoom do mapa reaproveita os tiles já calculados, e criar, resolver,
+remover ou expirar um reporte invalida só os tiles que contêm o ponto, em
+todos os processos (versões no Redis, ver app.services.cache).
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.services.cache import VersionedCache
+
+MAX_ZOOM = 20
+CELLS_PER_TILE = 8
+# Acima disso o bbox não condiz com o zoom (o cliente deve pedir zoom menor)
+MAX_TILES_PER_REQUEST = 256
+
+Tile = Tuple[int, int, int]  # (zoom, tx, ty)
+
+_tile_cache = VersionedCache(
+    "map-clusters",
+    max_items=settings.CLUSTER_CACHE_MAX_TILES,
+    ttl_seconds=settings.CLUSTER_CACHE_TTL_SECONDS,
+)
+
+
+def tile_size(zoom: int) -> float:
+    """Lado do tile em graus."""
+    return 360.0 / (2 ** zoom)
+
+
+def tile_for(latitude: float, longitude: float, zoom: int) -> Tile:
+    size = tile_size(zoom)
+    return zoom, int(math.floor((longitude + 180.0) / size)), int(math.floor((latitude + 90.0) / size))
+
+
+def tiles_for_bbox(min_lat: float, min_lon: float, max_lat: float, max_lon: float, zoom: int) -> List[Tile]:
+    """Tiles que cobrem o bbox (vazio se passar de MAX_TILES_PER_REQUEST)."""
+    _, tx0, ty0 = tile_for(min_lat, min_lon, zoom)
+    _, tx1, ty1 = tile_for(max_lat, max_lon, zoom)
+    if (tx1 - tx0 + 1) * (ty1 - ty0 + 1) > MAX_TILES_PER_REQUEST:
+        return []
+    return [(zoom, tx, ty) for tx in range(tx0, tx1 + 1) for ty in range(ty0, ty1 + 1)]
+
+
+def get_clusters(db: Session, min_lat: float, min_lon: float, max_lat: float, max_lon: float, zoom: int) -> Optional[List[dict]]:
+    """
+    Clusters dos tiles que cobrem o bbox.
+
+    Returns:
+        Lista de clusters, ou None se o bbox for grande demais para o zoom
+    """
+    tiles = tiles_for_bbox(min_lat, min_lon, max_lat, max_lon, zoom)
+    if not tiles:
+        return None
+
+    cached, versions = _tile_cache.lookup(tiles)
+    missing = [tile for tile in tiles if tile not in cached]
+    if missing:
+        cached.update(_load_tiles(db, missing, versions))
+
+    return [cell for tile in tiles for cell in cached[tile]]
+
+
+def invalidate_point(latitude: float, longitude: float):
+    """Descarta os tiles (de todos os zooms) que contêm o ponto, em todos os workers."""
+    invalidate_points([(latitude, longitude)])
+
+
+def invalidate_points(points: Iterable[Tuple[float, float]]):
+    """invalidate_point de vários pontos de uma vez (jobs em lote)."""
+    tiles = {
+        tile_for(latitude, longitude, zoom)
+        for latitude, longitude in points
+        for zoom in range(MAX_ZOOM + 1)
+    }
+    _tile_cache.invalidate(*tiles)
+
+
+def _load_tiles(db: Session, tiles: List[Tile], versions: Dict[Tile, Optional[int]]) -> Dict[Tile, List[dict]]:
+    """
+    Calcula os tiles pedidos com uma única query (GROUP BY por célula) e
+    guarda os pedidos no cache com as versões lidas antes da query.
+    """
+    zoom = tiles[0][0]
+    size = tile_size(zoom)
+    cell = size / CELLS_PER_TILE
+
+    tx0 = min(t[1] for t in tiles)
+    tx1 = max(t[1] for t in tiles)
+    ty0 = min(t[2] for t in tiles)
+    ty1 = max(t[2] for t in tiles)
+
+    # O retângulo que cobre os tiles faltantes: os tiles extras que ele
+    # incluir voltam no resultado, mas sem versão lida não são guardados
+    rows = db.execute(text("""
+        SELECT
+            floor((longitude + 180.0) / :cell)::bigint as cx,
+            floor((latitude + 90.0) / :cell)::bigint as cy,
+            count(*) as total,
+            count(*) FILTER (WHERE report_type = 'lost') as lost_count,
+            count(*) FILTER (WHERE report_type = 'found') as found_count,
+            avg(latitude) as latitude,
+            avg(longitude) as longitude,
+            min(id) as report_id
+        FROM lost_pet_reports
+        WHERE status = 'active'
+        AND latitude >= :min_lat AND latitude < :max_lat
+        AND longitude >= :min_lon AND longitude < :max_lon
+        GROUP BY cx, cy
+    """), {
+        "cell": cell,
+        "min_lat": ty0 * size - 90.0,
+        "max_lat": (ty1 + 1) * size - 90.0,
+        "min_lon": tx0 * size - 180.0,
+        "max_lon": (tx1 + 1) * size - 180.0,
+    }).fetchall()
+
+    result: Dict[Tile, List[dict]] = {
+        (zoom, tx, ty): [] for tx in range(tx0, tx1 + 1) for ty in range(ty0, ty1 + 1)
+    }
+    for row in rows:
+        tile = (zoom, row.cx // CELLS_PER_TILE, row.cy // CELLS_PER_TILE)
+        result.setdefault(tile, []).append({
+            "cell_id": f"{zoom}/{row.cx}/{row.cy}",
+            "latitude": round(row.latitude, 6),
+            "longitude": round(row.longitude, 6),
+            "count": row.total,
+            "lost_count": row.lost_count,
+            "found_count": row.found_count,
+            # Célula com um único reporte: o app pode abrir o pin direto
+            "report_id": row.report_id if row.total == 1 else None,
+        })
+
+    for tile in tiles:
+        _tile_cache.store(tile, result[tile], versions[tile])
+
+    return result
@@ -7,20 +7,49 @@ para re-identificação de animais e gera embeddings de 768 dimensões.
 Referências:
 - Modelo: https://huggingface.co/BVRA/MegaDescriptor-T-224
 - Paper: Animal Re-identification using MegaDescriptor
+
+torch, torchvision, timm e OpenCV são importados sob demanda (no primeiro
+uso do modelo), para que processos que não fazem inferência — Alembic,
+init_db.py e nós da API com ML_ENABLED=false — não paguem o custo de
+importar essas bibliotecas.
 """
 import base64
-import io
+import hashlib
 import logging
-from typing import List, Tuple, Optional
-from PIL import Image
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Tuple, Optional, Union
+from PIL import Image, ImageEnhance, ImageOps
 import numpy as np
-import torch
-import torchvision.transforms as transforms
-import timm
-import cv2
+from app.core.config import settings
+from app.services import image_guard, perceptual_hash
+
+if TYPE_CHECKING:
+    import torch
+    from app.services.ml_remote_service import RemoteEmbeddingService
 
 logger = logging.getLogger(__name__)
 
+# Caixa do focinho normalizada (x, y, largura, altura), valores 0-1
+SnoutBBox = Tuple[float, float, float, float]
+
+
+def snout_crop_mode(snout_bbox: Optional[SnoutBBox] = None) -> str:
+    """
+    Recorte aplicado antes do modelo com a configuração atual: 'client'
+    (caixa informada pelo app), 'cascade' (detector treinado) ou 'full'
+    (imagem inteira).
+
+    Embeddings com recortes diferentes não são comparáveis: gravado em
+    snout_biometries.crop_mode, e mudar a configuração exige
+    `python -m app.reembed_biometries`.
+    """
+    if snout_bbox is not None:
+        return "client"
+    if settings.SNOUT_DETECTION_ENABLED and settings.SNOUT_CASCADE_PATH:
+        return "cascade"
+    return "full"
+
 
 class MLEmbeddingService:
     """
@@ -35,20 +64,29 @@ class MLEmbeddingService:
     EMBEDDING_DIM = 768
     IMAGE_SIZE = (224, 224)
 
+    # MegaDescriptor usa ImageNet normalization
+    IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+    IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
     # Thresholds de qualidade
     MIN_IMAGE_SIZE = (100, 100)
     MIN_BRIGHTNESS = 30
     MAX_BRIGHTNESS = 225
     MIN_SHARPNESS = 100  # Laplacian variance
 
+    # Recortes de focinho em cache (por hash da imagem)
+    CROP_CACHE_SIZE = 2048
+
     def __init__(self):
-        """Inicializa o serviço de ML."""
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        """Inicializa o serviço de ML (sem importar torch ainda)."""
+        self.device = None
         self.model = None
-        self.transform = None
         self._model_loaded = False
+        self._snout_detector = None
+        self._crop_cache: "OrderedDict[bytes, Optional[Tuple[int, int, int, int]]]" = OrderedDict()
+        self._crop_cache_lock = threading.Lock()
 
-        logger.info(f"MLEmbeddingService inicializado. Device: {self.device}")
+        logger.info("MLEmbeddingService inicializado (modelo será carregado sob demanda)")
 
     def _load_model(self):
         """Carrega o modelo MegaDescriptor via timm (lazy loading)."""
@@ -56,6 +94,10 @@ class MLEmbeddingService:
             return
 
         try:
+            import torch
+            import timm
+
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
             logger.info(f"Carregando modelo {self.MODEL_NAME} via timm...")
 
             # Carrega modelo via timm (mais confiável para MegaDescriptor)
@@ -69,17 +111,6 @@ class MLEmbeddingService:
             self.model = self.model.to(self.device)
             self.model.eval()  # Modo de inferência
 
-            # Cria transform manual para pré-processamento
-            # MegaDescriptor usa ImageNet normalization
-            self.transform = transforms.Compose([
-                transforms.Resize(self.IMAGE_SIZE),
-                transforms.ToTensor(),
-                transforms.Normalize(
-                    mean=[0.485, 0.456, 0.406],  # ImageNet mean
-                    std=[0.229, 0.224, 0.225]     # ImageNet std
-                ),
-            ])
-
             self._model_loaded = True
             logger.info(f"Modelo carregado com sucesso via timm! Device: {self.device}")
 
@@ -87,37 +118,65 @@ class MLEmbeddingService:
             logger.error(f"Erro ao carregar modelo: {e}")
             raise RuntimeError(f"Falha ao carregar modelo ML: {e}")
 
-    def _decode_image(self, image_base64: str) -> Image.Image:
+    def preload_shared(self):
+        """
+        Carrega o modelo no processo master antes do fork dos workers.
+
+        Os pesos são congelados (sem gradiente) e movidos para memória
+        compartilhada, de modo que todos os workers leem as mesmas páginas
+        em vez de cada um manter sua própria cópia do MegaDescriptor.
+        """
+        self._load_model()
+
+        if self.device.type != "cpu":
+            # Em GPU cada worker usa o próprio contexto CUDA; nada a compartilhar
+            return
+
+        for param in self.model.parameters():
+            param.requires_grad_(False)
+        self.model.share_memory()
+
+        logger.info("Pesos do modelo movidos para memória compartilhada (pré-fork)")
+
+    def _decode_base64(self, image_base64: str) -> bytes:
         """
-        Decodifica imagem base64 para PIL Image.
+        Decodifica imagem base64 para bytes crus.
 
         Args:
             image_base64: String base64 da imagem (com ou sem prefixo data:image/...)
 
-        Returns:
-            PIL.Image: Imagem decodificada
-
         Raises:
-            ValueError: Se a imagem for inválida
+            ValueError: Se o base64 for inválido
         """
         try:
             # Remove prefixo data:image/...;base64, se existir
             if ',' in image_base64 and image_base64.startswith('data:'):
                 image_base64 = image_base64.split(',', 1)[1]
 
-            image_data = base64.b64decode(image_base64)
-            image = Image.open(io.BytesIO(image_data))
-
-            # Converte para RGB se necessário
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-
-            return image
+            return base64.b64decode(image_base64)
 
         except Exception as e:
             raise ValueError(f"Imagem base64 inválida: {e}")
 
-    def _assess_image_quality(self, image: Image.Image) -> Tuple[int, List[str]]:
+    def _decode_image_bytes(self, image_data: bytes) -> Image.Image:
+        """
+        Decodifica bytes crus (JPEG/PNG/...) para PIL Image RGB.
+
+        O cabeçalho é validado antes de decodificar (tamanho, resolução,
+        quadros) e imagens grandes são decodificadas já reduzidas.
+
+        Raises:
+            ValueError: Se a imagem for inválida ou exceder os limites
+        """
+        return image_guard.decode_rgb(image_data)
+
+    def _grayscale(self, image: Image.Image) -> np.ndarray:
+        """Imagem em tons de cinza (usada na avaliação de qualidade e no dHash)."""
+        import cv2
+
+        return cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2GRAY)
+
+    def _assess_image_quality(self, image: Image.Image, gray: Optional[np.ndarray] = None) -> Tuple[int, List[str]]:
         """
         Avalia a qualidade da imagem para biometria.
 
@@ -129,16 +188,16 @@ class MLEmbeddingService:
 
         Args:
             image: PIL Image
+            gray: Versão em tons de cinza já calculada (opcional)
 
         Returns:
             (quality_score, issues): Score 0-100 e lista de problemas
         """
+        import cv2
+
         quality_score = 100
         issues = []
 
-        # Converte para numpy array
-        img_array = np.array(image)
-
         # 1. Verifica resolução
         width, height = image.size
         if width < self.MIN_IMAGE_SIZE[0] or height < self.MIN_IMAGE_SIZE[1]:
@@ -146,7 +205,8 @@ class MLEmbeddingService:
             issues.append(f"Resolução muito baixa ({width}x{height}). Mínimo: {self.MIN_IMAGE_SIZE}")
 
         # 2. Verifica brilho
-        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+        if gray is None:
+            gray = self._grayscale(image)
         brightness = np.mean(gray)
 
         if brightness < self.MIN_BRIGHTNESS:
@@ -175,93 +235,328 @@ class MLEmbeddingService:
 
         return quality_score, issues
 
-    def _preprocess_image(self, image: Image.Image) -> torch.Tensor:
+    def _preprocess_images(self, images: List[Image.Image]) -> "torch.Tensor":
         """
-        Pré-processa imagem para o modelo.
+        Pré-processa um lote de imagens para o modelo.
 
-        Aplica:
-        - Resize para tamanho esperado pelo modelo (224x224)
-        - Normalização com média e std do ImageNet
-        - Conversão para tensor
+        Equivalente a Resize + ToTensor + Normalize do torchvision, mas
+        vetorizado: cada imagem é redimensionada com cv2.resize direto num
+        buffer uint8 do lote, convertida/transposta para float32 NCHW numa
+        única cópia e normalizada in-place com uma multiplicação e uma soma
+        ((x / 255 - mean) / std == x * scale + offset). O tensor final
+        compartilha a memória do buffer (torch.from_numpy, sem cópia).
 
         Args:
-            image: PIL Image
+            images: Lista de PIL Images
 
         Returns:
-            torch.Tensor: Tensor pronto para o modelo (batch de 1)
+            torch.Tensor: Tensor (N, 3, 224, 224) pronto para o modelo
         """
-        # Aplica transformações
-        tensor = self.transform(image)
+        import cv2
+        import torch
 
-        # Adiciona dimensão de batch
-        tensor = tensor.unsqueeze(0)
+        width, height = self.IMAGE_SIZE
+        staging = np.empty((len(images), height, width, 3), dtype=np.uint8)
 
-        # Move para device (GPU se disponível)
-        tensor = tensor.to(self.device)
+        for i, image in enumerate(images):
+            pixels = np.asarray(image)
+            # INTER_AREA ao reduzir se aproxima do resize antialiased do PIL
+            shrinking = pixels.shape[0] > height or pixels.shape[1] > width
+            interpolation = cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+            cv2.resize(pixels, (width, height), dst=staging[i], interpolation=interpolation)
 
-        return tensor
+        batch = np.empty((len(images), 3, height, width), dtype=np.float32)
+        np.copyto(batch, staging.transpose(0, 3, 1, 2))
 
-    @torch.no_grad()
-    def generate_embedding(self, image_base64: str) -> Tuple[Optional[List[float]], int, List[str]]:
+        scale = (1.0 / (255.0 * self.IMAGENET_STD)).reshape(1, 3, 1, 1)
+        offset = (-self.IMAGENET_MEAN / self.IMAGENET_STD).reshape(1, 3, 1, 1)
+        batch *= scale
+        batch += offset
+
+        # Move para device (GPU se disponível; em CPU não copia)
+        return torch.from_numpy(batch).to(self.device)
+
+    def _tta_views(self, image: Image.Image) -> List[Image.Image]:
         """
-        Gera embedding ML real para uma imagem.
+        Gera as visões de test-time augmentation de uma imagem.
+
+        Original, espelhada, recorte central de 90% e variações de brilho
+        de ±15%. O número de visões é o fator de custo do TTA.
+        """
+        width, height = image.size
+        dx, dy = int(width * 0.05), int(height * 0.05)
+        return [
+            image,
+            ImageOps.mirror(image),
+            image.crop((dx, dy, width - dx, height - dy)),
+            ImageEnhance.Brightness(image).enhance(1.15),
+            ImageEnhance.Brightness(image).enhance(0.85),
+        ]
+
+    def _embed_images(
+        self,
+        images: List[Image.Image],
+        tta: Optional[List[bool]] = None,
+        assessments: Optional[List[Tuple[int, List[str]]]] = None
+    ) -> List[Tuple[Optional[List[float]], int, List[str]]]:
+        """
+        Gera embeddings para várias imagens em um único forward pass.
+
+        Com TTA, as visões de cada imagem entram no mesmo batch e o embedding
+        final é a média dos embeddings normalizados das visões.
 
         Args:
-            image_base64: Imagem em base64
+            images: Lista de PIL Images já decodificadas
+            tta: Por imagem, se deve usar test-time augmentation
+            assessments: Qualidade já avaliada de cada imagem (opcional)
 
         Returns:
-            (embedding, quality_score, issues):
-                - embedding: Lista de floats (768 dims) ou None se falhar
-                - quality_score: Score de qualidade 0-100
-                - issues: Lista de problemas encontrados
+            Lista de (embedding, quality_score, issues), na mesma ordem
         """
+        tta = tta or [False] * len(images)
+
         try:
             # Carrega modelo se necessário (lazy loading)
             self._load_model()
 
-            # Decodifica imagem
-            image = self._decode_image(image_base64)
+            import torch
 
             # Avalia qualidade
-            quality_score, issues = self._assess_image_quality(image)
-
-            if quality_score < 50:
-                logger.warning(f"Qualidade baixa ({quality_score}): {issues}")
-                # Ainda tenta gerar embedding, mas retorna warning
+            if assessments is None:
+                assessments = [self._assess_image_quality(image) for image in images]
+
+            for quality_score, issues in assessments:
+                if quality_score < 50:
+                    logger.warning(f"Qualidade baixa ({quality_score}): {issues}")
+                    # Ainda tenta gerar embedding, mas retorna warning
+
+            # Monta o batch com todas as visões (1 por imagem sem TTA)
+            views = []
+            owners = []
+            for i, (image, use_tta) in enumerate(zip(images, tta)):
+                image_views = self._tta_views(image) if use_tta else [image]
+                views.extend(image_views)
+                owners.extend([i] * len(image_views))
 
             # Pré-processa
-            inputs = self._preprocess_image(image)
+            inputs = self._preprocess_images(views)
 
-            # Gera embedding via timm
+            # Gera embeddings via timm
             # O modelo já foi configurado com num_classes=0, então retorna features
-            features = self.model(inputs)
+            with torch.no_grad():
+                features = self.model(inputs)
 
-            # Extrai embedding (remove batch dimension)
-            embedding = features.squeeze().cpu().numpy()
+            features = features.cpu().numpy()
 
-            # Normalização L2 (importante para cosine similarity)
-            embedding = embedding / np.linalg.norm(embedding)
+            # Normalização L2 (importante para cosine similarity) de cada visão,
+            # média por imagem e nova normalização
+            features = features / np.linalg.norm(features, axis=1, keepdims=True)
+            embeddings = np.zeros((len(images), features.shape[1]), dtype=features.dtype)
+            np.add.at(embeddings, np.asarray(owners), features)
+            embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
 
-            # Converte para lista
-            embedding_list = embedding.tolist()
+            logger.info(f"{len(images)} embedding(s) gerado(s) com sucesso")
 
-            logger.info(f"Embedding gerado com sucesso. Qualidade: {quality_score}")
+            return [
+                (embedding.tolist(), quality_score, issues)
+                for embedding, (quality_score, issues) in zip(embeddings, assessments)
+            ]
 
-            return embedding_list, quality_score, issues
+        except Exception as e:
+            logger.error(f"Erro ao gerar embedding: {e}")
+            return [(None, 0, [f"Erro interno: {str(e)}"])] * len(images)
+
+    def generate_embedding(
+        self,
+        image_base64: str,
+        snout_bbox: Optional[SnoutBBox] = None,
+        tta: bool = False
+    ) -> Tuple[Optional[List[float]], int, List[str]]:
+        """
+        Gera embedding ML real para uma imagem.
+
+        Args:
+            image_base64: Imagem em base64
+            snout_bbox: Caixa do focinho informada pelo cliente (pula a detecção)
+            tta: Usa test-time augmentation (mais robusto, ~5x o custo de inferência)
+
+        Returns:
+            (embedding, quality_score, issues):
+                - embedding: Lista de floats (768 dims) ou None se falhar
+                - quality_score: Score de qualidade 0-100
+                - issues: Lista de problemas encontrados
+        """
+        return self._generate_many([image_base64], self._decode_base64, [snout_bbox], [tta])[0]
+
+    def generate_embedding_with_hash(
+        self,
+        image_base64: str,
+        snout_bbox: Optional[SnoutBBox] = None,
+        tta: bool = False,
+        known_hash: Optional[int] = None
+    ) -> Tuple[Optional[List[float]], int, List[str], Optional[int]]:
+        """
+        Como generate_embedding, mas também retorna o dHash do recorte que
+        vai ao modelo, calculado sobre o mesmo cinza da avaliação de
+        qualidade.
 
+        Se o hash for igual a known_hash (mesma foto já registrada), o
+        modelo não roda e o embedding volta None: o chamador reutiliza o
+        embedding que já tem.
+
+        Returns:
+            (embedding, quality_score, issues, perceptual_hash)
+        """
+        try:
+            image_data = self._decode_base64(image_base64)
+            image = self._crop_snout(image_data, self._decode_image_bytes(image_data), snout_bbox)
+            gray = self._grayscale(image)
         except ValueError as e:
             logger.error(f"Erro de validação: {e}")
-            return None, 0, [str(e)]
+            return None, 0, [str(e)], None
+
+        quality_score, issues = self._assess_image_quality(image, gray)
+        phash = perceptual_hash.dhash_gray(gray)
+        if known_hash is not None and phash == known_hash:
+            return None, quality_score, issues, phash
+
+        embedding, quality_score, issues = self._embed_images([image], [tta], [(quality_score, issues)])[0]
+        return embedding, quality_score, issues, phash
+
+    def generate_embeddings(
+        self,
+        images_base64: List[str],
+        tta: bool = False
+    ) -> List[Tuple[Optional[List[float]], int, List[str]]]:
+        """
+        Versão em lote de generate_embedding: um único forward pass.
+
+        Args:
+            images_base64: Lista de imagens em base64
+            tta: Usa test-time augmentation em todas as imagens
+
+        Returns:
+            Lista de (embedding, quality_score, issues), na mesma ordem
+        """
+        return self._generate_many(images_base64, self._decode_base64, tta=[tta] * len(images_base64))
+
+    def generate_embeddings_batch(
+        self,
+        images: List[bytes],
+        snout_bboxes: Optional[List[Optional[SnoutBBox]]] = None,
+        tta: Optional[List[bool]] = None
+    ) -> List[Tuple[Optional[List[float]], int, List[str]]]:
+        """
+        Gera embeddings para um lote de imagens (bytes crus) em um forward pass.
+
+        Args:
+            images: Lista de imagens em bytes (JPEG/PNG/...)
+            snout_bboxes: Caixas do focinho informadas pelo cliente (opcional)
+            tta: Por imagem, se deve usar test-time augmentation (opcional)
+
+        Returns:
+            Lista de (embedding, quality_score, issues), na mesma ordem
+        """
+        return self._generate_many(images, bytes, snout_bboxes, tta)
+
+    def _generate_many(
+        self,
+        images: list,
+        to_bytes,
+        snout_bboxes: Optional[List[Optional[SnoutBBox]]] = None,
+        tta: Optional[List[bool]] = None
+    ) -> List[Tuple[Optional[List[float]], int, List[str]]]:
+        """Decodifica e recorta cada imagem e gera os embeddings das válidas em lote.
+
+        Imagens inválidas recebem (None, 0, [erro]) sem derrubar o lote.
+        """
+        results: List[Tuple[Optional[List[float]], int, List[str]]] = [None] * len(images)
+        snout_bboxes = snout_bboxes or [None] * len(images)
+        tta = tta or [False] * len(images)
+        decoded = []
+
+        for i, (image, snout_bbox) in enumerate(zip(images, snout_bboxes)):
+            try:
+                image_data = to_bytes(image)
+                decoded.append((i, self._crop_snout(image_data, self._decode_image_bytes(image_data), snout_bbox)))
+            except ValueError as e:
+                logger.error(f"Erro de validação: {e}")
+                results[i] = (None, 0, [str(e)])
+
+        if decoded:
+            embedded = self._embed_images([image for _, image in decoded], [tta[i] for i, _ in decoded])
+            for (i, _), result in zip(decoded, embedded):
+                results[i] = result
+
+        return results
+
+    def _crop_snout(self, image_data: bytes, image: Image.Image, snout_bbox: Optional[SnoutBBox]) -> Image.Image:
+        """
+        Recorta a região do focinho antes do pré-processamento.
+
+        Usa a caixa do cliente quando informada; senão, com um cascade
+        treinado configurado, roda o detector, com o resultado em cache
+        pelo hash da imagem (reenvios não detectam de novo).
+        """
+        width, height = image.size
+
+        if snout_bbox is not None:
+            x, y, w, h = snout_bbox
+            box = (
+                max(0, int(x * width)),
+                max(0, int(y * height)),
+                min(width, int((x + w) * width)),
+                min(height, int((y + h) * height)),
+            )
+            if box[2] - box[0] < 1 or box[3] - box[1] < 1:
+                raise ValueError("Caixa do focinho inválida")
+            return image.crop(box)
+
+        if snout_crop_mode() != "cascade":
+            return image
+
+        key = hashlib.sha1(image_data).digest()
+        with self._crop_cache_lock:
+            cached = key in self._crop_cache
+            if cached:
+                self._crop_cache.move_to_end(key)
+                box = self._crop_cache[key]
+
+        if not cached:
+            box = self._detect_snout_box(image, cascade_only=True)
+            with self._crop_cache_lock:
+                self._crop_cache[key] = box
+                if len(self._crop_cache) > self.CROP_CACHE_SIZE:
+                    self._crop_cache.popitem(last=False)
+
+        return image.crop(box) if box else image
+
+    def _detect_snout_box(
+        self,
+        image: Image.Image,
+        cascade_only: bool = False
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """Caixa (left, top, right, bottom) do focinho ou None."""
+        if self._snout_detector is None:
+            from app.services.snout_detector import SnoutDetector
+            self._snout_detector = SnoutDetector(settings.SNOUT_CASCADE_PATH)
+
+        # Cascade inválido: não recorta com a heurística
+        if cascade_only and not self._snout_detector.has_cascade:
+            return None
+
+        try:
+            return self._snout_detector.detect(np.asarray(image))
         except Exception as e:
-            logger.error(f"Erro ao gerar embedding: {e}")
-            return None, 0, [f"Erro interno: {str(e)}"]
+            logger.warning(f"Falha na detecção do focinho, usando imagem completa: {e}")
+            return None
 
     def detect_snout_region(self, image: Image.Image) -> Optional[Image.Image]:
         """
-        Detecta e recorta a região do focinho (OPCIONAL - melhoria futura).
+        Detecta e recorta a região do focinho.
 
-        Usa cascade classifiers do OpenCV ou modelos de detecção de objetos.
-        Por enquanto, retorna a imagem completa.
+        Usa o cascade do OpenCV em SNOUT_CASCADE_PATH, se configurado, ou
+        a heurística de textura de SnoutDetector.
 
         Args:
             image: PIL Image
@@ -269,21 +564,15 @@ class MLEmbeddingService:
         Returns:
             PIL.Image com região do focinho ou None se não detectar
         """
-        # TODO: Implementar detecção de focinho
-        # Opções:
-        # 1. Haar Cascade (OpenCV) - rápido mas menos preciso
-        # 2. YOLO/Faster R-CNN - mais preciso mas mais pesado
-        # 3. Modelo específico de detecção de focinho
-
-        # Por enquanto, retorna imagem completa
-        return image
+        box = self._detect_snout_box(image)
+        return image.crop(box) if box else None
 
     def get_model_info(self) -> dict:
         """Retorna informações sobre o modelo carregado."""
         return {
             "model_name": self.MODEL_NAME,
             "embedding_dim": self.EMBEDDING_DIM,
-            "device": str(self.device),
+            "device": str(self.device) if self.device is not None else None,
             "model_loaded": self._model_loaded,
             "image_size": self.IMAGE_SIZE
         }
@@ -293,11 +582,20 @@ class MLEmbeddingService:
 _ml_service_instance = None
 
 
-def get_ml_service() -> MLEmbeddingService:
-    """Retorna instância singleton do serviço de ML."""
+def get_ml_service() -> Union[MLEmbeddingService, "RemoteEmbeddingService"]:
+    """
+    Retorna instância singleton do serviço de ML.
+
+    Com ML_ENABLED=false o nó não carrega o modelo: retorna um cliente que
+    delega a geração de embeddings para o nó de ML em ML_SERVICE_URL.
+    """
     global _ml_service_instance
 
     if _ml_service_instance is None:
-        _ml_service_instance = MLEmbeddingService()
+        if settings.ML_ENABLED:
+            _ml_service_instance = MLEmbeddingService()
+        else:
+            from app.services.ml_remote_service import RemoteEmbeddingService
+            _ml_service_instance = RemoteEmbeddingService(settings.ML_SERVICE_URL)
 
     return _ml_service_instance
@@ -0,0 +1,140 @@
+"""
+Protocolo binário entre a API e o serviço de embeddings (app.ml_server).
+
+Cada mensagem é um cabeçalho de tamanho fixo seguido do payload:
+
+Request  (8 bytes + imagem):
+    magic "PI" | versão u8 | op u8 | tamanho do payload u32 | payload
+
+    op = OP_EMBED | flags
+    payload = [caixa do focinho, se FLAG_BBOX: 4 float32 x, y, largura,
+              altura normalizados] + bytes da imagem
+    FLAG_TTA pede test-time augmentation
+
+Response (11 bytes + vetor + problemas):
+    magic "PI" | versão u8 | status u8 | qualidade u8 | dimensão u16 |
+    tamanho dos problemas u32 | dimensão * float32 (little-endian) |
+    problemas em UTF-8 separados por "\n"
+
+Sem base64 e sem JSON: a imagem trafega crua e o embedding volta como
+768 float32 (3 KB), em vez de ~15 KB de texto.
+"""
+import struct
+from typing import List, Optional, Tuple
+import numpy as np
+
+MAGIC = b"PI"
+VERSION = 1
+
+OP_EMBED = 0x01
+OP_MASK = 0x0F
+FLAG_BBOX = 0x10
+FLAG_TTA = 0x20
+
+STATUS_OK = 0
+STATUS_BUSY = 1
+STATUS_ERROR = 2
+
+REQUEST_HEADER = struct.Struct("!2sBBI")
+RESPONSE_HEADER = struct.Struct("!2sBBBHI")
+BBOX = struct.Struct("!4f")
+
+# Limite de segurança para o tamanho de uma imagem em uma requisição
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """Mensagem malformada ou versão incompatível."""
+    pass
+
+
+def encode_request(
+    image_data: bytes,
+    snout_bbox: Optional[Tuple[float, float, float, float]] = None,
+    tta: bool = False,
+) -> bytes:
+    """Monta uma requisição de embedding a partir dos bytes da imagem."""
+    op = OP_EMBED
+    payload = image_data
+
+    if snout_bbox is not None:
+        op |= FLAG_BBOX
+        payload = BBOX.pack(*snout_bbox) + image_data
+    if tta:
+        op |= FLAG_TTA
+
+    return REQUEST_HEADER.pack(MAGIC, VERSION, op, len(payload)) + payload
+
+
+def decode_request_payload(
+    op: int, payload: bytes
+) -> Tuple[bytes, Optional[Tuple[float, float, float, float]], bool]:
+    """
+    Separa imagem, caixa do focinho e flag de TTA do payload.
+
+    Returns:
+        (bytes_da_imagem, caixa_ou_None, tta)
+    """
+    if op & OP_MASK != OP_EMBED:
+        raise ProtocolError(f"Operação inválida: {op}")
+
+    snout_bbox = None
+    if op & FLAG_BBOX:
+        if len(payload) < BBOX.size:
+            raise ProtocolError("Payload sem caixa do focinho")
+        snout_bbox = BBOX.unpack(payload[:BBOX.size])
+        payload = payload[BBOX.size:]
+
+    return payload, snout_bbox, bool(op & FLAG_TTA)
+
+
+def decode_request_header(header: bytes) -> Tuple[int, int]:
+    """
+    Valida o cabeçalho de uma requisição.
+
+    Returns:
+        (op, tamanho_da_imagem)
+    """
+    magic, version, op, length = REQUEST_HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ProtocolError("Cabeçalho inválido")
+    if length > MAX_IMAGE_BYTES:
+        raise ProtocolError(f"Imagem muito grande ({length} bytes)")
+    return op, length
+
+
+def encode_response(
+    status: int,
+    embedding: Optional[List[float]] = None,
+    quality_score: int = 0,
+    issues: Optional[List[str]] = None,
+) -> bytes:
+    """Monta a resposta com o vetor em float32."""
+    vector = np.asarray(embedding if embedding is not None else [], dtype="<f4")
+    issues_data = "\n".join(issues or []).encode("utf-8")
+    header = RESPONSE_HEADER.pack(
+        MAGIC, VERSION, status, max(0, min(100, quality_score)), vector.size, len(issues_data)
+    )
+    return header + vector.tobytes() + issues_data
+
+
+def decode_response_header(header: bytes) -> Tuple[int, int, int, int]:
+    """
+    Valida o cabeçalho de uma resposta.
+
+    Returns:
+        (status, qualidade, dimensão, tamanho_dos_problemas)
+    """
+    magic, version, status, quality, dim, issues_length = RESPONSE_HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ProtocolError("Cabeçalho inválido")
+    return status, quality, dim, issues_length
+
+
+def decode_response_body(dim: int, body: bytes) -> Tuple[Optional[List[float]], List[str]]:
+    """Separa vetor e problemas do corpo da resposta."""
+    vector_size = dim * 4
+    embedding = np.frombuffer(body[:vector_size], dtype="<f4").tolist() if dim else None
+    issues_text = body[vector_size:].decode("utf-8")
+    issues = issues_text.split("\n") if issues_text else []
+    return embedding, issues
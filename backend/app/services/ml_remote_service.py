@@ -0,0 +1,252 @@
+"""
+Cliente para delegar a geração de embeddings a um nó de ML.
+
+Usado quando a API roda com ML_ENABLED=false: o processo não importa
+torch/timm/OpenCV e encaminha as imagens para um nó com o modelo carregado.
+
+O transporte depende do esquema de ML_SERVICE_URL:
+- unix:// ou tcp://: serviço de embeddings standalone (app.ml_server), com
+  protocolo binário e pool de conexões persistentes
+- http:// ou https://: outra instância da API com ML habilitado
+  (endpoint interno POST /api/v1/biometry/embed)
+"""
+import base64
+import json
+import logging
+import queue
+import socket
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Tuple, Optional
+from urllib.parse import urlparse
+from app.core.config import settings
+from app.services.ml_protocol import (
+    RESPONSE_HEADER,
+    STATUS_OK,
+    ProtocolError,
+    decode_response_body,
+    decode_response_header,
+    encode_request,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _ConnectionPool:
+    """
+    Pool de sockets para o serviço de embeddings.
+
+    O número de conexões é limitado: se todas estiverem ocupadas por mais
+    que o timeout, a chamada falha em vez de enfileirar indefinidamente.
+    """
+
+    def __init__(self, address: str, size: int, timeout: float):
+        parsed = urlparse(address)
+        if parsed.scheme == "unix":
+            self.family, self.address = socket.AF_UNIX, parsed.path
+        else:
+            self.family, self.address = socket.AF_INET, (parsed.hostname, parsed.port)
+
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[socket.socket]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self) -> socket.socket:
+        """Retorna uma conexão ociosa ou abre uma nova."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("Nenhuma conexão livre com o serviço de ML")
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        try:
+            sock = socket.socket(self.family, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.address)
+            return sock
+        except OSError:
+            self._slots.release()
+            raise
+
+    def release(self, sock: socket.socket, broken: bool = False):
+        """Devolve a conexão ao pool (ou descarta, se quebrada)."""
+        if broken:
+            sock.close()
+        else:
+            self._idle.put(sock)
+        self._slots.release()
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """Lê exatamente `size` bytes do socket."""
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            raise ConnectionError("Conexão fechada pelo serviço de ML")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class RemoteEmbeddingService:
+    """
+    Mesma interface de MLEmbeddingService, mas sem modelo local.
+
+    Erros de rede são convertidos no mesmo formato de retorno do serviço
+    local (embedding None + lista de problemas), para que o BiometryService
+    não precise diferenciar os dois casos.
+    """
+
+    EMBED_PATH = "/api/v1/biometry/embed"
+
+    def __init__(self, base_url: Optional[str]):
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.timeout = settings.ML_SERVICE_TIMEOUT
+        self._pool = None
+
+        if self.base_url and urlparse(self.base_url).scheme in ("unix", "tcp"):
+            self._pool = _ConnectionPool(self.base_url, settings.ML_SERVICE_POOL_SIZE, self.timeout)
+
+    def generate_embedding(
+        self,
+        image_base64: str,
+        snout_bbox: Optional[Tuple[float, float, float, float]] = None,
+        tta: bool = False
+    ) -> Tuple[Optional[List[float]], int, List[str]]:
+        """
+        Gera embedding no nó de ML.
+
+        Args:
+            image_base64: Imagem em base64
+            snout_bbox: Caixa do focinho informada pelo cliente (opcional)
+            tta: Usa test-time augmentation
+
+        Returns:
+            (embedding, quality_score, issues) no mesmo formato do serviço local
+        """
+        if not self.base_url:
+            logger.error("ML_ENABLED=false mas ML_SERVICE_URL não configurado")
+            return None, 0, ["Serviço de ML indisponível"]
+
+        if self._pool is not None:
+            try:
+                # Remove prefixo data:image/...;base64, se existir
+                if ',' in image_base64 and image_base64.startswith('data:'):
+                    image_base64 = image_base64.split(',', 1)[1]
+                image_data = base64.b64decode(image_base64)
+            except Exception as e:
+                return None, 0, [f"Imagem base64 inválida: {e}"]
+
+            return self._embed_binary(image_data, snout_bbox, tta)
+
+        return self._embed_http(image_base64, snout_bbox, tta)
+
+    def generate_embedding_with_hash(
+        self,
+        image_base64: str,
+        snout_bbox: Optional[Tuple[float, float, float, float]] = None,
+        tta: bool = False,
+        known_hash: Optional[int] = None
+    ) -> Tuple[Optional[List[float]], int, List[str], Optional[int]]:
+        """
+        O nó de ML não devolve o dHash do recorte: sempre gera o embedding
+        e o hash volta None (a biometria fica sem hash).
+        """
+        embedding, quality_score, issues = self.generate_embedding(image_base64, snout_bbox, tta)
+        return embedding, quality_score, issues, None
+
+    def generate_embeddings(
+        self,
+        images_base64: List[str],
+        tta: bool = False
+    ) -> List[Tuple[Optional[List[float]], int, List[str]]]:
+        """
+        Versão em lote: envia as imagens em paralelo (até o tamanho do pool).
+
+        O serviço de embeddings agrupa as requisições simultâneas no mesmo
+        forward pass.
+        """
+        embed = partial(self.generate_embedding, tta=tta)
+
+        if len(images_base64) <= 1:
+            return [embed(image) for image in images_base64]
+
+        max_workers = min(len(images_base64), settings.ML_SERVICE_POOL_SIZE)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(embed, images_base64))
+
+    def _embed_binary(
+        self,
+        image_data: bytes,
+        snout_bbox: Optional[Tuple[float, float, float, float]] = None,
+        tta: bool = False
+    ) -> Tuple[Optional[List[float]], int, List[str]]:
+        """Envia a imagem crua ao serviço de embeddings (protocolo binário)."""
+        try:
+            sock = self._pool.acquire()
+        except (OSError, TimeoutError) as e:
+            logger.error(f"Erro ao conectar ao serviço de ML: {e}")
+            return None, 0, [f"Serviço de ML indisponível: {e}"]
+
+        broken = True
+        try:
+            sock.sendall(encode_request(image_data, snout_bbox, tta))
+            status, quality, dim, issues_length = decode_response_header(
+                _recv_exactly(sock, RESPONSE_HEADER.size)
+            )
+            embedding, issues = decode_response_body(dim, _recv_exactly(sock, dim * 4 + issues_length))
+            broken = False
+        except (OSError, ProtocolError) as e:
+            logger.error(f"Erro ao chamar serviço de ML: {e}")
+            return None, 0, [f"Serviço de ML indisponível: {e}"]
+        finally:
+            self._pool.release(sock, broken=broken)
+
+        if status != STATUS_OK:
+            return None, quality, issues
+
+        return embedding, quality, issues
+
+    def _embed_http(
+        self,
+        image_base64: str,
+        snout_bbox: Optional[Tuple[float, float, float, float]] = None,
+        tta: bool = False
+    ) -> Tuple[Optional[List[float]], int, List[str]]:
+        """Delega a outra instância da API com ML habilitado."""
+        body = {"image_base64": image_base64, "tta": tta}
+        if snout_bbox is not None:
+            x, y, width, height = snout_bbox
+            body["snout_bbox"] = {"x": x, "y": y, "width": width, "height": height}
+
+        request = urllib.request.Request(
+            self.base_url + self.EMBED_PATH,
+            data=json.dumps(body).encode("utf-8"),
+            headers={
+                "Content-Type": "application/json",
+                "X-ML-Token": settings.ML_SERVICE_TOKEN,
+            },
+            method="POST",
+        )
+
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.loads(response.read())
+        except (urllib.error.URLError, TimeoutError, ValueError) as e:
+            logger.error(f"Erro ao chamar nó de ML: {e}")
+            return None, 0, [f"Serviço de ML indisponível: {e}"]
+
+        return payload["embedding"], payload["quality_score"], payload["issues"]
+
+    def get_model_info(self) -> dict:
+        """Retorna informações sobre o nó de ML remoto."""
+        return {
+            "remote": True,
+            "service_url": self.base_url,
+        }
@@ -0,0 +1,48 @@
+"""
+Hash perceptual (dHash) para detectar reenvios da mesma foto.
+
+Fotos reenviadas, recomprimidas ou levemente redimensionadas geram o mesmo
+hash. O hash é calculado pelo pipeline de embedding sobre o recorte do
+focinho que vai ao modelo (o mesmo cinza da avaliação de qualidade) e
+gravado com a biometria.
+
+Escopo: o hash só evita o modelo no recadastro do mesmo pet, quando bate
+exatamente com o da biometria atual dele (o embedding guardado é
+reaproveitado). A busca por focinho e o cadastro de outros pets sempre
+rodam o transformer: closes de focinhos diferentes podem ter dHash igual
+ou a poucos bits, e resolver a busca pelo hash devolveria outro pet com
+similaridade 1.0.
+"""
+from PIL import Image
+import numpy as np
+
+HASH_SIZE = 8
+
+
+def dhash(image: Image.Image) -> int:
+    """
+    Calcula o dHash (difference hash) de 64 bits da imagem.
+
+    A imagem é reduzida para 9x8 em tons de cinza e cada bit indica se um
+    pixel é mais claro que o vizinho à direita.
+    """
+    gray = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR)
+    pixels = np.asarray(gray, dtype=np.int16)
+    diff = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(diff.flatten()).tobytes(), "big")
+
+
+def dhash_gray(gray: np.ndarray) -> int:
+    """dHash de uma imagem já em tons de cinza (array uint8 2D)."""
+    return dhash(Image.fromarray(gray))
+
+
+def to_signed(value: int) -> int:
+    """Converte o hash sem sinal para BIGINT (int64 com sinal) do Postgres."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def to_unsigned(value: int) -> int:
+    """Inverso de to_signed (valor lido do banco)."""
+    return value & ((1 << 64) - 1)
+
@@ -0,0 +1,122 @@
+"""
+Perfil público do pet (QR Code e identificação por biometria).
+
+Os dois endpoints públicos de perfil usam o mesmo builder: pet, dono,
+reporte de perdido, biometria, vacinas e medicamentos vêm de uma única
+query (joins + subqueries agregadas em JSON).
+
+O perfil fica em cache por pet, sem mascarar o telefone (cada endpoint
+decide o que expor). As rotas (e jobs) que alteram qualquer uma dessas
+tabelas chamam invalidate_pet/invalidate_owner após o commit: a versão do
+pet no Redis muda para todos os workers e a entrada do perfil no
+micro-cache do nginx é atualizada.
+"""
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.http_cache import make_etag
+from app.models.pet import Pet
+from app.services import edge_cache
+from app.services.cache import VersionedCache
+
+_profile_cache = VersionedCache(
+    "pet-profile",
+    max_items=settings.PET_PROFILE_CACHE_MAX_ITEMS,
+    ttl_seconds=settings.PET_PROFILE_CACHE_TTL_SECONDS,
+)
+
+PROFILE_QUERY = text("""
+    SELECT
+        p.id,
+        p.owner_id,
+        p.name,
+        p.species,
+        p.breed,
+        p.sex,
+        p.photo_url,
+        u.full_name as owner_name,
+        u.phone as owner_phone,
+        EXISTS (
+            SELECT 1 FROM lost_pet_reports r
+            WHERE r.pet_id = p.id AND r.report_type = 'lost' AND r.status = 'active'
+        ) as is_lost,
+        EXISTS (
+            SELECT 1 FROM snout_biometries sb
+            WHERE sb.pet_id = p.id AND sb.is_active = true
+        ) as has_biometry,
+        COALESCE((
+            SELECT json_agg(json_build_object('title', v.title, 'event_date', v.event_date)
+                            ORDER BY v.event_date DESC)
+            FROM (
+                SELECT title, event_date FROM medical_records
+                WHERE pet_id = p.id AND type = 'vaccine'
+                ORDER BY event_date DESC
+                LIMIT 5
+            ) v
+        ), '[]'::json) as vaccines,
+        COALESCE((
+            SELECT json_agg(json_build_object(
+                'name', m.name,
+                'dosage', m.dosage,
+                'frequency', m.frequency,
+                'is_active', m.is_active
+            ) ORDER BY m.id)
+            FROM medications m
+            WHERE m.pet_id = p.id AND m.is_active = true
+        ), '[]'::json) as active_medications,
+        -- GREATEST ignora NULLs
+        GREATEST(
+            p.updated_at,
+            u.updated_at,
+            (SELECT max(updated_at) FROM lost_pet_reports WHERE pet_id = p.id),
+            (SELECT max(updated_at) FROM snout_biometries WHERE pet_id = p.id),
+            (SELECT max(updated_at) FROM medical_records WHERE pet_id = p.id AND type = 'vaccine'),
+            (SELECT max(updated_at) FROM medications WHERE pet_id = p.id)
+        ) as last_modified
+    FROM pets p
+    LEFT JOIN users u ON u.id = p.owner_id
+    WHERE p.id = :pet_id
+""")
+
+
+def get_pet_profile(db: Session, pet_id: int, refresh: bool = False) -> Optional[dict]:
+    """
+    Dados do perfil público do pet (telefone do dono sem máscara).
+
+    Além dos campos de PetPublicProfile, traz last_modified (maior
+    updated_at das linhas envolvidas) e etag (hash do conteúdo, que também
+    muda quando uma vacina ou medicamento é removido).
+
+    Args:
+        refresh: Ignora o cache (atualização pedida pelo nginx)
+
+    Returns:
+        Dicionário do perfil, ou None se o pet não existe
+    """
+    found, versions = _profile_cache.lookup([pet_id])
+    if pet_id in found and not refresh:
+        return found[pet_id]
+
+    row = db.execute(PROFILE_QUERY, {"pet_id": pet_id}).mappings().first()
+    if row is None:
+        # Pet inexistente não é guardado: o id pode ser criado em seguida
+        return None
+
+    profile = dict(row)
+    profile["etag"] = make_etag(profile)
+    _profile_cache.store(pet_id, profile, versions[pet_id])
+    return profile
+
+
+def invalidate_pet(pet_id: int):
+    """Descarta o perfil em cache de um pet (em todos os workers e no nginx)."""
+    _profile_cache.invalidate(pet_id)
+    edge_cache.purge(f"/public/pet/{pet_id}")
+
+
+def invalidate_owner(db: Session, owner_id: int):
+    """Descarta os perfis de todos os pets de um tutor (nome/telefone mudaram)."""
+    pet_ids = [pet_id for (pet_id,) in db.query(Pet.id).filter(Pet.owner_id == owner_id)]
+    _profile_cache.invalidate(*pet_ids)
+    edge_cache.purge(*(f"/public/pet/{pet_id}" for pet_id in pet_ids))
@@ -0,0 +1,187 @@
+"""
+Pub/sub de eventos dos reportes de pets perdidos/encontrados (feed em
+tempo real, GET /public/lost-pets/stream).
+
+Cada conexão SSE registra uma área (ponto + raio) e recebe os eventos
+'created', 'resolved', 'deleted' e 'expired' dos reportes dentro dela, em vez de o app
+repetir a busca de /lost-pets/nearby a cada poucos segundos.
+
+Sem REDIS_URL, o pub/sub é só em memória (um processo). Com REDIS_URL, os
+eventos são publicados no canal REPORT_EVENTS_CHANNEL e cada worker assina
+o canal e entrega às suas conexões, então todos os workers (e jobs
+externos, como a expiração de reportes) alimentam o mesmo feed.
+
+Todo evento também incrementa a versão do conjunto de reportes
+(reports_version), usada no ETag de /lost-pets/nearby.
+"""
+import asyncio
+import json
+import logging
+import math
+from typing import List, Optional, Set
+from app.core.config import settings
+from app.models.lost_pet import LostPetReport
+from app.services import geo
+from app.services.cache import bump_versions, get_versions
+
+logger = logging.getLogger(__name__)
+
+REPORT_EVENTS_CHANNEL = "petid:lost-pet-events"
+
+# Versão do conjunto de reportes (app.services.cache): muda a cada
+# criação, resolução, remoção e expiração
+_REPORTS_VERSION = ("lost-pet-reports", "all")
+
+
+def reports_version() -> Optional[int]:
+    """Versão atual do conjunto de reportes (None se o Redis não respondeu)."""
+    versions = get_versions(_REPORTS_VERSION[0], [_REPORTS_VERSION[1]])
+    return versions[0] if versions is not None else None
+
+
+class Subscriber:
+    """Uma conexão do feed: área de interesse + fila de eventos"""
+
+    def __init__(self, latitude: float, longitude: float, radius_km: float, report_type: Optional[str] = None):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius_km = radius_km
+        self.report_type = report_type
+        self.bbox = geo.bounding_box(latitude, longitude, radius_km)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.REPORT_STREAM_QUEUE_SIZE)
+        # Fila cheia (cliente lento): a conexão é encerrada e o app reconecta
+        self.overflowed = False
+
+    def wants(self, event: dict) -> bool:
+        report = event["report"]
+        if self.report_type and report["report_type"] != self.report_type:
+            return False
+        min_lat, max_lat, min_lon, max_lon = self.bbox
+        if not (min_lat <= report["latitude"] <= max_lat and min_lon <= report["longitude"] <= max_lon):
+            return False
+        return _haversine_km(self.latitude, self.longitude, report["latitude"], report["longitude"]) <= self.radius_km
+
+
+class ReportEventBroker:
+    """Distribui os eventos às conexões do processo (e via Redis entre workers)"""
+
+    def __init__(self):
+        self._subscribers: Set[Subscriber] = set()
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, subscriber: Subscriber):
+        self._subscribers.add(subscriber)
+        if settings.REDIS_URL and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    async def publish(self, event_type: str, payload: dict):
+        """
+        Publica um evento (chamar após o commit).
+
+        Args:
+            event_type: 'created', 'resolved', 'deleted' ou 'expired'
+            payload: report_payload() do reporte
+        """
+        event = {"event": event_type, "report": payload}
+        bump_versions(_REPORTS_VERSION[0], [_REPORTS_VERSION[1]])
+        if settings.REDIS_URL:
+            try:
+                await self._get_redis().publish(REPORT_EVENTS_CHANNEL, json.dumps(event))
+                return
+            except Exception as e:
+                # Sem Redis, ao menos as conexões deste worker recebem
+                logger.warning(f"Falha ao publicar evento no Redis: {e}")
+        self._dispatch(event)
+
+    def _dispatch(self, event: dict):
+        for subscriber in list(self._subscribers):
+            if not subscriber.wants(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+                self._subscribers.discard(subscriber)
+
+    async def _listen(self):
+        """Assina o canal do Redis (iniciado na primeira conexão do worker)."""
+        while True:
+            pubsub = self._get_redis().pubsub()
+            try:
+                await pubsub.subscribe(REPORT_EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Assinatura de eventos no Redis interrompida: {e}")
+                await asyncio.sleep(settings.REPORT_STREAM_REDIS_RETRY_SECONDS)
+            finally:
+                await pubsub.aclose()
+
+    def _get_redis(self):
+        if self._redis is None:
+            # Dependência só necessária com REDIS_URL configurado
+            import redis.asyncio as redis
+            self._redis = redis.from_url(settings.REDIS_URL)
+        return self._redis
+
+
+def publish_from_job(event_type: str, payloads: List[dict]):
+    """
+    Publica eventos a partir de um processo fora da API (jobs síncronos).
+    Sem REDIS_URL não há como alcançar os workers e os eventos são
+    descartados.
+    """
+    if not payloads:
+        return
+    bump_versions(_REPORTS_VERSION[0], [_REPORTS_VERSION[1]])
+    if not settings.REDIS_URL:
+        return
+    import redis
+    client = redis.from_url(settings.REDIS_URL)
+    try:
+        with client.pipeline(transaction=False) as pipe:
+            for payload in payloads:
+                pipe.publish(REPORT_EVENTS_CHANNEL, json.dumps({"event": event_type, "report": payload}))
+            pipe.execute()
+    except Exception as e:
+        logger.warning(f"Falha ao publicar eventos no Redis: {e}")
+    finally:
+        client.close()
+
+
+def report_payload(report: LostPetReport) -> dict:
+    """
+    Dados públicos do reporte enviados no feed (o app busca o resto se
+    quiser). Monte antes de remover o reporte.
+    """
+    pet = report.pet
+    return {
+        "id": report.id,
+        "report_type": report.report_type,
+        "status": report.status,
+        "latitude": report.latitude,
+        "longitude": report.longitude,
+        "city": report.city,
+        "pet_name": pet.name if pet else None,
+        "pet_species": pet.species if pet else report.found_species,
+        "pet_photo_url": pet.photo_url if pet else report.found_photo_url,
+        "created_at": report.created_at.isoformat() if report.created_at else None,
+    }
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+    a = (math.sin(d_lat / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(d_lon / 2) ** 2)
+    return 2 * geo.EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+broker = ReportEventBroker()
@@ -0,0 +1,88 @@
+"""
+Expiração dos reportes de pets perdidos/encontrados antigos.
+
+Reportes ativos há mais de LOST_REPORT_EXPIRY_DAYS (perdido) ou
+FOUND_REPORT_EXPIRY_DAYS (encontrado) passam para status 'expired'. Assim
+o conjunto ativo, que as buscas por proximidade e os clusters do mapa
+percorrem pelos índices parciais "WHERE status = 'active'", fica limitado
+aos reportes recentes.
+
+Os UPDATEs são feitos em lotes de REPORT_EXPIRY_BATCH_SIZE (com SKIP
+LOCKED, sem travar a tabela nem brigar com a API), cada um em sua
+transação.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.services import map_clusters, pet_profile
+from app.services.report_events import publish_from_job
+
+logger = logging.getLogger(__name__)
+
+EXPIRE_BATCH_QUERY = text("""
+    WITH batch AS (
+        SELECT id FROM lost_pet_reports
+        WHERE status = 'active'
+        AND (
+            (report_type = 'lost' AND created_at < :lost_cutoff)
+            OR (report_type = 'found' AND created_at < :found_cutoff)
+        )
+        ORDER BY created_at
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE lost_pet_reports r
+    SET status = 'expired', updated_at = timezone('utc', now())
+    FROM batch
+    WHERE r.id = batch.id
+    RETURNING r.id, r.pet_id, r.report_type, r.status, r.latitude, r.longitude, r.city
+""")
+
+
+def expire_stale_reports(db: Session, now: datetime = None) -> int:
+    """
+    Expira todos os reportes vencidos, lote a lote.
+
+    Returns:
+        Quantidade de reportes expirados
+    """
+    now = now or datetime.utcnow()
+    params = {
+        "lost_cutoff": now - timedelta(days=settings.LOST_REPORT_EXPIRY_DAYS),
+        "found_cutoff": now - timedelta(days=settings.FOUND_REPORT_EXPIRY_DAYS),
+        "batch_size": settings.REPORT_EXPIRY_BATCH_SIZE,
+    }
+
+    total = 0
+    while True:
+        rows = db.execute(EXPIRE_BATCH_QUERY, params).mappings().all()
+        db.commit()
+        if not rows:
+            return total
+
+        total += len(rows)
+        logger.info(f"Expirados {total} reportes")
+        _notify(rows)
+
+
+def _notify(rows: List[dict]):
+    """Perfis (is_lost), clusters do mapa e feed em tempo real dos reportes expirados."""
+    for row in rows:
+        if row["pet_id"] and row["report_type"] == 'lost':
+            pet_profile.invalidate_pet(row["pet_id"])
+    map_clusters.invalidate_points((row["latitude"], row["longitude"]) for row in rows)
+
+    publish_from_job("expired", [
+        {
+            "id": row["id"],
+            "report_type": row["report_type"],
+            "status": row["status"],
+            "latitude": row["latitude"],
+            "longitude": row["longitude"],
+            "city": row["city"],
+        }
+        for row in rows
+    ])
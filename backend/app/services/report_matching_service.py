@@ -0,0 +1,324 @@
+"""
+Pareamento biométrico automático entre reportes de pets encontrados e
+reportes de pets perdidos.
+
+- Reporte de encontrado com foto: fica com match_status='pending'. O
+  pipeline reserva os pendentes em lotes ('processing'), baixa as fotos,
+  gera os embeddings em um único forward pass e compara todos contra as
+  biometrias dos pets com reporte de perdido ativo em uma única query
+  (LATERAL por reporte). Foto inválida ou grande demais vira 'failed';
+  falhas de infraestrutura (S3, modelo) voltam para 'pending' e são
+  tentadas de novo com backoff, até REPORT_MATCH_MAX_ATTEMPTS tentativas.
+- Reporte de perdido: o pet já tem biometria cadastrada, então o
+  pareamento reverso (contra os encontrados já processados) é só SQL.
+
+Os candidatos ficam em lost_pet_matches: o app lê os resultados sem rodar
+o modelo. O processamento roda em background logo após a criação do
+reporte e também pelo worker `python -m app.match_reports`, que recupera
+o que ficou pendente.
+"""
+import base64
+import logging
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session, joinedload
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.lost_pet import LostPetReport
+from app.models.lost_pet_match import LostPetMatch
+from app.services import geo, image_guard
+from app.services.biometry_service import get_s3_client
+from app.services.ml_embedding_service import get_ml_service
+
+logger = logging.getLogger(__name__)
+
+
+def photo_object_key(url: Optional[str]) -> Optional[str]:
+    """
+    Chave no bucket de uma foto enviada pelo app, ou None para qualquer
+    outra URL. Só fotos do próprio bucket são baixadas: a URL vem de um
+    reporte anônimo e não pode fazer a API acessar outros hosts.
+    """
+    bucket_prefix = f"{settings.S3_ENDPOINT}/{settings.S3_BUCKET}/"
+    if not url or not url.startswith(bucket_prefix):
+        return None
+    key = url[len(bucket_prefix):].split("?")[0]
+    if not key or ".." in key.split("/"):
+        return None
+    return key
+
+
+class ReportMatchingService:
+    """Gera embeddings das fotos de pets encontrados e grava os pareamentos"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def process_pending_found(self, limit: Optional[int] = None) -> int:
+        """
+        Processa um lote de reportes de encontrado pendentes.
+
+        O lote é reservado (match_status='processing') em uma transação
+        curta com SKIP LOCKED, então vários workers (ou tarefas de
+        background) podem rodar ao mesmo tempo sem repetir trabalho. Fotos
+        e modelo rodam fora de transação; os resultados são gravados em
+        uma segunda transação curta. Reservas mais antigas que
+        REPORT_MATCH_CLAIM_TIMEOUT_SECONDS (worker que caiu) voltam a ser
+        reservadas.
+
+        Cada reserva conta uma tentativa. Foto inválida ou grande demais
+        termina em 'failed'; erro ao baixar a foto ou ao gerar o embedding
+        devolve o reporte para 'pending', reservado de novo após
+        REPORT_MATCH_RETRY_BACKOFF_SECONDS (dobrando a cada tentativa),
+        até REPORT_MATCH_MAX_ATTEMPTS.
+
+        Returns:
+            Quantidade de reportes processados no lote
+        """
+        claimed = self._claim_pending_found(limit or settings.REPORT_MATCH_BATCH_SIZE)
+        if not claimed:
+            return 0
+
+        results = {}
+        rejected = set()
+        images: List[Tuple[int, str]] = []
+        for row in claimed:
+            try:
+                images.append((row.id, self._fetch_photo_base64(row.found_photo_url)))
+            except ValueError as e:
+                logger.warning(f"Foto do reporte {row.id} recusada: {e}")
+                rejected.add(row.id)
+            except Exception as e:
+                logger.warning(f"Foto do reporte {row.id} indisponível (tentativa {row.match_attempts}): {e}")
+
+        if images:
+            embeddings = get_ml_service().generate_embeddings([image for _, image in images])
+            for (report_id, _), (embedding, _, issues) in zip(images, embeddings):
+                if embedding is None:
+                    # A foto já passou pela validação: a falha é do modelo
+                    logger.warning(f"Embedding do reporte {report_id} falhou: {issues}")
+                results[report_id] = embedding
+
+        found_ids = []
+        for row in claimed:
+            embedding = results.get(row.id)
+            if embedding is not None:
+                values = {LostPetReport.found_embedding: embedding, LostPetReport.match_status: 'done'}
+            elif row.id in rejected or row.match_attempts >= settings.REPORT_MATCH_MAX_ATTEMPTS:
+                values = {LostPetReport.match_status: 'failed'}
+            else:
+                # match_claimed_at fica com o horário da tentativa (base do backoff)
+                values = {LostPetReport.match_status: 'pending'}
+            # Só grava se a reserva ainda é deste worker
+            updated = self.db.query(LostPetReport).filter(
+                LostPetReport.id == row.id,
+                LostPetReport.match_status == 'processing',
+                LostPetReport.match_claimed_at == row.match_claimed_at
+            ).update(values, synchronize_session=False)
+            if updated and embedding is not None:
+                found_ids.append(row.id)
+
+        if found_ids:
+            self._match_found_reports(found_ids)
+
+        self.db.commit()
+        return len(claimed)
+
+    def _claim_pending_found(self, limit: int) -> list:
+        """
+        Reserva um lote de encontrados pendentes (id, foto, horário da
+        reserva, tentativas contando esta).
+        """
+        query = text("""
+            UPDATE lost_pet_reports r
+            SET
+                match_status = 'processing',
+                match_claimed_at = timezone('utc', now()),
+                match_attempts = r.match_attempts + 1
+            FROM (
+                SELECT id FROM lost_pet_reports
+                WHERE report_type = 'found'
+                AND match_status IN ('pending', 'processing')
+                AND (
+                    (match_status = 'pending' AND (
+                        match_attempts = 0
+                        OR match_claimed_at < timezone('utc', now())
+                            - make_interval(secs => :retry_backoff * power(2, match_attempts - 1))
+                    ))
+                    OR (match_status = 'processing'
+                        AND match_claimed_at < timezone('utc', now()) - make_interval(secs => :claim_timeout))
+                )
+                ORDER BY id
+                LIMIT :limit
+                FOR UPDATE SKIP LOCKED
+            ) batch
+            WHERE r.id = batch.id
+            RETURNING r.id, r.found_photo_url, r.match_claimed_at, r.match_attempts
+        """)
+
+        rows = self.db.execute(query, {
+            "limit": limit,
+            "claim_timeout": settings.REPORT_MATCH_CLAIM_TIMEOUT_SECONDS,
+            "retry_backoff": settings.REPORT_MATCH_RETRY_BACKOFF_SECONDS,
+        }).all()
+        self.db.commit()
+        return rows
+
+    def match_lost_report(self, report_id: int) -> int:
+        """
+        Pareamento reverso: compara a biometria do pet de um reporte de
+        perdido com os reportes de encontrado já processados.
+
+        Returns:
+            Quantidade de candidatos gravados
+        """
+        query = text(f"""
+            INSERT INTO lost_pet_matches
+                (lost_report_id, found_report_id, similarity, distance_km, status, created_at, updated_at)
+            SELECT
+                lost.id,
+                m.found_report_id,
+                m.similarity,
+                m.distance_km,
+                'suggested',
+                timezone('utc', now()),
+                timezone('utc', now())
+            FROM lost_pet_reports lost
+            JOIN snout_biometries sb ON sb.pet_id = lost.pet_id AND sb.is_active = true
+            JOIN pets p ON p.id = lost.pet_id
+            CROSS JOIN LATERAL (
+                SELECT
+                    f.id as found_report_id,
+                    1 - (f.found_embedding <=> sb.embedding) as similarity,
+                    {geo.haversine_sql("f.latitude", "f.longitude", "lost.latitude", "lost.longitude")} as distance_km
+                FROM lost_pet_reports f
+                WHERE f.report_type = 'found'
+                AND f.status = 'active'
+                AND f.match_status = 'done'
+                AND (f.found_species IS NULL OR f.found_species = p.species)
+                ORDER BY f.found_embedding <=> sb.embedding
+                LIMIT :max_candidates
+            ) m
+            WHERE lost.id = :report_id
+            AND lost.report_type = 'lost'
+            AND m.similarity >= :threshold
+            ON CONFLICT ON CONSTRAINT uq_lost_pet_match_pair
+            DO UPDATE SET
+                similarity = EXCLUDED.similarity,
+                distance_km = EXCLUDED.distance_km,
+                updated_at = timezone('utc', now())
+        """)
+
+        result = self.db.execute(query, {
+            "report_id": report_id,
+            "threshold": settings.BIOMETRY_MATCH_THRESHOLD,
+            "max_candidates": settings.REPORT_MATCH_MAX_CANDIDATES,
+        })
+        self.db.commit()
+        return result.rowcount
+
+    def get_matches(self, report: LostPetReport) -> List[LostPetMatch]:
+        """Candidatos de um reporte (perdido ou encontrado), mais similares primeiro."""
+        if report.report_type == 'lost':
+            column, other = LostPetMatch.lost_report_id, LostPetMatch.found_report
+        else:
+            column, other = LostPetMatch.found_report_id, LostPetMatch.lost_report
+        return (
+            self.db.query(LostPetMatch)
+            # Carrega o reporte do outro lado e o pet junto (sem N+1)
+            .options(joinedload(other).joinedload(LostPetReport.pet))
+            .filter(column == report.id, LostPetMatch.status != 'dismissed')
+            .order_by(LostPetMatch.similarity.desc())
+            .all()
+        )
+
+    def _match_found_reports(self, found_ids: List[int]):
+        """Compara os encontrados do lote com todos os perdidos ativos em uma query."""
+        query = text(f"""
+            INSERT INTO lost_pet_matches
+                (lost_report_id, found_report_id, similarity, distance_km, status, created_at, updated_at)
+            SELECT
+                m.lost_report_id,
+                f.id,
+                m.similarity,
+                m.distance_km,
+                'suggested',
+                timezone('utc', now()),
+                timezone('utc', now())
+            FROM lost_pet_reports f
+            CROSS JOIN LATERAL (
+                SELECT
+                    lost.id as lost_report_id,
+                    1 - (sb.embedding <=> f.found_embedding) as similarity,
+                    {geo.haversine_sql("lost.latitude", "lost.longitude", "f.latitude", "f.longitude")} as distance_km
+                FROM lost_pet_reports lost
+                JOIN snout_biometries sb ON sb.pet_id = lost.pet_id AND sb.is_active = true
+                JOIN pets p ON p.id = lost.pet_id
+                WHERE lost.report_type = 'lost'
+                AND lost.status = 'active'
+                AND (f.found_species IS NULL OR p.species = f.found_species)
+                ORDER BY sb.embedding <=> f.found_embedding
+                LIMIT :max_candidates
+            ) m
+            WHERE f.id = ANY(:found_ids)
+            AND m.similarity >= :threshold
+            ON CONFLICT ON CONSTRAINT uq_lost_pet_match_pair
+            DO UPDATE SET
+                similarity = EXCLUDED.similarity,
+                distance_km = EXCLUDED.distance_km,
+                updated_at = timezone('utc', now())
+        """)
+
+        self.db.execute(query, {
+            "found_ids": found_ids,
+            "threshold": settings.BIOMETRY_MATCH_THRESHOLD,
+            "max_candidates": settings.REPORT_MATCH_MAX_CANDIDATES,
+        })
+
+    def _fetch_photo_base64(self, url: str) -> str:
+        """
+        Baixa a foto do reporte do bucket S3/MinIO em base64.
+
+        Raises:
+            ValueError: Se a URL ou a imagem for inválida ou grande demais
+                (não adianta tentar de novo)
+        """
+        key = photo_object_key(url)
+        if key is None:
+            raise ValueError(f"URL de foto não suportada: {url}")
+
+        s3_client = get_s3_client(timeout=settings.REPORT_PHOTO_FETCH_TIMEOUT)
+        obj = s3_client.get_object(Bucket=settings.S3_BUCKET, Key=key)
+        if obj["ContentLength"] > settings.IMAGE_MAX_BYTES:
+            raise ValueError("Foto muito grande")
+        data = obj["Body"].read()
+        # Valida o cabeçalho aqui: depois disso, falha no embedding é do modelo
+        image_guard.open_image(data)
+
+        return base64.b64encode(data).decode()
+
+
+def run_pending_found_matching():
+    """Tarefa de background: processa todos os encontrados pendentes."""
+    db = SessionLocal()
+    try:
+        service = ReportMatchingService(db)
+        while service.process_pending_found():
+            pass
+    except Exception as e:
+        logger.error(f"Erro no pareamento de reportes encontrados: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def run_lost_report_matching(report_id: int):
+    """Tarefa de background: pareamento reverso de um reporte de perdido."""
+    db = SessionLocal()
+    try:
+        ReportMatchingService(db).match_lost_report(report_id)
+    except Exception as e:
+        logger.error(f"Erro no pareamento do reporte {report_id}: {e}")
+        db.rollback()
+    finally:
+        db.close()
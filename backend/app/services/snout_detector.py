@@ -0,0 +1,106 @@
+"""
+Detector leve (CPU) da região do focinho.
+
+Duas estratégias:
+- Cascade do OpenCV (SNOUT_CASCADE_PATH): usa um classificador treinado
+  para focinhos, se configurado.
+- Heurística de textura (sem cascade): o plano nasal é uma região escura e com
+  muita textura fina (as "digitais" do focinho). Um mapa de energia do
+  Laplaciano ponderado pela escuridão local aponta o centro do focinho, e
+  o recorte é um quadrado em torno desse ponto.
+
+Só o cascade é usado para recortar automaticamente as imagens antes do
+modelo (SNOUT_DETECTION_ENABLED); a heurística, não treinada, fica restrita
+a detect_snout_region.
+
+A detecção roda numa cópia reduzida da imagem (lado máximo DETECT_SIZE),
+então custa poucos milissegundos mesmo para fotos grandes.
+"""
+import logging
+from typing import Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Box = Tuple[int, int, int, int]  # (left, top, right, bottom) em pixels
+
+
+class SnoutDetector:
+    """Localiza o focinho e retorna a caixa de recorte na imagem original."""
+
+    DETECT_SIZE = 320
+    # Lado do recorte como fração do menor lado da imagem
+    CROP_FRACTION = 0.6
+    # Abaixo desta energia de textura a imagem é considerada sem focinho
+    # detectável (ex.: foto lisa) e não é recortada
+    MIN_TEXTURE_ENERGY = 8.0
+
+    def __init__(self, cascade_path: Optional[str] = None):
+        import cv2
+
+        self._cascade = None
+        if cascade_path:
+            cascade = cv2.CascadeClassifier(cascade_path)
+            if cascade.empty():
+                logger.error(f"Cascade de focinho inválido: {cascade_path}; usando heurística")
+            else:
+                self._cascade = cascade
+
+    @property
+    def has_cascade(self) -> bool:
+        """Se um cascade treinado foi carregado (senão usa a heurística)."""
+        return self._cascade is not None
+
+    def detect(self, rgb: np.ndarray) -> Optional[Box]:
+        """
+        Detecta o focinho em uma imagem RGB (H, W, 3).
+
+        Returns:
+            Caixa (left, top, right, bottom) ou None se não detectar
+        """
+        import cv2
+
+        height, width = rgb.shape[:2]
+        scale = min(1.0, self.DETECT_SIZE / max(height, width))
+        small = cv2.resize(rgb, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+
+        if self._cascade is not None:
+            box = self._detect_cascade(gray)
+        else:
+            box = self._detect_texture(gray)
+
+        if box is None:
+            return None
+
+        left, top, right, bottom = (int(round(v / scale)) for v in box)
+        return max(0, left), max(0, top), min(width, right), min(height, bottom)
+
+    def _detect_cascade(self, gray: np.ndarray) -> Optional[Box]:
+        """Maior detecção do cascade configurado."""
+        rects = self._cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=4)
+        if len(rects) == 0:
+            return None
+        x, y, w, h = max(rects, key=lambda r: r[2] * r[3])
+        return x, y, x + w, y + h
+
+    def _detect_texture(self, gray: np.ndarray) -> Optional[Box]:
+        """Quadrado em torno da região mais escura e texturizada."""
+        import cv2
+
+        height, width = gray.shape
+        side = int(min(height, width) * self.CROP_FRACTION)
+        if side < 16:
+            return None
+
+        window = max(3, side // 2) | 1
+        energy = cv2.boxFilter(np.abs(cv2.Laplacian(gray, cv2.CV_32F)), -1, (window, window))
+        if float(energy.max()) < self.MIN_TEXTURE_ENERGY:
+            return None
+
+        darkness = 255.0 - cv2.boxFilter(gray.astype(np.float32), -1, (window, window))
+        cy, cx = np.unravel_index(np.argmax(energy * darkness), energy.shape)
+
+        left = int(np.clip(cx - side // 2, 0, width - side))
+        top = int(np.clip(cy - side // 2, 0, height - side))
+        return left, top, left + side, top + side
@@ -0,0 +1,87 @@
+"""
+Benchmark do custo do test-time augmentation (TTA).
+
+Mede a latência de generate_embedding com e sem TTA e a similaridade entre
+os dois embeddings, para decidir BIOMETRY_TTA_REGISTER/BIOMETRY_TTA_SEARCH.
+
+Execute: python benchmark_tta.py [imagem1.jpg imagem2.jpg ...]
+(sem argumentos usa imagens sintéticas 512x512)
+"""
+import sys
+import time
+import base64
+from io import BytesIO
+
+
+def print_header(text):
+    """Imprime cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f"  {text}")
+    print("=" * 60)
+
+
+def load_images(paths):
+    """Carrega as imagens informadas (ou gera sintéticas) em base64."""
+    from PIL import Image
+    import numpy as np
+
+    if paths:
+        images = []
+        for path in paths:
+            with open(path, "rb") as f:
+                images.append(base64.b64encode(f.read()).decode())
+        return images
+
+    images = []
+    for seed in range(4):
+        rng = np.random.default_rng(seed)
+        img = Image.fromarray(rng.integers(60, 200, (512, 512, 3), dtype=np.uint8))
+        buffered = BytesIO()
+        img.save(buffered, format="JPEG")
+        images.append(base64.b64encode(buffered.getvalue()).decode())
+    return images
+
+
+def measure(ml_service, images, tta, repeats=3):
+    """Retorna (latência média por imagem em ms, embeddings)."""
+    embeddings = []
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        embeddings = [ml_service.generate_embedding(image, tta=tta)[0] for image in images]
+    elapsed = time.perf_counter() - start_time
+    return elapsed / (repeats * len(images)) * 1000, embeddings
+
+
+def main():
+    import numpy as np
+    from app.services.ml_embedding_service import MLEmbeddingService
+
+    print_header("Benchmark: Test-Time Augmentation")
+
+    ml_service = MLEmbeddingService()
+    ml_service._load_model()
+    images = load_images(sys.argv[1:])
+
+    # Aquecimento (alocação de memória, kernels)
+    ml_service.generate_embedding(images[0])
+    ml_service.generate_embedding(images[0], tta=True)
+
+    plain_ms, plain = measure(ml_service, images, tta=False)
+    tta_ms, augmented = measure(ml_service, images, tta=True)
+
+    views = len(ml_service._tta_views(ml_service._decode_image_bytes(base64.b64decode(images[0]))))
+    similarities = [
+        float(np.dot(a, b)) for a, b in zip(plain, augmented)
+        if a is not None and b is not None
+    ]
+
+    print(f"Device: {ml_service.device}")
+    print(f"Imagens: {len(images)} | Visões por imagem com TTA: {views}")
+    print(f"Sem TTA: {plain_ms:8.1f} ms/imagem")
+    print(f"Com TTA: {tta_ms:8.1f} ms/imagem  ({tta_ms / plain_ms:.2f}x)")
+    if similarities:
+        print(f"Similaridade média (sem TTA x com TTA): {np.mean(similarities):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Avaliação offline do threshold de similaridade da busca biométrica.
+
+Recebe uma pasta rotulada (uma subpasta por animal, com 2+ fotos do
+focinho), gera os embeddings em lote, calcula a similaridade entre todos os
+pares (E @ E.T) e reporta:
+- ROC / FAR (falsa aceitação) e FRR (falsa rejeição) por threshold
+- EER e o threshold recomendado para a FAR alvo
+- Acurácia rank-1 e latência da busca exata (NumPy)
+- Com --db: recall e latência da busca ANN (IVFFlat) por fator de
+  over-fetch, numa tabela temporária (nada é gravado no banco)
+
+Os resultados alimentam BIOMETRY_MATCH_THRESHOLD e BIOMETRY_ANN_OVERFETCH.
+
+Execute: python evaluate_threshold.py PASTA [--target-far 0.001] [--db]
+
+    PASTA/
+        rex/      foto1.jpg foto2.jpg ...
+        mia/      foto1.jpg foto2.jpg ...
+"""
+import argparse
+import os
+import time
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+CANDIDATE_THRESHOLDS = [0.70, 0.75, 0.80, 0.85, 0.90, 0.95]
+OVERFETCH_FACTORS = [1, 2, 4, 8]
+
+
+def print_header(text):
+    """Imprime cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f"  {text}")
+    print("=" * 60)
+
+
+def load_dataset(folder):
+    """Retorna (bytes das imagens, rótulos) a partir das subpastas."""
+    images, labels = [], []
+    for label in sorted(os.listdir(folder)):
+        label_dir = os.path.join(folder, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for name in sorted(os.listdir(label_dir)):
+            if os.path.splitext(name)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+            with open(os.path.join(label_dir, name), "rb") as f:
+                images.append(f.read())
+            labels.append(label)
+    return images, labels
+
+
+def embed_dataset(ml_service, images, labels, batch_size, tta):
+    """Gera os embeddings em lotes; descarta imagens rejeitadas."""
+    import numpy as np
+
+    embeddings, kept_labels = [], []
+    start_time = time.perf_counter()
+    for start in range(0, len(images), batch_size):
+        chunk = images[start:start + batch_size]
+        results = ml_service.generate_embeddings_batch(chunk, tta=[tta] * len(chunk))
+        for label, (embedding, _, issues) in zip(labels[start:start + batch_size], results):
+            if embedding is None:
+                print(f"  Ignorada ({label}): {'; '.join(issues)}")
+                continue
+            embeddings.append(embedding)
+            kept_labels.append(label)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"Embeddings: {len(embeddings)} em {elapsed:.1f}s "
+          f"({elapsed / max(1, len(images)) * 1000:.1f} ms/imagem)")
+    return np.asarray(embeddings, dtype=np.float32), np.asarray(kept_labels)
+
+
+def pair_scores(embeddings, labels):
+    """Similaridades dos pares genuínos e impostores (triângulo superior)."""
+    import numpy as np
+
+    similarity = embeddings @ embeddings.T
+    rows, cols = np.triu_indices(len(labels), k=1)
+    scores = similarity[rows, cols]
+    same = labels[rows] == labels[cols]
+    return similarity, scores[same], scores[~same]
+
+
+def error_rates(genuine, impostor, thresholds):
+    """FAR e FRR para cada threshold (aceita quando similaridade >= threshold)."""
+    import numpy as np
+
+    genuine = np.sort(genuine)
+    impostor = np.sort(impostor)
+    thresholds = np.asarray(thresholds, dtype=np.float32)
+    far = 1 - np.searchsorted(impostor, thresholds, side="left") / max(1, len(impostor))
+    frr = np.searchsorted(genuine, thresholds, side="left") / max(1, len(genuine))
+    return far, frr
+
+
+def report_thresholds(genuine, impostor, target_far):
+    """Imprime a tabela FAR/FRR, a EER e o threshold recomendado."""
+    import numpy as np
+
+    print(f"Pares genuínos: {len(genuine)} | Pares impostores: {len(impostor)}")
+    print(f"Similaridade genuína:  média {genuine.mean():.4f}  p5 {np.percentile(genuine, 5):.4f}")
+    print(f"Similaridade impostor: média {impostor.mean():.4f}  p99 {np.percentile(impostor, 99):.4f}")
+
+    print(f"\n{'Threshold':>10} {'FAR':>10} {'FRR':>10}")
+    far, frr = error_rates(genuine, impostor, CANDIDATE_THRESHOLDS)
+    for threshold, a, r in zip(CANDIDATE_THRESHOLDS, far, frr):
+        print(f"{threshold:>10.2f} {a:>10.4%} {r:>10.4%}")
+
+    # Curva ROC completa: todos os scores observados como thresholds
+    grid = np.unique(np.concatenate([genuine, impostor]))
+    far, frr = error_rates(genuine, impostor, grid)
+
+    eer_index = int(np.argmin(np.abs(far - frr)))
+    print(f"\nEER: {(far[eer_index] + frr[eer_index]) / 2:.4%} no threshold {grid[eer_index]:.4f}")
+
+    # Menor FRR com FAR abaixo do alvo; entre empates, o maior threshold
+    # (mais margem contra impostores)
+    valid = np.nonzero(far <= target_far)[0]
+    if len(valid) == 0:
+        print(f"Nenhum threshold atinge FAR <= {target_far:.4%}")
+        return None
+
+    best = valid[frr[valid] == frr[valid].min()][-1]
+    recommended = float(grid[best])
+    print(f"Threshold recomendado (FAR <= {target_far:.4%}): {recommended:.4f} "
+          f"| FAR {far[best]:.4%} | FRR {frr[best]:.4%}")
+    return recommended
+
+
+def report_exact_search(similarity, labels, max_results):
+    """Rank-1 e latência da busca exata (todas as fotos como consulta)."""
+    import numpy as np
+
+    scores = similarity.copy()
+    np.fill_diagonal(scores, -np.inf)
+
+    start_time = time.perf_counter()
+    top = np.argpartition(-scores, min(max_results, len(labels) - 1) - 1, axis=1)[:, :max_results]
+    elapsed = time.perf_counter() - start_time
+
+    best = np.argmax(scores, axis=1)
+    rank1 = float(np.mean(labels[best] == labels))
+    hits = float(np.mean([(labels[row] == labels[i]).any() for i, row in enumerate(top)]))
+
+    print(f"Rank-1: {rank1:.2%} | Top-{max_results}: {hits:.2%}")
+    print(f"Busca exata (NumPy): {elapsed / len(labels) * 1000:.3f} ms/consulta")
+
+
+def report_ann_search(embeddings, max_results, threshold):
+    """
+    Recall e latência do IVFFlat por fator de over-fetch, comparando com a
+    busca exata. Usa uma tabela temporária da sessão.
+    """
+    import numpy as np
+    from sqlalchemy import text
+    from app.db.session import SessionLocal
+
+    def to_pgvector(vector):
+        return "[" + ",".join(f"{v:.8f}" for v in vector) + "]"
+
+    db = SessionLocal()
+    try:
+        db.execute(text("CREATE TEMP TABLE eval_gallery (id integer PRIMARY KEY, embedding vector(768))"))
+        db.execute(
+            text("INSERT INTO eval_gallery (id, embedding) VALUES (:id, CAST(:embedding AS vector))"),
+            [{"id": i, "embedding": to_pgvector(e)} for i, e in enumerate(embeddings)]
+        )
+        lists = max(1, int(np.sqrt(len(embeddings))))
+        db.execute(text(
+            f"CREATE INDEX ON eval_gallery USING ivfflat (embedding vector_cosine_ops) WITH (lists = {lists})"
+        ))
+        db.execute(text("ANALYZE eval_gallery"))
+
+        # Resultado exato: mesmos critérios da API (threshold + max_results)
+        similarity = embeddings @ embeddings.T
+        expected = []
+        for row in similarity:
+            order = np.argsort(-row)[:max_results]
+            expected.append({int(i) for i in order if row[i] >= threshold})
+
+        query = text("""
+            SELECT c.id FROM (
+                SELECT id, 1 - (embedding <=> CAST(:embedding AS vector)) AS similarity
+                FROM eval_gallery
+                ORDER BY embedding <=> CAST(:embedding AS vector)
+                LIMIT :candidates
+            ) c
+            WHERE c.similarity >= :threshold
+            ORDER BY c.similarity DESC
+            LIMIT :max_results
+        """)
+
+        print(f"Galeria temporária: {len(embeddings)} vetores | ivfflat lists={lists}")
+        print(f"\n{'Over-fetch':>10} {'Recall':>10} {'ms/consulta':>12}")
+        for factor in OVERFETCH_FACTORS:
+            found, total = 0, 0
+            start_time = time.perf_counter()
+            for vector, truth in zip(embeddings, expected):
+                rows = db.execute(query, {
+                    "embedding": to_pgvector(vector),
+                    "threshold": threshold,
+                    "max_results": max_results,
+                    "candidates": max_results * factor,
+                }).fetchall()
+                found += len(truth & {row.id for row in rows})
+                total += len(truth)
+            elapsed = time.perf_counter() - start_time
+            recall = found / total if total else 1.0
+            print(f"{factor:>10} {recall:>10.2%} {elapsed / len(embeddings) * 1000:>12.2f}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibra o threshold da busca biométrica")
+    parser.add_argument("folder", help="Pasta com uma subpasta por animal")
+    parser.add_argument("--target-far", type=float, default=0.001, help="FAR máxima aceitável")
+    parser.add_argument("--max-results", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--tta", action="store_true", help="Gera embeddings com test-time augmentation")
+    parser.add_argument("--db", action="store_true", help="Mede recall/latência do IVFFlat no Postgres")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.services.ml_embedding_service import MLEmbeddingService
+
+    print_header("Avaliação do threshold de similaridade")
+
+    images, labels = load_dataset(args.folder)
+    if len(set(labels)) < 2:
+        print("São necessários pelo menos 2 animais com 2+ fotos cada")
+        return
+
+    ml_service = MLEmbeddingService()
+    ml_service._load_model()
+    print(f"Device: {ml_service.device} | Imagens: {len(images)} | Animais: {len(set(labels))}")
+
+    embeddings, labels = embed_dataset(ml_service, images, labels, args.batch_size, args.tta)
+    similarity, genuine, impostor = pair_scores(embeddings, labels)
+    if len(genuine) == 0:
+        print("Nenhum par genuíno: cada animal precisa de 2+ fotos válidas")
+        return
+
+    print_header("FAR / FRR")
+    recommended = report_thresholds(genuine, impostor, args.target_far)
+    print(f"Threshold atual (BIOMETRY_MATCH_THRESHOLD): {settings.BIOMETRY_MATCH_THRESHOLD:.2f}")
+
+    print_header("Busca exata")
+    report_exact_search(similarity, labels, args.max_results)
+
+    if args.db:
+        print_header("Busca ANN (IVFFlat)")
+        threshold = recommended if recommended is not None else settings.BIOMETRY_MATCH_THRESHOLD
+        report_ann_search(embeddings, args.max_results, threshold)
+        print(f"Over-fetch atual (BIOMETRY_ANN_OVERFETCH): {settings.BIOMETRY_ANN_OVERFETCH}")
+
+
+if __name__ == "__main__":
+    main()
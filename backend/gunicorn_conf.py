@@ -0,0 +1,69 @@
+"""
+Configuração do Gunicorn para produção.
+
+O app é importado e o modelo MegaDescriptor é carregado no processo master
+(preload), antes do fork dos workers. Os pesos ficam em memória compartilhada
+e somente leitura, então aumentar o número de workers não multiplica o uso
+de RAM pelo modelo.
+
+Uso: gunicorn -c gunicorn_conf.py app.main:app
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+# Importa o app no master para que os workers herdem tudo via copy-on-write
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    """Carrega o modelo no master antes de criar os workers."""
+    if os.getenv("ML_PRELOAD", "true").lower() not in ("1", "true", "yes"):
+        server.log.info("ML_PRELOAD desativado; modelo será carregado sob demanda")
+        return
+
+    from app.core.config import settings
+    from app.services.ml_embedding_service import get_ml_service
+
+    if not settings.ML_ENABLED:
+        server.log.info("ML_ENABLED=false; embeddings delegados ao nó de ML")
+        return
+
+    try:
+        get_ml_service().preload_shared()
+        server.log.info("Modelo ML pré-carregado no master")
+    except RuntimeError as e:
+        # Sem o modelo o restante da API continua funcionando
+        server.log.error(f"Falha ao pré-carregar modelo ML: {e}")
+
+    # Move os objetos atuais para a geração permanente: o GC dos workers não
+    # toca mais nessas páginas, evitando cópias desnecessárias após o fork
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Divide as threads de CPU entre os workers para evitar oversubscription."""
+    from app.core.config import settings
+
+    if not settings.ML_ENABLED:
+        # Sem modelo local o worker não deve carregar o torch
+        return
+
+    try:
+        import torch
+    except ImportError:
+        return
+
+    threads = max(1, multiprocessing.cpu_count() // workers)
+    torch.set_num_threads(threads)
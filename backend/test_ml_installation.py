@@ -205,6 +205,63 @@ def test_quality_assessment():
         return False
 
 
+def test_preprocessing_parity():
+    """Compara o pré-processamento OpenCV com o pipeline torchvision original."""
+    print_header("Teste 6: Paridade do Pré-processamento")
+
+    try:
+        from app.services.ml_embedding_service import get_ml_service
+        from PIL import Image, ImageFilter
+        import numpy as np
+        import torch
+        import torchvision.transforms as transforms
+
+        ml_service = get_ml_service()
+        ml_service._load_model()
+
+        # Pipeline de referência (o que o serviço usava antes)
+        reference_transform = transforms.Compose([
+            transforms.Resize(ml_service.IMAGE_SIZE),
+            transforms.ToTensor(),
+            transforms.Normalize(
+                mean=[0.485, 0.456, 0.406],
+                std=[0.229, 0.224, 0.225]
+            ),
+        ])
+
+        # Imagens suaves (como fotos reais) em tamanhos maiores e menores que 224
+        base = Image.fromarray(
+            np.random.randint(0, 255, (60, 80, 3), dtype=np.uint8)
+        ).resize((640, 480), Image.BICUBIC).filter(ImageFilter.GaussianBlur(3))
+        images = [base, base.resize((150, 100)), base.resize((1280, 960))]
+
+        fast = ml_service._preprocess_images(images).cpu()
+        reference = torch.stack([reference_transform(img) for img in images])
+
+        assert fast.shape == reference.shape, f"Shape diferente: {fast.shape} vs {reference.shape}"
+
+        mean_diff = (fast - reference).abs().mean().item()
+        print(f"   Diferença média dos tensores: {mean_diff:.5f}")
+        assert mean_diff < 0.02, f"Diferença média muito alta: {mean_diff}"
+
+        # O que importa no fim: embeddings praticamente idênticos
+        with torch.no_grad():
+            fast_emb = torch.nn.functional.normalize(ml_service.model(fast.to(ml_service.device)), dim=1)
+            ref_emb = torch.nn.functional.normalize(ml_service.model(reference.to(ml_service.device)), dim=1)
+        similarity = (fast_emb * ref_emb).sum(dim=1).min().item()
+        print(f"   Similaridade mínima dos embeddings: {similarity:.5f}")
+        assert similarity > 0.99, f"Embeddings divergentes: {similarity}"
+
+        print("[OK] Pré-processamento OpenCV equivalente ao torchvision")
+        return True
+
+    except Exception as e:
+        print(f"[ERRO] Erro no teste de paridade: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def main():
     """Executa todos os testes."""
     print("\n" + "=" * 60)
@@ -217,6 +274,7 @@ def main():
         ("Carregamento do Modelo", test_model_loading),
         ("Geração de Embeddings", test_embedding_generation),
         ("Avaliação de Qualidade", test_quality_assessment),
+        ("Paridade do Pré-processamento", test_preprocessing_parity),
     ]
 
     results = []
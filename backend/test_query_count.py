@@ -0,0 +1,149 @@
+"""
+Script de verificação do número de queries das listagens de reportes.
+
+Conta os statements enviados ao banco (evento before_cursor_execute do
+SQLAlchemy) em uma página de N reportes de:
+1. GET /api/v1/public/lost-pets/nearby
+2. GET /api/v1/public/lost-pets/my-reports
+
+O número precisa ser o mesmo para qualquer N: se crescer com a página, a
+listagem voltou a carregar o pet de cada reporte com uma query (N+1).
+
+Os dados de teste são criados em uma transação desfeita no final.
+
+Execute: python test_query_count.py [--sizes 1 10 50]
+(requer o banco configurado em DATABASE_URL)
+"""
+import argparse
+import sys
+import uuid
+from datetime import date
+
+
+def print_header(text):
+    """Imprime cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f"  {text}")
+    print("=" * 60)
+
+
+class StatementCounter:
+    """Conta os statements executados pelo engine enquanto ativo."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def seed_reports(db, size, latitude, longitude):
+    """Cria um usuário com `size` reportes (perdidos com pet e encontrados) no ponto."""
+    from app.models.lost_pet import LostPetReport
+    from app.models.pet import Pet
+    from app.models.user import User
+
+    user = User(email=f"query-count-{uuid.uuid4().hex}@example.com", password_hash="-")
+    db.add(user)
+    db.flush()
+
+    for i in range(size):
+        # Pontos distintos (ordem por distância estável), todos dentro de 1 km
+        offset = i * 0.00001
+        if i % 2 == 0:
+            pet = Pet(owner_id=user.id, name=f"Pet {i}", species="dog")
+            db.add(pet)
+            db.flush()
+            report = LostPetReport(pet_id=pet.id, report_type="lost")
+        else:
+            report = LostPetReport(report_type="found", found_species="cat")
+        report.reporter_id = user.id
+        report.latitude = latitude + offset
+        report.longitude = longitude
+        report.event_date = date.today()
+        db.add(report)
+    db.flush()
+    return user
+
+
+def count_listing(client, engine, url):
+    """Faz a requisição e retorna (statements, itens na resposta)."""
+    with StatementCounter(engine) as counter:
+        response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url}: HTTP {response.status_code} {response.text}")
+    return counter.count, len(response.json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Número de queries das listagens de reportes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50], help="Tamanhos de página")
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    from app.core.security import get_current_user
+    from app.db.session import SessionLocal, engine, get_db
+    from app.main import app
+
+    db = SessionLocal()
+    current = {}
+
+    def override_get_db():
+        yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: current["user"]
+    client = TestClient(app)
+
+    print_header("Queries por página de reportes")
+    results = {"nearby": [], "my-reports": []}
+    try:
+        for i, size in enumerate(args.sizes):
+            # Um ponto por tamanho (no oceano), longe de dados reais
+            latitude, longitude = -60.0 + i, -30.0
+            current["user"] = seed_reports(db, size, latitude, longitude)
+
+            nearby = count_listing(
+                client, engine,
+                f"/api/v1/public/lost-pets/nearby?latitude={latitude}&longitude={longitude}"
+                f"&radius_km=1&limit={size}",
+            )
+            mine = count_listing(client, engine, "/api/v1/public/lost-pets/my-reports")
+            results["nearby"].append(nearby)
+            results["my-reports"].append(mine)
+            print(f"N={size:4}  nearby: {nearby[0]} queries ({nearby[1]} itens)  "
+                  f"my-reports: {mine[0]} queries ({mine[1]} itens)")
+    finally:
+        db.rollback()
+        db.close()
+        app.dependency_overrides.clear()
+
+    all_ok = True
+    for name, counts in results.items():
+        sizes_ok = all(items == size for (_, items), size in zip(counts, args.sizes))
+        constant = len({statements for statements, _ in counts}) == 1
+        if not sizes_ok:
+            print(f"[ERRO] {name}: a página não veio com N itens")
+            all_ok = False
+        elif constant:
+            print(f"[OK] {name}: {counts[0][0]} queries para qualquer N")
+        else:
+            print(f"[ERRO] {name}: o número de queries cresce com a página (N+1)")
+            all_ok = False
+
+    return all_ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
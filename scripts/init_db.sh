@@ -9,10 +9,12 @@ echo "🔧 Inicializando banco de dados..."
 echo "⏳ Aguardando banco de dados..."
 sleep 5
 
-# Criar extensão pgvector
-echo "📦 Criando extensão pgvector..."
+# Criar extensões (pgvector e índice espacial)
+echo "📦 Criando extensões pgvector, cube e earthdistance..."
 docker-compose exec -T db psql -U petid -d petid << EOF
 CREATE EXTENSION IF NOT EXISTS vector;
+CREATE EXTENSION IF NOT EXISTS cube;
+CREATE EXTENSION IF NOT EXISTS earthdistance;
 EOF
 
 # Criar migrações iniciais